@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cloudflare D1 异步数据库管理器
+基于 aiohttp 的连接池客户端，供异步爬虫在同一事件循环中并发写入
+"""
+
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from config import DATABASE_CONFIG
+from database_manager import D1StatementBuilder
+
+if TYPE_CHECKING:
+    import aiohttp
+
+class AsyncD1DatabaseManager(D1StatementBuilder):
+    """Cloudflare D1 异步数据库管理器 (需在事件循环中使用)"""
+    
+    def __init__(self):
+        self.api_token = DATABASE_CONFIG["api_token"]
+        self.account_id = DATABASE_CONFIG["account_id"]
+        self.database_id = DATABASE_CONFIG["database_id"]
+        self.base_url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/d1/database/{self.database_id}"
+        
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json"
+        }
+        
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._init_batch_config()
+        
+        self.logger = logging.getLogger(__name__)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """延迟创建会话 (必须在事件循环内创建；aiohttp 在此时才导入，缩短命令启动时间)"""
+        import aiohttp
+        
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=DATABASE_CONFIG.get("pool_maxsize", 8),
+                force_close=not DATABASE_CONFIG.get("keep_alive", True)
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=DATABASE_CONFIG.get("request_timeout", 30))
+            )
+        return self._session
+    
+    async def close(self):
+        """关闭会话并释放连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def _post(self, data: Dict) -> Optional[List[Dict]]:
+        """发送查询请求，成功时返回 result 列表"""
+        async with self._get_session().post(f"{self.base_url}/query", json=data) as response:
+            if response.status != 200:
+                self.logger.error(f"D1 API请求失败: {response.status} - {await response.text()}")
+                return None
+            
+            result = await response.json()
+            if not result.get("success"):
+                self.logger.error(f"D1查询失败: {result}")
+                return None
+            
+            return result.get("result") or []
+    
+    async def execute_query(self, sql: str, params: List = None) -> Dict:
+        """执行SQL查询"""
+        try:
+            data = {"sql": sql}
+            if params:
+                data["params"] = params
+            
+            results = await self._post(data)
+            return results[0] if results else {}
+            
+        except Exception as e:
+            self.logger.error(f"数据库查询异常: {e}")
+            return {}
+    
+    async def execute_batch(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        """在一次HTTP请求中执行多条参数化SQL，返回逐条结果"""
+        if not statements:
+            return []
+        
+        empty_results = [{} for _ in statements]
+        
+        try:
+            data = {
+                "batch": [
+                    {"sql": sql, "params": params or []}
+                    for sql, params in statements
+                ]
+            }
+            
+            results = await self._post(data)
+            if results is None:
+                return empty_results
+            return results + empty_results[len(results):]
+            
+        except Exception as e:
+            self.logger.error(f"数据库批量查询异常: {e}")
+            return empty_results
+    
+    async def store_post_bundles(self, bundles: List[Tuple[Dict, List[Dict], Dict]]) -> Dict[str, bool]:
+        """批量写入多个帖子及其关键词、技术分类，返回 {post_id: 是否新插入}"""
+        outcomes = {}
+        
+        for statements, post_positions in self._group_post_bundles(bundles):
+            results = await self.execute_batch(statements)
+            for post_id, index in post_positions:
+                outcomes[post_id] = outcomes.get(post_id, False) or self._changes(results[index]) > 0
+        
+        stored = sum(1 for inserted in outcomes.values() if inserted)
+        self.logger.info(f"批量写入帖子完成: {stored}/{len(bundles)}")
+        return outcomes
+    
+    async def get_recent_post_ids(self, days: int = 0) -> Set[str]:
+        """一次查询获取今日(及最近 days 天)已采集的帖子ID"""
+        sql = """
+        SELECT id FROM reddit_ai_posts 
+        WHERE crawl_date >= date('now', ?)
+        """
+        
+        result = await self.execute_query(sql, [f"-{max(0, int(days))} days"])
+        return {row["id"] for row in result.get("results", []) if row.get("id")}
+    
+    async def get_recent_post_links(self, days: int = 30) -> List[Tuple[str, str]]:
+        """一次查询获取最近 days 天已采集外链帖子的 (帖子ID, url)，用于预热链接目标索引"""
+        sql = """
+        SELECT id, url FROM reddit_ai_posts 
+        WHERE crawl_date >= date('now', ?) AND url IS NOT NULL AND url != ''
+        """
+        
+        result = await self.execute_query(sql, [f"-{max(0, int(days))} days"])
+        return [(row["id"], row["url"]) for row in result.get("results", []) if row.get("id")]
+    
+    async def get_today_posts_by_subreddit(self) -> Dict[str, int]:
+        """获取今日各子版块采集统计"""
+        sql = """
+        SELECT subreddit, COUNT(*) as count 
+        FROM reddit_ai_posts 
+        WHERE crawl_date = date('now')
+        GROUP BY subreddit
+        ORDER BY count DESC
+        """
+        
+        result = await self.execute_query(sql)
+        return {row["subreddit"]: row["count"] for row in result.get("results", [])}
+    
+    async def create_daily_task(self, task_date: str, target_count: int = 200) -> bool:
+        """创建每日采集任务"""
+        sql = """
+        INSERT OR IGNORE INTO reddit_daily_tasks (
+            task_date, target_count
+        ) VALUES (?, ?)
+        """
+        
+        result = await self.execute_query(sql, [task_date, target_count])
+        return self._changes(result) > 0
+    
+    async def update_daily_task_status(self, task_date: str, status: str,
+                                       actual_count: int = None, error_message: str = None) -> bool:
+        """更新每日任务状态 (失败时记录错误信息)"""
+        sql, params = self._daily_task_status_statement(task_date, status, actual_count, error_message)
+        result = await self.execute_query(sql, params)
+        return self._changes(result) > 0
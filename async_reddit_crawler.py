@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reddit AI 内容异步爬虫
+基于 asyncpraw 与 aiohttp，在同一事件循环中重叠 Reddit 列表抓取、筛选处理与 D1 写入
+筛选、评分与分类逻辑与同步爬虫 RedditAICrawler 共用 (PostPipelineMixin)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from config import REDDIT_CONFIG, COLLECTION_CONFIG, validate_config
+from async_database_manager import AsyncD1DatabaseManager
+from content_processor import ContentProcessor, PostAnalysis
+from tfidf_index import DocumentFrequencyIndex
+from daily_collection_config import (
+    TARGET_SUBREDDITS, CONCURRENCY_CONFIG, DATABASE_CONFIG as STORAGE_CONFIG
+)
+from post_pipeline import PostPipelineMixin
+from quota_tracker import QuotaTracker
+from rate_limiter import TokenBucket
+from subreddit_cache import SubredditMetadataCache
+from dedup import EvaluatedPostCache, NearDuplicateIndex
+from link_index import LinkIndex
+from time_utils import beijing_now, today_date
+
+if TYPE_CHECKING:
+    import asyncpraw
+
+class AsyncRedditAICrawler(PostPipelineMixin):
+    """Reddit AI 内容异步爬虫"""
+    
+    def __init__(self):
+        # 验证配置
+        validate_config()
+        
+        # Reddit 客户端需在事件循环内创建
+        self.reddit: Optional["asyncpraw.Reddit"] = None
+        self.db = AsyncD1DatabaseManager()
+        
+        # 语料级文档频率索引 (关键词 TF-IDF，帖子入库后增量更新)
+        self.tfidf_index = DocumentFrequencyIndex.from_config()
+        self.processor = ContentProcessor(tfidf_index=self.tfidf_index)
+        
+        self.logger = logging.getLogger(__name__)
+        
+        # Reddit 请求预算 (所有协程共享)
+        self.rate_budget = TokenBucket(
+            CONCURRENCY_CONFIG.get("reddit_requests_per_minute", 60),
+            CONCURRENCY_CONFIG.get("reddit_burst", 5)
+        )
+        
+        # 子版块元数据缓存 (每个子版块每个会话只获取一次)
+        self.subreddit_cache = SubredditMetadataCache()
+        
+        # 会话内已评估帖子 (跨排序方式与交叉帖去重)
+        self.evaluated_posts = EvaluatedPostCache()
+        
+        # 近似重复指纹索引 (滚动窗口，跨会话持久化)
+        self.near_duplicates = NearDuplicateIndex.from_config()
+        
+        # 外链目标索引 (同一论文/仓库/视频只采集一次)
+        self.link_index = LinkIndex.from_config()
+        
+        self.quota: Optional[QuotaTracker] = None
+        self.seen_post_ids: Optional[Set[str]] = None
+        self._stats_lock = threading.Lock()
+        
+        # 待写入的帖子与进行中的写入任务
+        self._write_buffer: List[Tuple[Dict, List[Dict], Dict]] = []
+        self._write_tasks: Set[asyncio.Task] = set()
+        self._write_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # 统计信息
+        self.stats = {
+            "session_id": str(uuid.uuid4()),
+            "start_time": time.time(),
+            "total_fetched": 0,
+            "total_processed": 0,
+            "total_queued": 0,
+            "total_stored": 0,
+            "api_calls": 0,
+            "errors": []
+        }
+    
+    async def _init_reddit_client(self) -> "asyncpraw.Reddit":
+        """初始化异步Reddit客户端 (asyncpraw 在此时才导入，缩短命令启动时间)"""
+        import asyncpraw
+        
+        try:
+            return asyncpraw.Reddit(
+                client_id=REDDIT_CONFIG["client_id"],
+                client_secret=REDDIT_CONFIG["client_secret"],
+                user_agent=REDDIT_CONFIG["user_agent"]
+            )
+        except Exception as e:
+            raise ValueError(f"Reddit API连接失败: {e}")
+    
+    async def run(self) -> bool:
+        """执行采集并释放连接"""
+        try:
+            return await self.collect_daily_posts()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        """关闭Reddit与D1连接"""
+        if self.reddit is not None:
+            await self.reddit.close()
+            self.reddit = None
+        await self.db.close()
+    
+    async def collect_daily_posts(self) -> bool:
+        """执行每日帖子采集"""
+        collection_date = today_date()
+        
+        try:
+            current_time = beijing_now()
+            self.logger.info(f"开始每日异步采集任务 - 日期: {collection_date} ({current_time.strftime('%H:%M:%S CST')})")
+            
+            if self.reddit is None:
+                self.reddit = await self._init_reddit_client()
+            
+            self._write_semaphore = asyncio.Semaphore(max(1, CONCURRENCY_CONFIG.get("max_workers", 4)))
+            
+            # 创建每日任务记录
+            await self.db.create_daily_task(collection_date, COLLECTION_CONFIG["daily_target"])
+            await self.db.update_daily_task_status(collection_date, "running")
+            
+            # 以今日各子版块统计初始化本地配额
+            self.quota = QuotaTracker(
+                COLLECTION_CONFIG["daily_target"],
+                {config["name"]: config["target_posts"] for config in TARGET_SUBREDDITS},
+                await self.db.get_today_posts_by_subreddit()
+            )
+            
+            if self.quota.is_global_met():
+                today_count = self.quota.total_stored()
+                self.logger.info(f"今日目标已完成，已采集 {today_count} 个帖子")
+                await self.db.update_daily_task_status(collection_date, "completed", today_count)
+                return True
+            
+            # 预加载已采集帖子ID与外链
+            days = STORAGE_CONFIG.get("seen_ids_preload_days", 0)
+            self.seen_post_ids = await self.db.get_recent_post_ids(days)
+            self.logger.info(f"已预加载 {len(self.seen_post_ids)} 个已采集帖子ID (最近 {days} 天)")
+            if self.link_index is not None:
+                self._seed_link_index(await self.db.get_recent_post_links(self.link_index.preload_days))
+            
+            # 各子版块并发采集，并发度由信号量限制，请求节奏由令牌桶控制
+            semaphore = asyncio.Semaphore(max(1, CONCURRENCY_CONFIG.get("max_workers", 4)))
+            
+            async def collect_with_limit(subreddit_config: Dict) -> int:
+                async with semaphore:
+                    return await self._collect_one_subreddit(subreddit_config)
+            
+            results = await asyncio.gather(
+                *(collect_with_limit(config) for config in TARGET_SUBREDDITS),
+                return_exceptions=True
+            )
+            
+            for config, result in zip(TARGET_SUBREDDITS, results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"异步采集 r/{config['name']} 异常: {result}")
+                    self.stats["errors"].append(f"r/{config['name']}: {str(result)}")
+            
+            # 等待全部写入完成后与D1对账
+            await self._drain_writes()
+            self._save_indexes()
+            final_count = self.quota.reconcile(await self.db.get_today_posts_by_subreddit())
+            
+            await self.db.update_daily_task_status(collection_date, "completed", final_count)
+            self.logger.info(f"每日异步采集任务完成 - 总计采集: {final_count} 个帖子")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"每日异步采集任务失败: {e}")
+            await self._drain_writes()
+            self._save_indexes()
+            await self.db.update_daily_task_status(collection_date, "failed", error_message=str(e))
+            return False
+    
+    async def _collect_one_subreddit(self, subreddit_config: Dict) -> int:
+        """按剩余配额采集单个子版块"""
+        subreddit_name = subreddit_config["name"]
+        needed = self.quota.remaining_for(subreddit_name)
+        
+        if needed == 0:
+            return 0
+        
+        self.logger.info(f"开始采集 r/{subreddit_name} - 目标: {needed} 个帖子")
+        collected = await self._collect_subreddit_posts(subreddit_config, needed)
+        self.logger.info(f"r/{subreddit_name} 采集完成: {collected} 个帖子")
+        
+        return collected
+    
+    async def _collect_subreddit_posts(self, subreddit_config: Dict, target_count: int) -> int:
+        """采集单个子版块的帖子"""
+        subreddit_name = subreddit_config["name"]
+        sort_methods = subreddit_config.get("sort_methods", ["hot"])
+        min_score = subreddit_config.get("min_score", 10)
+        min_comments = subreddit_config.get("min_comments", 3)
+        
+        collected_count = 0
+        
+        try:
+            subreddit = await self.reddit.subreddit(subreddit_name)
+            
+            # 子版块元数据每个会话只获取一次，逐帖提取时只读缓存
+            await self.subreddit_cache.get_async(subreddit_name, self._fetch_subreddit_metadata)
+            
+            for sort_method in sort_methods:
+                if collected_count >= target_count or self.quota.is_global_met():
+                    break
+                
+                self.logger.info(f"  采集 r/{subreddit_name} - {sort_method} 排序")
+                
+                async for post in self._iter_posts_by_sort(subreddit, sort_method, limit=100):
+                    if collected_count >= target_count or self.quota.is_global_met():
+                        break
+                    
+                    with self._stats_lock:
+                        self.stats["total_fetched"] += 1
+                    
+                    if post.id in self.seen_post_ids:
+                        continue
+                    
+                    analysis = self._evaluate_post(post, min_score, min_comments)
+                    if analysis is None:
+                        continue
+                    
+                    if self._process_and_queue_post(post, subreddit_name, analysis):
+                        collected_count += 1
+                
+                # 让出事件循环，便于写入任务推进
+                await asyncio.sleep(0)
+            
+        except Exception as e:
+            self.logger.error(f"采集 r/{subreddit_name} 失败: {e}")
+            self.stats["errors"].append(f"r/{subreddit_name}: {str(e)}")
+        
+        return collected_count
+    
+    async def _fetch_subreddit_metadata(self, subreddit_name: str) -> Dict:
+        """获取子版块 about 信息 (一次API调用)"""
+        await self.rate_budget.acquire_async()
+        with self._stats_lock:
+            self.stats["api_calls"] += 1
+        
+        subreddit = await self.reddit.subreddit(subreddit_name, fetch=True)
+        return SubredditMetadataCache.extract_metadata(subreddit)
+    
+    async def _iter_posts_by_sort(self, subreddit, sort_method: str, limit: int = 100):
+        """根据排序方式异步获取帖子 (请求前从共享预算中获取令牌)"""
+        if sort_method == "top":
+            listing = subreddit.top(time_filter="week", limit=limit)
+        elif sort_method == "new":
+            listing = subreddit.new(limit=limit)
+        elif sort_method == "rising":
+            listing = subreddit.rising(limit=limit)
+        else:
+            listing = subreddit.hot(limit=limit)
+        
+        # 每页最多100条
+        for _ in range(max(1, (limit + 99) // 100)):
+            await self.rate_budget.acquire_async()
+            with self._stats_lock:
+                self.stats["api_calls"] += 1
+        
+        async for post in listing:
+            yield post
+    
+    def _process_and_queue_post(self, post, subreddit_name: str,
+                                analysis: Optional[PostAnalysis] = None) -> bool:
+        """处理帖子并放入写入缓冲区"""
+        # 预占配额 (全局配额已满时跳过，不再评分和提取关键词)，写入结束后在 _on_post_stored 中确认或释放
+        if not self.quota.reserve(subreddit_name):
+            self._release_post_claims(post.id)
+            return False
+        
+        handed_off = False
+        try:
+            with self._stats_lock:
+                self.stats["total_processed"] += 1
+            
+            bundle = self._build_post_bundle(post, subreddit_name, analysis)
+            
+            self.seen_post_ids.add(post.id)
+            self._write_buffer.append(bundle)
+            handed_off = True
+            
+            with self._stats_lock:
+                self.stats["total_queued"] += 1
+            
+            if len(self._write_buffer) >= STORAGE_CONFIG.get("write_batch_size", 20):
+                self._flush_writes()
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"处理帖子失败 {post.id}: {e}")
+            # 帖子未进入写入缓冲区时释放预占的配额与去重索引条目
+            if not handed_off:
+                self.quota.confirm(subreddit_name, False)
+                self._release_post_claims(post.id)
+            return handed_off
+    
+    def _flush_writes(self):
+        """将缓冲区帖子交给后台写入任务"""
+        if not self._write_buffer:
+            return
+        
+        batch, self._write_buffer = self._write_buffer, []
+        task = asyncio.create_task(self._write_batch(batch))
+        self._write_tasks.add(task)
+        task.add_done_callback(self._write_tasks.discard)
+    
+    async def _write_batch(self, batch: List[Tuple[Dict, List[Dict], Dict]]):
+        """批量写入D1并回调写入结果"""
+        async with self._write_semaphore:
+            try:
+                outcomes = await self.db.store_post_bundles(batch)
+            except Exception as e:
+                self.logger.error(f"异步批量写入失败: {e}")
+                outcomes = {}
+        
+        for post_data, _, _ in batch:
+            self._on_post_stored(post_data, outcomes.get(post_data.get("id"), False))
+    
+    async def _drain_writes(self):
+        """写入剩余缓冲并等待全部写入任务完成"""
+        self._flush_writes()
+        if self._write_tasks:
+            await asyncio.gather(*list(self._write_tasks), return_exceptions=True)
+    
+    def get_collection_summary(self) -> Dict:
+        """获取采集汇总信息 (与同步爬虫格式一致)"""
+        duration = time.time() - self.stats["start_time"]
+        subreddit_stats = self.quota.snapshot() if self.quota is not None else {}
+        today_count = sum(subreddit_stats.values())
+        
+        return {
+            "session_id": self.stats["session_id"],
+            "engine": "async",
+            "duration_seconds": round(duration, 2),
+            "total_fetched": self.stats["total_fetched"],
+            "total_processed": self.stats["total_processed"],
+            "total_queued": self.stats["total_queued"],
+            "total_stored": self.stats["total_stored"],
+            "api_calls": self.stats["api_calls"],
+            "rate_limit": self.rate_budget.get_stats(),
+            "subreddit_cache": self.subreddit_cache.get_stats(),
+            "evaluation_cache": self.evaluated_posts.get_stats(),
+            "tfidf_index": self.tfidf_index.get_stats() if self.tfidf_index else None,
+            "near_duplicates": self.near_duplicates.get_stats() if self.near_duplicates else None,
+            "link_index": self.link_index.get_stats() if self.link_index else None,
+            "today_total": today_count,
+            "target_achievement": f"{today_count}/{COLLECTION_CONFIG['daily_target']}",
+            "subreddit_breakdown": subreddit_stats,
+            "errors": self.stats["errors"]
+        }
+
+def main():
+    """主程序入口"""
+    logging.basicConfig(level=logging.INFO)
+    
+    crawler = AsyncRedditAICrawler()
+    success = asyncio.run(crawler.run())
+    summary = crawler.get_collection_summary()
+    
+    print(f"执行时间: {summary['duration_seconds']} 秒")
+    print(f"今日总计: {summary['today_total']} 个帖子")
+    print(f"采集状态: {'✅ 成功' if success else '❌ 失败'}")
+    
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -182,6 +182,12 @@ CREATE INDEX idx_posts_processed_at ON reddit_ai_posts(processed_at DESC);
 CREATE INDEX idx_posts_extraction_status ON reddit_ai_posts(extraction_status);
 CREATE INDEX idx_posts_crawl_date ON reddit_ai_posts(date(crawl_timestamp, 'unixepoch'));
 
+-- 导出键集分页索引 (过滤列, 排序列, id)，每页查询为一次索引范围扫描
+CREATE INDEX idx_posts_export_date_score ON reddit_ai_posts(date(crawl_timestamp, 'unixepoch'), score, id);
+CREATE INDEX idx_posts_export_score ON reddit_ai_posts(score, id);
+CREATE INDEX idx_posts_export_subreddit_created ON reddit_ai_posts(subreddit, created_utc, id);
+CREATE INDEX idx_posts_export_crawl_timestamp ON reddit_ai_posts(crawl_timestamp, id);
+
 -- 关键词表索引
 CREATE INDEX idx_keywords_post_id ON reddit_post_keywords(post_id);
 CREATE INDEX idx_keywords_keyword ON reddit_post_keywords(keyword);
@@ -25,7 +25,12 @@ REDDIT_CONFIG = {
 DATABASE_CONFIG = {
     "api_token": os.getenv("CLOUDFLARE_API_TOKEN"),
     "account_id": os.getenv("CLOUDFLARE_ACCOUNT_ID"),
-    "database_id": os.getenv("D1_DATABASE_ID")
+    "database_id": os.getenv("D1_DATABASE_ID"),
+    # HTTP 连接池配置
+    "pool_connections": int(os.getenv("D1_POOL_CONNECTIONS", 4)),
+    "pool_maxsize": int(os.getenv("D1_POOL_MAXSIZE", 8)),
+    "keep_alive": os.getenv("D1_KEEP_ALIVE", "true").lower() == "true",
+    "request_timeout": int(os.getenv("D1_REQUEST_TIMEOUT", 30))
 }
 
 # ============================================
@@ -46,7 +51,13 @@ COLLECTION_CONFIG = {
 SYSTEM_CONFIG = {
     "debug_mode": os.getenv("DEBUG_MODE", "false").lower() == "true",
     "log_level": os.getenv("LOG_LEVEL", "INFO"),
-    "enable_console": os.getenv("ENABLE_CONSOLE_OUTPUT", "true").lower() == "true"
+    "enable_console": os.getenv("ENABLE_CONSOLE_OUTPUT", "true").lower() == "true",
+    # 命令行环境检查结果缓存 (有效期内的子命令不再重复访问D1)
+    "env_check_ttl": int(os.getenv("ENV_CHECK_TTL", 600)),
+    "env_check_cache_file": os.getenv(
+        "ENV_CHECK_CACHE_FILE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env_check_cache.json")
+    )
 }
 
 # 验证必要配置
@@ -3,40 +3,145 @@
 """
 内容处理和关键词提取模块
 负责AI相关内容识别、关键词提取、技术分类等
+导入时不加载 NLTK、不访问网络；停用词在首次使用时加载
 """
 
 import re
 import json
+import time
 import logging
-from typing import List, Dict, Tuple, Optional
-from textblob import TextBlob
-import nltk
-from daily_collection_config import AI_KEYWORDS
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Tuple, Optional, NamedTuple, Sequence, Set
+from daily_collection_config import (
+    AI_KEYWORDS, KEYWORD_MATCHING_CONFIG, TEXT_PROCESSING_CONFIG, TFIDF_CONFIG
+)
+from keyword_matcher import KeywordMatcher, KeywordHit
+from stopwords_en import ENGLISH_STOP_WORDS
 
 # 简化版TF-IDF实现，替代scikit-learn
 from collections import Counter
 import math
 
-# 下载必要的NLTK数据
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+def load_stop_words(source: Optional[str] = None) -> Set[str]:
+    """
+    加载英文停用词
+    source 为 "nltk" 时读取本地已安装的 NLTK 语料 (不会自动下载)，
+    NLTK 未安装或缺少语料时回退到内置停用词表
+    """
+    source = source or TEXT_PROCESSING_CONFIG.get("stopwords_source", "builtin")
+    
+    if source == "nltk":
+        try:
+            from nltk.corpus import stopwords
+            return set(stopwords.words('english'))
+        except (ImportError, LookupError) as e:
+            logging.getLogger(__name__).warning(f"NLTK停用词不可用，使用内置停用词表: {e}")
+    
+    return set(ENGLISH_STOP_WORDS)
+
+# ============================================
+# 内容分析词典
+# ============================================
+
+# 没有AI关键词匹配时使用的AI相关技术术语 (按列表顺序取第一个命中)
+FALLBACK_AI_TERMS = {
+    "通用AI": [
+        "artificial intelligence", "machine learning", "deep learning",
+        "neural network", "algorithm", "model training", "inference",
+        "automation", "prediction", "classification", "regression"
+    ]
+}
+
+# 内容类型分类
+CONTENT_TYPE_KEYWORDS = {
+    "研究论文": ["paper", "arxiv", "research", "study", "analysis", "survey", "review"],
+    "工具资源": ["tool", "library", "framework", "api", "model", "github", "code", "implementation"],
+    "应用案例": ["use case", "application", "demo", "project", "example", "tutorial"],
+    "行业动态": ["news", "announcement", "release", "update", "company", "industry"]
+}
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# AI技术分类
+AI_CATEGORY_KEYWORDS = {
+    "LLM": ["llm", "large language model", "gpt", "bert", "transformer", "language model"],
+    "计算机视觉": ["computer vision", "cv", "image", "visual", "object detection", "segmentation"],
+    "自然语言处理": ["nlp", "natural language", "text", "sentiment", "translation"],
+    "机器学习": ["machine learning", "ml", "supervised", "unsupervised", "classification"],
+    "深度学习": ["deep learning", "neural network", "cnn", "rnn", "lstm"],
+    "强化学习": ["reinforcement learning", "rl", "policy", "reward", "agent"],
+    "生成式AI": ["generative", "generation", "diffusion", "gan", "stable diffusion"],
+    "AGI": ["agi", "artificial general intelligence", "reasoning", "consciousness"]
+}
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+# 技术栈检测
+TECH_STACK_KEYWORDS = {
+    "frameworks": ["pytorch", "tensorflow", "jax", "keras", "scikit-learn", "hugging face"],
+    "languages": ["python", "javascript", "r", "julia", "c++", "java"],
+    "platforms": ["aws", "azure", "gcp", "google cloud", "nvidia", "cuda"]
+}
+
+# 应用领域 (按顺序取第一个命中的领域)
+APPLICATION_DOMAIN_KEYWORDS = {
+    "医疗健康": ["medical", "healthcare", "diagnosis", "drug", "patient"],
+    "自动驾驶": ["autonomous", "driving", "vehicle", "car", "transportation"],
+    "金融科技": ["finance", "fintech", "trading", "banking", "risk"],
+    "教育": ["education", "learning", "student", "teaching", "course"],
+    "娱乐": ["gaming", "entertainment", "music", "art", "creative"],
+    "企业应用": ["business", "enterprise", "productivity", "workflow"],
+    "科研": ["research", "academic", "scientific", "experiment"]
+}
+
+# 技术复杂度 (按顺序取第一个命中的级别)
+COMPLEXITY_INDICATORS = {
+    "high": ["sota", "state-of-the-art", "novel", "breakthrough", "advanced", "complex"],
+    "medium": ["improved", "enhanced", "optimized", "efficient", "practical"],
+    "low": ["simple", "basic", "easy", "tutorial", "beginner", "introduction"]
+}
+
+# 编译进同一个自动机的词典分组
+ANALYSIS_DICTIONARIES = {
+    "ai": AI_KEYWORDS,
+    "fallback": FALLBACK_AI_TERMS,
+    "content_type": CONTENT_TYPE_KEYWORDS,
+    "ai_category": AI_CATEGORY_KEYWORDS,
+    "tech_stack": TECH_STACK_KEYWORDS,
+    "domain": APPLICATION_DOMAIN_KEYWORDS,
+    "complexity": COMPLEXITY_INDICATORS,
+}
+
+class PostAnalysis(NamedTuple):
+    """
+    单个帖子的一次性分析结果 (只读)
+    由 ContentProcessor.analyze 生成，供筛选、评分、分类和关键词提取共用；
+    其中的字典均为只读映射、列表均为元组，需要可修改的结果时由 classify_content /
+    extract_all_keywords 复制
+    """
+    is_ai_related: bool             # 是否AI相关
+    ai_category: str                # 主要AI分类 (AI_KEYWORDS 中的分类)
+    matched_keywords: Tuple[str, ...]  # 匹配的AI关键词
+    keywords: Optional[Tuple[Mapping, ...]]  # 去重排序后的全部关键词 (未提取时为 None)
+    classification: Mapping         # 内容分类结果 (字段与 classify_content 返回格式一致)
+    ai_hits: Tuple[KeywordHit, ...] = ()  # AI词典命中 (之后提取关键词时无需重新扫描文本)
+
+def _freeze_classification(classification: Dict) -> Mapping:
+    """将分类结果转换为只读映射 (列表转为元组)"""
+    frozen = dict(classification)
+    frozen["secondary_categories"] = tuple(frozen["secondary_categories"])
+    frozen["tech_stack"] = MappingProxyType({
+        key: tuple(values) for key, values in frozen["tech_stack"].items()
+    })
+    return MappingProxyType(frozen)
 
 class ContentProcessor:
     """内容处理器 - 负责AI内容分析和关键词提取"""
     
-    def __init__(self):
+    def __init__(self, match_mode: Optional[str] = None, tfidf_index=None):
+        """
+        match_mode: 关键词匹配方式 ("word" 或 "substring")，默认读取 KEYWORD_MATCHING_CONFIG
+        tfidf_index: 语料级文档频率索引 (DocumentFrequencyIndex)，为空时按单帖词频提取关键词
+        """
         self.logger = logging.getLogger(__name__)
-        self.stop_words = set(stopwords.words('english'))
+        self.match_mode = match_mode or KEYWORD_MATCHING_CONFIG.get("match_mode", "word")
+        self._stop_words: Optional[Set[str]] = None
         
         # 合并所有AI关键词
         self.ai_keywords_flat = []
@@ -46,9 +151,20 @@ class ContentProcessor:
         # 编译正则表达式模式
         self._compile_patterns()
         
+        # 编译关键词自动机 (一次构建，单次扫描匹配全部关键词)
+        self._compile_keyword_matchers()
+        
         # 初始化简化版TF-IDF处理器
         self.max_features = 1000
         self.min_df = 1
+        self.tfidf_index = tfidf_index
+    
+    @property
+    def stop_words(self) -> Set[str]:
+        """英文停用词 (首次使用时加载)"""
+        if self._stop_words is None:
+            self._stop_words = load_stop_words()
+        return self._stop_words
     
     def _compile_patterns(self):
         """编译常用的正则表达式模式"""
@@ -78,47 +194,106 @@ class ContentProcessor:
             "organizations": re.compile(r'\b(OpenAI|Anthropic|Google|Microsoft|Meta|DeepMind|NVIDIA|Stability\s*AI)\b', re.IGNORECASE)
         }
     
-    def is_ai_related(self, title: str, content: str = "") -> Tuple[bool, str, List[str]]:
+    def _compile_keyword_matchers(self):
+        """将AI关键词及全部分类词典编译进同一个匹配自动机"""
+        if self.match_mode == "substring":
+            word_boundary_max_length = 0
+        else:
+            word_boundary_max_length = KEYWORD_MATCHING_CONFIG.get("word_boundary_max_length", 5)
+        
+        self.analysis_matcher = KeywordMatcher.from_groups(
+            ANALYSIS_DICTIONARIES,
+            word_boundary_max_length=word_boundary_max_length,
+            allow_plural_suffix=KEYWORD_MATCHING_CONFIG.get("allow_plural_suffix", True),
+            allowed_suffixes=KEYWORD_MATCHING_CONFIG.get("allowed_suffixes", ()),
+            allowed_prefixes=KEYWORD_MATCHING_CONFIG.get("allowed_prefixes", ())
+        )
+    
+    def analyze(self, title: str, content: str = "", extract_keywords: bool = True) -> PostAnalysis:
         """
-        检查内容是否与AI相关
-        返回: (是否相关, 主要分类, 匹配的关键词列表)
+        对帖子做一次完整分析: 文本只拼接、转小写和扫描一次，
+        结果供AI相关性筛选、质量评分、内容分类和关键词提取共用
+        extract_keywords 为 False 时跳过关键词提取 (只需评分和分类时使用)
         """
-        text = (title + " " + content).lower()
-        matched_keywords = []
-        primary_category = None
+        title = title or ""
+        content = content or ""
+        full_text = title + " " + content
+        text_lower = full_text.lower()
         
-        # 检查各个分类的关键词
-        for category, keywords in AI_KEYWORDS.items():
-            category_matches = []
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    category_matches.append(keyword)
-                    matched_keywords.append(keyword)
-            
-            # 如果这个分类有匹配且还没有主分类，设为主分类
-            if category_matches and not primary_category:
-                primary_category = category
+        # 一次扫描得到所有词典的命中，按分组拆分后各自按词典顺序排列
+        grouped = KeywordMatcher.group_hits(self.analysis_matcher.find_all(text_lower))
+        matches = {
+            group: KeywordMatcher.ordered_matches(grouped.get(group, []))
+            for group in ANALYSIS_DICTIONARIES
+        }
+        
+        is_ai, ai_category, matched_keywords = self._ai_relevance(matches["ai"], matches["fallback"])
+        ai_hits = tuple(grouped.get("ai", []))
+        
+        return PostAnalysis(
+            is_ai_related=is_ai,
+            ai_category=ai_category,
+            matched_keywords=tuple(matched_keywords),
+            keywords=self._extract_keywords(full_text, ai_hits) if extract_keywords else None,
+            classification=_freeze_classification(self._classify_from_matches(matches)),
+            ai_hits=ai_hits
+        )
+    
+    def _extract_keywords(self, full_text: str, ai_hits: Sequence[KeywordHit]) -> Tuple[Mapping, ...]:
+        """关键词: AI词典 + 技术术语 + 词频关键词 (去重并按置信度排序，结果只读)"""
+        all_keywords = self._ai_keywords_from_hits(list(ai_hits))
+        all_keywords.extend(self.extract_technical_terms(full_text))
+        all_keywords.extend(self.extract_keywords_tfidf(full_text))
+        return tuple(MappingProxyType(keyword) for keyword in self._deduplicate_keywords(all_keywords))
+    
+    def with_keywords(self, analysis: PostAnalysis, title: str, content: str = "") -> PostAnalysis:
+        """
+        补充关键词提取 (筛选阶段以 extract_keywords=False 分析，通过筛选的帖子再提取)
+        复用分析结果中的AI词典命中，不重新扫描词典
+        """
+        if analysis.keywords is not None:
+            return analysis
+        full_text = (title or "") + " " + (content or "")
+        return analysis._replace(keywords=self._extract_keywords(full_text, analysis.ai_hits))
+    
+    def _ai_relevance(self, ai_matches: List[KeywordHit],
+                      fallback_matches: List[KeywordHit]) -> Tuple[bool, str, List[str]]:
+        """根据AI词典命中判断相关性 (第一个命中的分类即主分类)"""
+        matched_keywords = [hit.keyword for hit in ai_matches]
+        primary_category = ai_matches[0].category if ai_matches else None
         
         is_related = len(matched_keywords) > 0
         
         # 如果没有关键词匹配，检查是否有AI相关的技术术语
-        if not is_related:
-            ai_terms = [
-                "artificial intelligence", "machine learning", "deep learning",
-                "neural network", "algorithm", "model training", "inference",
-                "automation", "prediction", "classification", "regression"
-            ]
-            for term in ai_terms:
-                if term in text:
-                    is_related = True
-                    primary_category = "通用AI"
-                    matched_keywords.append(term)
-                    break
+        if not is_related and fallback_matches:
+            is_related = True
+            primary_category = fallback_matches[0].category
+            matched_keywords.append(fallback_matches[0].keyword)
         
         return is_related, primary_category or "未分类", matched_keywords
     
+    def is_ai_related(self, title: str, content: str = "") -> Tuple[bool, str, List[str]]:
+        """
+        检查内容是否与AI相关
+        返回: (是否相关, 主要分类, 匹配的关键词列表)
+        """
+        analysis = self.analyze(title, content, extract_keywords=False)
+        return analysis.is_ai_related, analysis.ai_category, list(analysis.matched_keywords)
+    
+    def extract_terms(self, text: str) -> List[str]:
+        """分词并过滤停用词和短词，返回小写词项列表 (TF-IDF 与文档频率索引共用)"""
+        return self._terms_from_clean_text(self._clean_text(text))
+    
+    def _terms_from_clean_text(self, clean_text: str) -> List[str]:
+        """对已清理的文本分词并过滤停用词和短词"""
+        return [word.lower() for word in clean_text.split()
+                if len(word) > 3 and word.lower() not in self.stop_words]
+    
     def extract_keywords_tfidf(self, text: str, max_keywords: int = 10) -> List[Dict]:
-        """使用简化版频次分析提取关键词"""
+        """
+        提取关键词: 文档频率索引可用时计算语料级 TF-IDF，
+        否则 (未启用或索引文档数不足) 回退为简化版频次分析
+        """
         try:
             # 预处理文本
             clean_text = self._clean_text(text)
@@ -126,9 +301,12 @@ class ContentProcessor:
             if len(clean_text.split()) < 3:  # 文本太短
                 return []
             
-            # 分词并过滤停用词
-            words = [word.lower() for word in clean_text.split() 
-                    if len(word) > 3 and word.lower() not in self.stop_words]
+            # 分词并过滤停用词 (复用已清理的文本)
+            words = self._terms_from_clean_text(clean_text)
+            
+            if self.tfidf_index is not None and \
+                    self.tfidf_index.doc_count >= TFIDF_CONFIG.get("min_documents", 50):
+                return self._keywords_from_tfidf(words, max_keywords)
             
             # 计算词频
             word_freq = Counter(words)
@@ -150,6 +328,24 @@ class ContentProcessor:
             self.logger.error(f"关键词提取失败: {e}")
             return []
     
+    def _keywords_from_tfidf(self, words: List[str], max_keywords: int) -> List[Dict]:
+        """按语料级 TF-IDF 选取关键词 (置信度为 L2 归一化后的得分)"""
+        min_score = TFIDF_CONFIG.get("min_score", 0.1)
+        
+        keywords = []
+        for word, score, freq in self.tfidf_index.score(words)[:max_keywords]:
+            if score < min_score:
+                break
+            keywords.append({
+                "keyword": word,
+                "confidence_score": round(score, 4),
+                "extraction_method": "tfidf",
+                "keyword_type": "general",
+                "frequency": freq
+            })
+        
+        return keywords
+    
     def extract_technical_terms(self, text: str) -> List[Dict]:
         """提取技术术语"""
         technical_terms = []
@@ -174,31 +370,40 @@ class ContentProcessor:
     
     def extract_ai_keywords(self, text: str) -> List[Dict]:
         """提取AI相关关键词"""
-        text_lower = text.lower()
-        ai_keywords = []
+        hits = KeywordMatcher.group_hits(self.analysis_matcher.find_all(text.lower()))
+        return self._ai_keywords_from_hits(hits.get("ai", []))
+    
+    def _ai_keywords_from_hits(self, hits: List[KeywordHit]) -> List[Dict]:
+        """由AI词典的全部命中生成关键词 (词频、位置均取自命中位置，无需再次扫描文本)"""
+        occurrences: Dict[tuple, List[KeywordHit]] = {}
+        for hit in hits:
+            occurrences.setdefault((hit.category_index, hit.keyword_index), []).append(hit)
         
-        for category, keywords in AI_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    # 计算词频
-                    frequency = text_lower.count(keyword.lower())
-                    
-                    # 判断位置
-                    position = "content"
-                    if keyword.lower() in text[:100].lower():  # 前100个字符
-                        position = "title"
-                    elif keyword.lower() in text[:100].lower() and keyword.lower() in text[100:].lower():
-                        position = "both"
-                    
-                    ai_keywords.append({
-                        "keyword": keyword,
-                        "category": category,
-                        "confidence_score": min(0.9, 0.5 + frequency * 0.1),
-                        "extraction_method": "dictionary",
-                        "keyword_type": "ai_concept",
-                        "frequency": frequency,
-                        "position": position
-                    })
+        ai_keywords = []
+        for key in sorted(occurrences):
+            keyword_hits = sorted(occurrences[key], key=lambda h: h.start)
+            first = keyword_hits[0]
+            
+            # 计算词频 (不重叠计数，与 str.count 一致)
+            frequency = 0
+            last_end = -1
+            for hit in keyword_hits:
+                if hit.start >= last_end:
+                    frequency += 1
+                    last_end = hit.end
+            
+            # 判断位置 (出现在前100个字符内视为标题)
+            position = "title" if first.end <= 100 else "content"
+            
+            ai_keywords.append({
+                "keyword": first.keyword,
+                "category": first.category,
+                "confidence_score": min(0.9, 0.5 + frequency * 0.1),
+                "extraction_method": "dictionary",
+                "keyword_type": "ai_concept",
+                "frequency": frequency,
+                "position": position
+            })
         
         return ai_keywords
     
@@ -218,28 +423,11 @@ class ContentProcessor:
         
         return text
     
-    def extract_all_keywords(self, title: str, content: str) -> List[Dict]:
-        """提取所有类型的关键词"""
-        full_text = title + " " + content
-        
-        all_keywords = []
-        
-        # 1. 提取AI关键词
-        ai_keywords = self.extract_ai_keywords(full_text)
-        all_keywords.extend(ai_keywords)
-        
-        # 2. 提取技术术语
-        technical_terms = self.extract_technical_terms(full_text)
-        all_keywords.extend(technical_terms)
-        
-        # 3. 提取TF-IDF关键词
-        tfidf_keywords = self.extract_keywords_tfidf(full_text)
-        all_keywords.extend(tfidf_keywords)
-        
-        # 去重和排序
-        unique_keywords = self._deduplicate_keywords(all_keywords)
-        
-        return unique_keywords
+    def extract_all_keywords(self, title: str, content: str,
+                             analysis: Optional[PostAnalysis] = None) -> List[Dict]:
+        """提取所有类型的关键词 (AI关键词、技术术语、词频关键词，去重并按置信度排序)"""
+        analysis = self.with_keywords(analysis or self.analyze(title, content), title, content)
+        return [dict(keyword) for keyword in analysis.keywords]
     
     def _deduplicate_keywords(self, keywords: List[Dict]) -> List[Dict]:
         """去重关键词"""
@@ -261,43 +449,22 @@ class ContentProcessor:
         
         return result
     
-    def classify_content(self, title: str, content: str) -> Dict:
-        """对内容进行分类"""
-        full_text = (title + " " + content).lower()
-        
-        # 内容类型分类
-        content_types = {
-            "研究论文": ["paper", "arxiv", "research", "study", "analysis", "survey", "review"],
-            "工具资源": ["tool", "library", "framework", "api", "model", "github", "code", "implementation"],
-            "应用案例": ["use case", "application", "demo", "project", "example", "tutorial"],
-            "行业动态": ["news", "announcement", "release", "update", "company", "industry"]
+    def classify_content(self, title: str, content: str,
+                         analysis: Optional[PostAnalysis] = None) -> Dict:
+        """对内容进行分类 (返回可修改的副本)"""
+        analysis = analysis or self.analyze(title, content, extract_keywords=False)
+        classification = dict(analysis.classification)
+        classification["secondary_categories"] = list(classification["secondary_categories"])
+        classification["tech_stack"] = {
+            key: list(values) for key, values in classification["tech_stack"].items()
         }
-        
-        # AI技术分类
-        ai_categories = {
-            "LLM": ["llm", "large language model", "gpt", "bert", "transformer", "language model"],
-            "计算机视觉": ["computer vision", "cv", "image", "visual", "object detection", "segmentation"],
-            "自然语言处理": ["nlp", "natural language", "text", "sentiment", "translation"],
-            "机器学习": ["machine learning", "ml", "supervised", "unsupervised", "classification"],
-            "深度学习": ["deep learning", "neural network", "cnn", "rnn", "lstm"],
-            "强化学习": ["reinforcement learning", "rl", "policy", "reward", "agent"],
-            "生成式AI": ["generative", "generation", "diffusion", "gan", "stable diffusion"],
-            "AGI": ["agi", "artificial general intelligence", "reasoning", "consciousness"]
-        }
-        
-        # 分类评分
-        content_scores = {}
-        ai_scores = {}
-        
-        for category, keywords in content_types.items():
-            score = sum(1 for keyword in keywords if keyword in full_text)
-            if score > 0:
-                content_scores[category] = score
-        
-        for category, keywords in ai_categories.items():
-            score = sum(1 for keyword in keywords if keyword in full_text)
-            if score > 0:
-                ai_scores[category] = score
+        return classification
+    
+    def _classify_from_matches(self, matches: Dict[str, List[KeywordHit]]) -> Dict:
+        """根据各分类词典的命中生成分类结果"""
+        # 分类评分 (每个命中的关键词计1分)
+        content_scores = self._category_scores(matches["content_type"])
+        ai_scores = self._category_scores(matches["ai_category"])
         
         # 确定主要分类
         primary_content_type = max(content_scores.items(), key=lambda x: x[1])[0] if content_scores else "其他"
@@ -313,12 +480,20 @@ class ContentProcessor:
             "content_type": primary_content_type,
             "confidence_score": (content_confidence + ai_confidence) / 2,
             "classification_model": "rule_based",
-            "tech_stack": self._extract_tech_stack(full_text),
-            "application_domain": self._determine_application_domain(full_text),
-            "complexity_level": self._assess_complexity(full_text)
+            "tech_stack": self._extract_tech_stack(matches["tech_stack"]),
+            "application_domain": self._determine_application_domain(matches["domain"]),
+            "complexity_level": self._assess_complexity(matches["complexity"])
         }
     
-    def _extract_tech_stack(self, text: str) -> Dict:
+    @staticmethod
+    def _category_scores(matches: List[KeywordHit]) -> Dict[str, int]:
+        """统计每个分类命中的关键词数量 (按词典顺序)"""
+        scores: Dict[str, int] = {}
+        for hit in matches:
+            scores[hit.category] = scores.get(hit.category, 0) + 1
+        return scores
+    
+    def _extract_tech_stack(self, matches: List[KeywordHit]) -> Dict:
         """提取技术栈信息"""
         tech_stack = {
             "frameworks": [],
@@ -327,60 +502,23 @@ class ContentProcessor:
             "tools": []
         }
         
-        # 框架检测
-        frameworks = ["pytorch", "tensorflow", "jax", "keras", "scikit-learn", "hugging face"]
-        for framework in frameworks:
-            if framework in text:
-                tech_stack["frameworks"].append(framework)
-        
-        # 编程语言检测
-        languages = ["python", "javascript", "r", "julia", "c++", "java"]
-        for lang in languages:
-            if lang in text:
-                tech_stack["languages"].append(lang)
-        
-        # 平台检测
-        platforms = ["aws", "azure", "gcp", "google cloud", "nvidia", "cuda"]
-        for platform in platforms:
-            if platform in text:
-                tech_stack["platforms"].append(platform)
+        # 框架、编程语言、平台检测
+        for hit in matches:
+            tech_stack[hit.category].append(hit.keyword)
         
         return tech_stack
     
-    def _determine_application_domain(self, text: str) -> str:
+    def _determine_application_domain(self, matches: List[KeywordHit]) -> str:
         """确定应用领域"""
-        domains = {
-            "医疗健康": ["medical", "healthcare", "diagnosis", "drug", "patient"],
-            "自动驾驶": ["autonomous", "driving", "vehicle", "car", "transportation"],
-            "金融科技": ["finance", "fintech", "trading", "banking", "risk"],
-            "教育": ["education", "learning", "student", "teaching", "course"],
-            "娱乐": ["gaming", "entertainment", "music", "art", "creative"],
-            "企业应用": ["business", "enterprise", "productivity", "workflow"],
-            "科研": ["research", "academic", "scientific", "experiment"]
-        }
-        
-        for domain, keywords in domains.items():
-            if any(keyword in text for keyword in keywords):
-                return domain
-        
-        return "通用应用"
+        return matches[0].category if matches else "通用应用"
     
-    def _assess_complexity(self, text: str) -> str:
+    def _assess_complexity(self, matches: List[KeywordHit]) -> str:
         """评估技术复杂度"""
-        complexity_indicators = {
-            "high": ["sota", "state-of-the-art", "novel", "breakthrough", "advanced", "complex"],
-            "medium": ["improved", "enhanced", "optimized", "efficient", "practical"],
-            "low": ["simple", "basic", "easy", "tutorial", "beginner", "introduction"]
-        }
-        
-        for level, indicators in complexity_indicators.items():
-            if any(indicator in text for indicator in indicators):
-                return level
-        
-        return "medium"
+        return matches[0].category if matches else "medium"
     
-    def calculate_quality_score(self, post_data: Dict) -> float:
-        """计算内容质量评分"""
+    def calculate_quality_score(self, post_data: Dict,
+                                analysis: Optional[PostAnalysis] = None) -> float:
+        """计算内容质量评分 (可传入已有的分析结果，避免重复扫描文本)"""
         score = 0.0
         
         # 基础指标 (40分)
@@ -397,15 +535,14 @@ class ContentProcessor:
         score += 5 if post_data.get("url") else 0  # 是否有外部链接
         
         # AI相关性 (20分)
-        title = post_data.get("title", "")
-        content = post_data.get("selftext", "")
-        is_ai, category, keywords = self.is_ai_related(title, content)
+        if analysis is None:
+            analysis = self.analyze(post_data.get("title", ""), post_data.get("selftext", ""),
+                                    extract_keywords=False)
         
-        if is_ai:
-            score += 15 + min(5, len(keywords))  # AI相关性基础分 + 关键词数量
+        if analysis.is_ai_related:
+            score += 15 + min(5, len(analysis.matched_keywords))  # AI相关性基础分 + 关键词数量
         
         # 时效性 (10分)
-        import time
         post_age_hours = (time.time() - post_data.get("created_utc", 0)) / 3600
         if post_age_hours < 24:
             score += 10
@@ -414,6 +551,165 @@ class ContentProcessor:
         
         return min(100.0, score)
 
+    def process_batch(self, posts: Dict[str, Sequence], extract_keywords: bool = False) -> Dict[str, List]:
+        """
+        批量 (列式) 计算质量评分、时间加权和内容分类，用于存量数据回填与重新处理
+        posts: 列式输入，各列等长
+            必需: "titles", "bodies", "scores", "num_comments", "created_utc"
+            可选: "upvote_ratios" (默认0.5), "has_url" (默认否),
+                  "reference_times" (计算帖子年龄的参考时间，默认当前时间；
+                  重新处理存量数据时传入采集时间，使时效分与入库时一致)
+        文本匹配共用同一个关键词自动机 (每帖扫描一次)，数值部分使用 NumPy 向量化计算，
+        未安装 NumPy 时逐帖计算，结果一致
+        extract_keywords: 同时提取关键词 (结果增加 "keywords" 列)
+        返回: 列式结果 {"is_ai_related", "quality_score", "tech_relevance_score",
+                        "ai_category", "content_category", "classifications"}
+        """
+        titles = [title or "" for title in posts["titles"]]
+        bodies = [body or "" for body in posts["bodies"]]
+        count = len(titles)
+        now = time.time()
+        
+        def column(name: str, default) -> List:
+            values = posts.get(name)
+            if values is None:
+                return [default] * count
+            return [default if value is None else value for value in values]
+        
+        scores = column("scores", 0)
+        num_comments = column("num_comments", 0)
+        upvote_ratios = column("upvote_ratios", 0.5)
+        has_url = [bool(value) for value in column("has_url", False)]
+        created_utc = column("created_utc", 0)
+        reference_times = column("reference_times", now)
+        
+        # 文本分析 (分类与AI相关性)，默认不做关键词提取
+        analyses = [
+            self.analyze(title, body, extract_keywords=extract_keywords)
+            for title, body in zip(titles, bodies)
+        ]
+        ai_points = [
+            15 + min(5, len(analysis.matched_keywords)) if analysis.is_ai_related else 0
+            for analysis in analyses
+        ]
+        
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+            self.logger.warning("未安装 NumPy，批量评分将逐帖计算")
+        
+        if np is not None:
+            quality, weighted = self._batch_scores_numpy(
+                np, titles, bodies, scores, num_comments, upvote_ratios, has_url,
+                created_utc, reference_times, ai_points
+            )
+        else:
+            quality, weighted = self._batch_scores_python(
+                titles, bodies, scores, num_comments, upvote_ratios, has_url,
+                created_utc, reference_times, ai_points
+            )
+        
+        result = {
+            "is_ai_related": [analysis.is_ai_related for analysis in analyses],
+            "quality_score": quality,
+            "tech_relevance_score": [min(10.0, value / 10) for value in weighted],
+            "ai_category": [analysis.classification["primary_category"] for analysis in analyses],
+            "content_category": [analysis.classification["content_type"] for analysis in analyses],
+            "classifications": [
+                self.classify_content(title, body, analysis)
+                for title, body, analysis in zip(titles, bodies, analyses)
+            ]
+        }
+        if extract_keywords:
+            result["keywords"] = [[dict(keyword) for keyword in analysis.keywords] for analysis in analyses]
+        
+        return result
+    
+    def _batch_scores_numpy(self, np, titles, bodies, scores, num_comments, upvote_ratios,
+                            has_url, created_utc, reference_times, ai_points) -> Tuple[List[float], List[float]]:
+        """NumPy 向量化计算质量评分与时间加权评分 (与 calculate_quality_score / calculate_time_quality_score 一致)"""
+        from time_filter_config import TIME_FILTER_CONFIG, TIME_QUALITY_WEIGHTS
+        
+        created = np.asarray(created_utc, dtype=np.float64)
+        age_hours = (np.asarray(reference_times, dtype=np.float64) - created) / 3600
+        
+        # 质量评分: 基础指标 + 内容质量 + AI相关性 + 时效性
+        score = np.minimum(20, np.asarray(scores, dtype=np.float64) / 10)
+        score = score + np.minimum(10, np.asarray(num_comments, dtype=np.float64) / 5)
+        score = score + np.asarray(upvote_ratios, dtype=np.float64) * 10
+        score = score + np.minimum(10, np.fromiter((len(t) for t in titles), np.float64, len(titles)) / 10)
+        score = score + np.minimum(15, np.fromiter((len(b) for b in bodies), np.float64, len(bodies)) / 100)
+        score = score + np.where(np.asarray(has_url, dtype=bool), 5, 0)
+        score = score + np.asarray(ai_points, dtype=np.float64)
+        score = score + np.select([age_hours < 24, age_hours < 72], [10, 5], 0)
+        quality = np.minimum(100.0, score)
+        
+        # 时间加权: 按帖子年龄分档的权重 x 高峰时段权重，超过30天为0
+        recency = TIME_QUALITY_WEIGHTS["recency_bonus"]
+        age_days = age_hours / 24
+        recency_weight = np.select(
+            [age_hours < 6, age_hours < 24, age_days < 3, age_days < 7, age_days < 30],
+            [recency["0-6h"], recency["6-24h"], recency["1-3d"], recency["3-7d"], recency["7-30d"]],
+            0
+        )
+        post_hour = np.floor(created / 3600) % 24
+        priority = TIME_QUALITY_WEIGHTS["collection_priority"]
+        priority_weight = np.where(
+            np.isin(post_hour, TIME_FILTER_CONFIG["peak_hours"]),
+            priority["peak_hours"], priority["normal_hours"]
+        )
+        weighted = quality * recency_weight * priority_weight
+        
+        return quality.tolist(), weighted.tolist()
+    
+    def _batch_scores_python(self, titles, bodies, scores, num_comments, upvote_ratios,
+                             has_url, created_utc, reference_times, ai_points) -> Tuple[List[float], List[float]]:
+        """逐帖计算质量评分与时间加权评分 (未安装 NumPy 时使用)"""
+        from time_filter_config import TIME_FILTER_CONFIG, TIME_QUALITY_WEIGHTS
+        
+        recency = TIME_QUALITY_WEIGHTS["recency_bonus"]
+        priority = TIME_QUALITY_WEIGHTS["collection_priority"]
+        
+        quality, weighted = [], []
+        for i in range(len(titles)):
+            age_hours = (reference_times[i] - created_utc[i]) / 3600
+            
+            score = min(20, scores[i] / 10)
+            score += min(10, num_comments[i] / 5)
+            score += upvote_ratios[i] * 10
+            score += min(10, len(titles[i]) / 10)
+            score += min(15, len(bodies[i]) / 100)
+            score += 5 if has_url[i] else 0
+            score += ai_points[i]
+            if age_hours < 24:
+                score += 10
+            elif age_hours < 72:
+                score += 5
+            score = min(100.0, score)
+            
+            age_days = age_hours / 24
+            if age_hours < 6:
+                recency_weight = recency["0-6h"]
+            elif age_hours < 24:
+                recency_weight = recency["6-24h"]
+            elif age_days < 3:
+                recency_weight = recency["1-3d"]
+            elif age_days < 7:
+                recency_weight = recency["3-7d"]
+            elif age_days < 30:
+                recency_weight = recency["7-30d"]
+            else:
+                recency_weight = 0
+            
+            post_hour = int(created_utc[i] // 3600) % 24
+            priority_weight = priority["peak_hours"] if post_hour in TIME_FILTER_CONFIG["peak_hours"] else priority["normal_hours"]
+            
+            quality.append(score)
+            weighted.append(score * recency_weight * priority_weight)
+        
+        return quality, weighted
+
 if __name__ == "__main__":
     # 测试内容处理器
     processor = ContentProcessor()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cloudflare D1 HTTP 传输层
+为数据库管理器提供带连接池和 keep-alive 的共享会话，并统计连接复用情况
+"""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+class D1HttpTransport:
+    """D1 REST API 连接池传输层 (每个数据库管理器实例一个)"""
+    
+    def __init__(self, headers: Dict[str, str], pool_connections: int = 4,
+                 pool_maxsize: int = 8, keep_alive: bool = True, timeout: int = 30):
+        # requests 在创建传输层时才导入，缩短不访问D1的命令的启动时间
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        
+        # 按主机复用连接: pool_connections 为主机池数量, pool_maxsize 为每个主机的连接上限
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False
+        )
+        
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.headers.update(headers)
+        
+        if not keep_alive:
+            # 关闭 keep-alive 时每个请求都会重新握手
+            self.session.headers["Connection"] = "close"
+        
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._error_count = 0
+    
+    def post(self, url: str, payload: Dict, timeout: Optional[int] = None) -> "requests.Response":
+        """发送 POST 请求 (复用连接池中的连接)"""
+        with self._lock:
+            self._request_count += 1
+        
+        try:
+            return self.session.post(url, json=payload, timeout=timeout or self.timeout)
+        except Exception:
+            with self._lock:
+                self._error_count += 1
+            raise
+    
+    def get_stats(self) -> Dict:
+        """获取连接复用统计 (新建连接数即 TLS 握手次数)"""
+        new_connections = 0
+        pooled_requests = 0
+        
+        # urllib3 连接池自带计数: num_connections 为新建连接数, num_requests 为经过该池的请求数
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            new_connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        
+        reused_connections = max(0, pooled_requests - new_connections)
+        
+        return {
+            "requests": self._request_count,
+            "errors": self._error_count,
+            "new_connections": new_connections,
+            "reused_connections": reused_connections,
+            "reuse_rate": round(reused_connections / pooled_requests, 3) if pooled_requests else 0.0,
+            "keep_alive": self.keep_alive
+        }
+    
+    def close(self):
+        """关闭会话并释放连接池"""
+        self.session.close()
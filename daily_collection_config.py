@@ -218,6 +218,55 @@ AI_KEYWORDS = {
     ]
 }
 
+# ============================================
+# 关键词匹配配置
+# ============================================
+
+KEYWORD_MATCHING_CONFIG = {
+    "match_mode": "word",          # word: 短关键词整词匹配; substring: 全部按子串匹配 (旧逻辑)
+    "word_boundary_max_length": 5, # 长度不超过该值的关键词需整词匹配 ("ai" 不再命中 "said")
+    "allow_plural_suffix": True,   # 整词匹配时允许复数后缀 ("agents"、"llms")
+    "allowed_suffixes": ["ops", "ic"],            # 整词匹配时允许的其他后缀 ("mlops"、"agentic")
+    "allowed_prefixes": ["gen", "open", "multi"], # 整词匹配时允许的前缀 ("genai"、"openai"、"multiagent")
+}
+
+# ============================================
+# 文本处理配置
+# ============================================
+
+TEXT_PROCESSING_CONFIG = {
+    "stopwords_source": "builtin", # builtin: 内置停用词表; nltk: 本地NLTK语料 (不可用时回退到内置)
+}
+
+# 语料级 TF-IDF 索引 (帖子写入后增量更新文档频率)
+TFIDF_CONFIG = {
+    "enabled": True,               # 启用文档频率索引 (关闭时回退为单帖词频统计)
+    "index_path": "data/tfidf_index.json", # 索引快照路径 (相对项目目录)，追加日志为 .log 后缀
+    "min_documents": 50,           # 索引文档数达到该值后才使用 TF-IDF
+    "max_terms": 50000,            # 压缩后保留的最大词项数
+    "compact_every": 500,          # 日志累计文档数达到该值时压缩
+    "min_df_on_compact": 2,        # 压缩时丢弃文档频率低于该值的词项
+    "min_score": 0.1,              # 归一化 TF-IDF 低于该值的词项不作为关键词
+}
+
+# 近似重复检测 (SimHash 指纹，拒绝以不同ID重复发布的同一内容)
+NEAR_DUPLICATE_CONFIG = {
+    "enabled": True,               # 启用近似重复检测
+    "index_path": "data/near_duplicate_index.json", # 指纹持久化路径 (相对项目目录)
+    "window_days": 7,              # 指纹保留天数 (滚动窗口)
+    "max_distance": 7,             # 判定为近似重复的最大汉明距离 (64位指纹，短帖改动几个词约为4-7)
+    "bands": 8,                    # LSH 分段数 (需大于 max_distance，保证召回)
+    "min_features": 4,             # 特征数少于该值的短帖不参与检测
+    "url_weight": 4,               # 规范化URL特征的权重
+    "max_text_chars": 5000,        # 参与计算的正文最大字符数
+}
+
+# 外链目标索引 (同一论文/仓库/视频的转发帖只采集一次)
+LINK_INDEX_CONFIG = {
+    "enabled": True,               # 启用外链去重
+    "preload_days": 30,            # 会话开始时从D1预加载最近几天已采集帖子的链接
+}
+
 # ============================================
 # 质量评估配置
 # ============================================
@@ -252,11 +301,59 @@ DAILY_TASK_CONFIG = {
 DATABASE_CONFIG = {
     "enable_daily_dedup": True,    # 启用每日去重
     "dedup_method": "unique_constraint",  # 去重方法
-    "batch_insert_size": 50,       # 批量插入大小
+    "batch_insert_size": 50,       # 批量插入大小 (单条多行INSERT最大行数，另受D1绑定参数上限约束)
+    "max_statements_per_request": 50, # 单次批量请求最大语句数
+    "seen_ids_preload_days": 0,    # 会话开始时预加载已采集ID的天数 (0 表示仅今日)
+    "enable_write_behind": True,   # 启用写后缓冲队列 (后台线程批量写入)
+    "write_queue_size": 100,       # 写后队列容量 (队列满时采集线程等待)
+    "write_batch_size": 20,        # 每次刷新的帖子数
+    "write_flush_interval": 5,     # 最长刷新间隔(秒)
+    "write_flush_retries": 2,      # 批量写入异常时的重试次数
+    "write_retry_backoff": 1.0,    # 首次重试等待秒数 (之后每次翻倍)
     "connection_timeout": 30,      # 连接超时时间
     "retry_on_conflict": True,     # 冲突时重试
 }
 
+# ============================================
+# 并发采集配置
+# ============================================
+
+CONCURRENCY_CONFIG = {
+    "enable_concurrent": True,     # 启用多子版块并发采集
+    "max_workers": 4,              # 并发采集线程数
+    "reddit_requests_per_minute": 60, # Reddit OAuth 请求预算 (所有线程共享)
+    "reddit_burst": 5,             # 令牌桶突发容量
+}
+
+# ============================================
+# 多进程文本分析配置 (存量数据重新处理)
+# ============================================
+
+NLP_PIPELINE_CONFIG = {
+    "workers": 0,                  # 工作进程数 (0 = CPU核数，1 = 当前进程内处理)
+    "chunk_size": 200,             # 每个任务分块的帖子数
+    "max_inflight_chunks": 0,      # 同时提交的最大分块数 (0 = 工作进程数 x 2)
+    "start_method": None,          # 进程启动方式 (None = 平台默认，可选 fork/spawn/forkserver)
+    "use_tfidf_index": True,       # 工作进程加载只读的文档频率索引提取关键词
+}
+
+# ============================================
+# 数据导出配置
+# ============================================
+
+EXPORT_CONFIG = {
+    "export_dir": "exports",       # 导出目录 (相对项目目录，也可为绝对路径)
+    "page_size": 500,              # 键集分页每页读取的帖子数
+    "columnar_compression": "zstd",  # Parquet/Arrow 导出的压缩算法 (zstd/lz4/snappy/gzip/none)
+    "gzip_level": 6,               # ndjson.gz 导出的 gzip 压缩级别 (1-9)
+    "zstd_level": 3,               # ndjson.zst 导出的 zstd 压缩级别 (1-22)
+    "settle_seconds": 60,          # 增量导出只包含多少秒之前采集的帖子 (等待同一时刻的写入完成)
+    "shard_workers": 4,            # 分片并发导出的线程数
+    "shard_retries": 2,            # 单个分片失败后的重试次数
+    "d1_requests_per_minute": 200, # 分片并发导出的D1查询预算 (所有分片线程共享)
+    "d1_burst": 4,                 # D1查询令牌桶突发容量
+}
+
 # ============================================
 # 工具函数
 # ============================================
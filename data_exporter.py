@@ -3,22 +3,94 @@
 """
 数据导出工具 - 将所有时间戳转换为北京时间格式
 用于查看和导出数据库中的数据，时间戳自动转换为可读的北京时间
+导出按键集分页逐页读取D1，经生成器逐条格式化并写入文件，内存占用与导出规模无关
 """
 
+import io
+import os
+import gzip
 import json
 import csv
+import time
+import threading
 import pytz
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 from database_manager import D1DatabaseManager
+from rate_limiter import TokenBucket
+from daily_collection_config import EXPORT_CONFIG
+
+# 采集日期 (UTC) 表达式，与生成列 crawl_date 的定义及采集日期索引的表达式一致；
+# 按生成列过滤无法使用表达式索引
+CRAWL_DATE_SQL = "date(crawl_timestamp, 'unixepoch')"
+
+# 需要转换为北京时间的时间字段
+TIME_FIELDS = ['created_utc', 'crawl_timestamp', 'processed_at', 'last_updated']
+
+# 帖子表可导出的字段及其列式导出类型
+# string: 文本; dictionary: 字典编码文本 (取值重复度高); int64/float64/bool: 数值;
+# timestamp: Unix 时间戳 (导出为带北京时区的时间戳列)
+POST_EXPORT_COLUMNS = {
+    "id": "string",
+    "permalink": "string",
+    "url": "string",
+    "title": "string",
+    "selftext": "string",
+    "selftext_html": "string",
+    "score": "int64",
+    "upvote_ratio": "float64",
+    "num_comments": "int64",
+    "total_awards_received": "int64",
+    "num_crossposts": "int64",
+    "author": "string",
+    "subreddit": "dictionary",
+    "subreddit_subscribers": "int64",
+    "created_utc": "timestamp",
+    "quality_score": "float64",
+    "content_category": "dictionary",
+    "tech_relevance_score": "float64",
+    "ai_category": "dictionary",
+    "processed_at": "timestamp",
+    "extraction_status": "dictionary",
+    "last_updated": "timestamp",
+    "is_self": "bool",
+    "is_video": "bool",
+    "over_18": "bool",
+    "locked": "bool",
+    "stickied": "bool",
+    "crawl_timestamp": "timestamp",
+    "crawl_date": "dictionary",
+    "crawl_source": "dictionary",
+    "api_version": "dictionary",
+}
+
+# 列式导出格式 (需要 pyarrow)
+COLUMNAR_FORMATS = {"parquet", "arrow"}
+
+# NDJSON 导出格式 -> 压缩方式 (zst 需要 zstandard)
+NDJSON_FORMATS = {"ndjson": None, "ndjson.gz": "gz", "ndjson.zst": "zst"}
+
+# 支持的全部导出格式 (格式名即文件扩展名)
+EXPORT_FORMATS = {"json", "csv"} | set(NDJSON_FORMATS) | COLUMNAR_FORMATS
 
 class DataExporter:
     """数据导出器 - 自动转换时间格式"""
     
-    def __init__(self):
+    def __init__(self, export_dir: Optional[str] = None, page_size: Optional[int] = None):
+        """
+        export_dir: 导出目录，默认读取 EXPORT_CONFIG (相对路径相对项目目录)
+        page_size: 键集分页每页读取的帖子数
+        """
         self.db = D1DatabaseManager()
         self.beijing_tz = pytz.timezone('Asia/Shanghai')
         self.utc_tz = pytz.UTC
+        
+        export_dir = export_dir or EXPORT_CONFIG.get("export_dir", "exports")
+        if not os.path.isabs(export_dir):
+            export_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), export_dir)
+        self.export_dir = export_dir
+        self.page_size = max(1, page_size or EXPORT_CONFIG.get("page_size", 500))
     
     def convert_timestamp_to_beijing(self, timestamp: int) -> str:
         """将时间戳转换为北京时间字符串"""
@@ -35,185 +107,785 @@ class DataExporter:
     
     def format_post_data(self, post: Dict) -> Dict:
         """格式化单个帖子数据，转换时间戳"""
-        formatted_post = post.copy()
-        
-        # 转换时间字段
-        time_fields = ['created_utc', 'crawl_timestamp', 'processed_at', 'last_updated']
-        
-        for field in time_fields:
-            if field in formatted_post and formatted_post[field]:
+        return self._format_in_place(post.copy())
+    
+    def _format_in_place(self, post: Dict) -> Dict:
+        """原地转换时间字段 (流式导出中每行只使用一次，无需复制)"""
+        for field in TIME_FIELDS:
+            if field in post and post[field]:
                 # 保留原始时间戳（添加_raw后缀）
-                formatted_post[f"{field}_raw"] = formatted_post[field]
+                post[f"{field}_raw"] = post[field]
                 # 转换为北京时间
-                formatted_post[f"{field}_beijing"] = self.convert_timestamp_to_beijing(formatted_post[field])
+                post[f"{field}_beijing"] = self.convert_timestamp_to_beijing(post[field])
                 # 替换原字段为可读格式
-                formatted_post[field] = formatted_post[f"{field}_beijing"]
+                post[field] = post[f"{field}_beijing"]
         
-        return formatted_post
+        return post
     
-    def export_posts_today(self, format_type: str = 'json') -> str:
-        """导出今日采集的帖子数据"""
-        # 获取今日数据
-        today = datetime.now(self.beijing_tz).strftime('%Y-%m-%d')
+    def iter_posts(self, where: str = "", params: Optional[List] = None,
+                   order_by: Optional[List[str]] = None, descending: bool = False,
+                   limit: Optional[int] = None, columns: str = "*",
+                   page_size: Optional[int] = None, after: Optional[List] = None,
+                   cursor: Optional[List] = None, rate_budget: Optional[TokenBucket] = None,
+                   nullable: bool = False) -> Iterator[Dict]:
+        """
+        按键集分页逐页读取帖子 (不使用 OFFSET)
+        where 中的等值条件与排序列恰好构成某个 (..., 排序列, id) 索引时，每页是一次索引范围扫描，
+        代价只与页大小有关；排序列为表达式或没有对应索引时，每页仍需扫描并排序全部匹配行
+        where: 过滤条件 (不含 WHERE 关键字)
+        order_by: 排序列 (原始列，以便使用索引)，自动追加 id 作为唯一的最终排序键
+        descending: 所有排序键统一降序
+        limit: 最多返回的帖子数
+        after: 起始排序键 (order_by 各键取值加 id)，只返回排在其后的帖子
+        cursor: 传入列表时，每返回一行即更新为该行的排序键 (可作为下次的 after 断点)
+        rate_budget: 共享的D1请求预算，每页查询前获取一个令牌 (并发导出时使用)
+        nullable: 排序列可能为 NULL (只支持单个排序列)；NULL 不满足行值比较，
+                  先返回排序列非 NULL 的帖子，再按 id 返回排序列为 NULL 的帖子，
+                  后一段的排序键为 [None, id]
+        查询失败时抛出 RuntimeError
+        """
+        params = list(params or [])
+        keys = list(order_by or [])
+        page_size = max(1, page_size or self.page_size)
         
-        sql = """
-        SELECT * FROM reddit_ai_posts 
-        WHERE crawl_date = ? 
-        ORDER BY score DESC
+        segments = [(where, keys, after)]
+        if nullable:
+            if len(keys) != 1:
+                raise ValueError("nullable 只支持单个排序列")
+            conditions = [f"({where})"] if where else []
+            not_null = " AND ".join(conditions + [f"{keys[0]} IS NOT NULL"])
+            is_null = " AND ".join(conditions + [f"{keys[0]} IS NULL"])
+            if after and after[0] is None:
+                segments = [(is_null, [], after[1:])]
+            else:
+                segments = [(not_null, keys, after), (is_null, [], None)]
+        
+        returned = 0
+        for segment_where, segment_keys, segment_after in segments:
+            rows = self._iter_keyset_pages(
+                segment_where, params, segment_keys + ["id"], descending,
+                None if limit is None else limit - returned, columns, page_size, segment_after, rate_budget
+            )
+            for row, key in rows:
+                if cursor is not None:
+                    cursor[:] = [None] * (len(keys) - len(segment_keys)) + key
+                returned += 1
+                yield row
+            
+            if limit is not None and returned >= limit:
+                return
+    
+    def _iter_keyset_pages(self, where: str, params: List, keys: List[str], descending: bool,
+                           limit: Optional[int], columns: str, page_size: int,
+                           after: Optional[List], rate_budget: Optional[TokenBucket]) -> Iterator[Tuple[Dict, List]]:
+        """键集分页查询 (keys 末尾为 id)，逐行返回 (帖子, 排序键)"""
+        key_columns = ", ".join(f"{column} AS _key{i}" for i, column in enumerate(keys))
+        key_tuple = "(" + ", ".join(keys) + ")"
+        direction = "DESC" if descending else "ASC"
+        order_sql = ", ".join(f"{column} {direction}" for column in keys)
+        
+        last_key: Optional[List] = list(after) if after else None
+        returned = 0
+        
+        while limit is None or returned < limit:
+            conditions = [f"({where})"] if where else []
+            query_params = list(params)
+            if last_key is not None:
+                placeholders = ", ".join("?" for _ in keys)
+                conditions.append(f"{key_tuple} {'<' if descending else '>'} ({placeholders})")
+                query_params.extend(last_key)
+            
+            fetch = page_size if limit is None else min(page_size, limit - returned)
+            sql = (f"SELECT {columns}, {key_columns} FROM reddit_ai_posts"
+                   f"{' WHERE ' + ' AND '.join(conditions) if conditions else ''}"
+                   f" ORDER BY {order_sql} LIMIT ?")
+            
+            if rate_budget is not None:
+                rate_budget.acquire()
+            result = self.db.execute_query(sql, query_params + [fetch])
+            if not result.get('success', False):
+                raise RuntimeError(f"查询失败: {result}")
+            
+            rows = result.get('results', [])
+            for row in rows:
+                last_key = [row.pop(f"_key{i}") for i in range(len(keys))]
+                yield row, last_key
+            
+            returned += len(rows)
+            if len(rows) < fetch:
+                break
+    
+    def iter_posts_by_crawl_date(self, start_date: str, end_date: str, columns: str = "*",
+                                 rate_budget: Optional[TokenBucket] = None) -> Iterator[Dict]:
+        """
+        按采集日期 (UTC) 降序、日内按评分降序读取日期范围内的帖子
+        每天单独分页，过滤条件与 (采集日期表达式, score, id) 索引的前两列对应，每页为索引范围扫描；
+        下一个有数据的日期由一次索引查找得到，跳过没有数据的日期
+        日期格式错误时抛出 ValueError
         """
+        first = datetime.strptime(start_date, '%Y-%m-%d').date()
+        current = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        result = self.db.execute_query(sql, [today])
+        while current >= first:
+            if rate_budget is not None:
+                rate_budget.acquire()
+            result = self.db.execute_query(
+                f"SELECT {CRAWL_DATE_SQL} AS crawl_date FROM reddit_ai_posts "
+                f"WHERE {CRAWL_DATE_SQL} BETWEEN ? AND ? ORDER BY {CRAWL_DATE_SQL} DESC LIMIT 1",
+                [first.isoformat(), current.isoformat()]
+            )
+            if not result.get('success', False):
+                raise RuntimeError(f"查询失败: {result}")
+            
+            found = result.get('results', [])
+            if not found:
+                return
+            
+            date = found[0]["crawl_date"]
+            yield from self.iter_posts(
+                where=f"{CRAWL_DATE_SQL} = ?", params=[date], order_by=["score"], descending=True,
+                nullable=True, columns=columns, rate_budget=rate_budget
+            )
+            current = datetime.strptime(date, '%Y-%m-%d').date() - timedelta(days=1)
+    
+    def iter_formatted_posts(self, **query) -> Iterator[Dict]:
+        """逐条读取并格式化帖子 (参数同 iter_posts)"""
+        for post in self.iter_posts(**query):
+            yield self._format_in_place(post)
+    
+    def export_posts_today(self, format_type: str = 'json', columns: Optional[List[str]] = None) -> str:
+        """导出今日 (UTC 采集日期，与 crawl_date 一致) 采集的帖子数据"""
+        today = self._utc_today()
         
-        if not result.get('success', False):
-            return f"查询失败: {result}"
+        query = {"start_date": today, "end_date": today}
+        return self._export(query, f"reddit_ai_posts_{today}", format_type, columns,
+                            f"今日({today} UTC)暂无数据", reader=self.iter_posts_by_crawl_date)
+    
+    @staticmethod
+    def _utc_today() -> str:
+        """
+        今日的采集日期 (YYYY-MM-DD)
+        crawl_date 为 crawl_timestamp 的 UTC 日期，北京时间 0-8 点时与北京日期不同，按采集日期过滤时须使用此日期
+        """
+        return datetime.now(pytz.UTC).strftime('%Y-%m-%d')
+    
+    def export_posts_by_date_range(self, start_date: str, end_date: str, format_type: str = 'json',
+                                   columns: Optional[List[str]] = None) -> str:
+        """导出指定日期范围的帖子数据 (按采集日期降序，日内按评分降序)"""
+        try:
+            self._date_shards(start_date, end_date, "day")
+        except ValueError as e:
+            return f"❌ 导出失败: {e}"
         
-        posts = result.get('results', [])
+        query = {"start_date": start_date, "end_date": end_date}
+        return self._export(query, f"reddit_ai_posts_{start_date}_to_{end_date}", format_type, columns,
+                            f"日期范围({start_date} 到 {end_date})暂无数据",
+                            reader=self.iter_posts_by_crawl_date)
+    
+    def export_top_posts(self, limit: int = 100, format_type: str = 'json',
+                         columns: Optional[List[str]] = None) -> str:
+        """导出评分最高的帖子"""
+        query = {"order_by": ["score"], "descending": True, "nullable": True, "limit": limit}
+        return self._export(query, f"reddit_ai_top_{limit}_posts", format_type, columns, "暂无数据")
+    
+    def export_posts_by_subreddit(self, subreddit: str, format_type: str = 'json',
+                                  columns: Optional[List[str]] = None) -> str:
+        """导出指定社区的帖子数据"""
+        query = {
+            "where": "subreddit = ?", "params": [subreddit],
+            "order_by": ["created_utc"], "descending": True
+        }
+        return self._export(query, f"reddit_ai_{subreddit}_posts", format_type, columns,
+                            f"社区 r/{subreddit} 暂无数据")
+    
+    def append_daily_shard(self, date: Optional[str] = None, format_type: str = 'ndjson.gz') -> str:
+        """
+        增量追加某日的 NDJSON 分片，只写入上次追加之后新采集的帖子
+        date: 采集日期 (YYYY-MM-DD，UTC，与 crawl_date 一致)，默认UTC今日
+        按 (crawl_timestamp, id) 索引分页，日期换算为该UTC日的时间戳范围；
+        分片旁的状态文件记录已写入的最后一个 (crawl_timestamp, id) 及分片大小；
+        追加中断时，下次追加先将分片截断回记录的大小，不会产生残缺或重复的行
+        压缩分片每次追加写入一个新的 gzip 成员/zstd 帧，标准工具可直接连续解压
+        """
+        date = date or self._utc_today()
+        format_type = format_type.lower()
+        if format_type not in NDJSON_FORMATS:
+            return f"❌ 导出失败: 追加模式只支持 {'/'.join(NDJSON_FORMATS)} 格式"
+        try:
+            day_start = int(datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=pytz.UTC).timestamp())
+        except ValueError as e:
+            return f"❌ 导出失败: {e}"
         
-        if not posts:
-            return f"今日({today})暂无数据"
+        os.makedirs(self.export_dir, exist_ok=True)
+        filepath = os.path.join(self.export_dir, f"reddit_ai_posts_{date}.{format_type}")
+        state_path = filepath + ".state.json"
+        state = self._load_json_state(state_path) if os.path.exists(filepath) else None
+        state = state or {"last_key": None, "size": 0, "records": 0}
         
-        # 格式化时间
-        formatted_posts = [self.format_post_data(post) for post in posts]
+        try:
+            # 丢弃上次中断的追加写入的部分
+            if os.path.exists(filepath) and os.path.getsize(filepath) > state["size"]:
+                with open(filepath, 'r+b') as f:
+                    f.truncate(state["size"])
+            
+            # 首次追加从当日零点开始 (id 非空，(零点, "") 之后即零点及以后的帖子)
+            last_key: List = []
+            posts = self.iter_posts(
+                where="crawl_timestamp <= ?",
+                params=[min(day_start + 86399, self._settled_timestamp())],
+                order_by=["crawl_timestamp"], after=state["last_key"] or [day_start, ""], cursor=last_key
+            )
+            
+            formatted = (self._format_in_place(post) for post in posts)
+            total = self._write_ndjson(formatted, filepath, NDJSON_FORMATS[format_type], append=True)
+            if not total:
+                return f"日期 {date} 没有新采集的数据 (分片已有 {state['records']} 条)"
+            
+            state = {
+                "last_key": last_key,
+                "size": os.path.getsize(filepath),
+                "records": state["records"] + total,
+                "updated_at": datetime.now(self.beijing_tz).strftime('%Y-%m-%d %H:%M:%S CST')
+            }
+            self._save_json_state(state_path, state)
+            return f"✅ 成功追加 {total} 条记录到: {filepath} (共 {state['records']} 条)"
         
-        if format_type.lower() == 'csv':
-            return self._export_to_csv(formatted_posts, f"reddit_ai_posts_{today}")
-        else:
-            return self._export_to_json(formatted_posts, f"reddit_ai_posts_{today}")
+        except Exception as e:
+            return f"❌ 导出失败: {e}"
     
-    def export_posts_by_date_range(self, start_date: str, end_date: str, format_type: str = 'json') -> str:
-        """导出指定日期范围的帖子数据"""
-        sql = """
-        SELECT * FROM reddit_ai_posts 
-        WHERE crawl_date BETWEEN ? AND ? 
-        ORDER BY crawl_date DESC, score DESC
+    def export_posts_sharded(self, start_date: str, end_date: str, format_type: str = 'ndjson.gz',
+                             shard_by: str = 'day', columns: Optional[List[str]] = None,
+                             workers: Optional[int] = None) -> str:
+        """
+        分片并发导出日期范围: 按天或按周 (ISO 周) 切分为分片，由有限大小的线程池并发读取，
+        所有分片共享同一个D1请求预算 (令牌桶)，每个分片写入独立文件，并在同一目录生成 manifest.json
+        清单在每个分片完成时更新；以相同参数重新运行时跳过已完成的分片，只重试失败或缺失的分片
         """
+        format_type = format_type.lower()
+        if format_type not in EXPORT_FORMATS:
+            return f"❌ 导出失败: 不支持的格式 {format_type}"
+        if shard_by not in ("day", "week"):
+            return "❌ 导出失败: 分片方式只支持 day/week"
+        try:
+            selected = self.resolve_columns(columns)
+            shards = self._date_shards(start_date, end_date, shard_by)
+        except ValueError as e:
+            return f"❌ 导出失败: {e}"
         
-        result = self.db.execute_query(sql, [start_date, end_date])
+        directory = f"reddit_ai_posts_{start_date}_to_{end_date}_{shard_by}"
+        manifest_path = os.path.join(self.export_dir, directory, "manifest.json")
+        options = {"format": format_type, "shard_by": shard_by, "columns": selected}
         
-        if not result.get('success', False):
-            return f"查询失败: {result}"
+        # 参数一致时沿用已完成的分片
+        previous = self._load_json_state(manifest_path) or {}
+        done = {}
+        if all(previous.get(key) == value for key, value in options.items()):
+            for shard in previous.get("shards", []):
+                if shard.get("status") == "empty" or (
+                        shard.get("status") == "ok"
+                        and os.path.exists(os.path.join(self.export_dir, directory, shard.get("file", "")))):
+                    done[shard["name"]] = shard
         
-        posts = result.get('results', [])
+        manifest = dict(
+            options,
+            start_date=start_date,
+            end_date=end_date,
+            created_at=datetime.now(self.beijing_tz).strftime('%Y-%m-%d %H:%M:%S CST'),
+            shards=[done.get(name, {"name": name, "start_date": first, "end_date": last, "status": "pending"})
+                    for name, first, last in shards]
+        )
+        entries = {shard["name"]: shard for shard in manifest["shards"]}
+        manifest_lock = threading.Lock()
         
-        if not posts:
-            return f"日期范围({start_date} 到 {end_date})暂无数据"
+        def save_manifest():
+            manifest["total_records"] = sum(shard.get("records", 0) for shard in manifest["shards"])
+            manifest["failed_shards"] = [shard["name"] for shard in manifest["shards"]
+                                         if shard["status"] not in ("ok", "empty")]
+            self._save_json_state(manifest_path, manifest)
         
-        # 格式化时间
-        formatted_posts = [self.format_post_data(post) for post in posts]
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with manifest_lock:
+            save_manifest()
         
-        filename = f"reddit_ai_posts_{start_date}_to_{end_date}"
+        rate_budget = TokenBucket(
+            EXPORT_CONFIG.get("d1_requests_per_minute", 200),
+            EXPORT_CONFIG.get("d1_burst", 4)
+        )
+        workers = max(1, workers or EXPORT_CONFIG.get("shard_workers", 4))
+        pending = [(name, first, last) for name, first, last in shards if name not in done]
         
-        if format_type.lower() == 'csv':
-            return self._export_to_csv(formatted_posts, filename)
-        else:
-            return self._export_to_json(formatted_posts, filename)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export-shard") as executor:
+            futures = {
+                executor.submit(self._export_shard, os.path.join(directory, name), first, last,
+                                format_type, selected, rate_budget): name
+                for name, first, last in pending
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                with manifest_lock:
+                    entries[name].update(future.result())
+                    save_manifest()
+        
+        failed = manifest["failed_shards"]
+        summary = (f"{len(shards)} 个分片 (本次导出 {len(pending)}，沿用 {len(done)}，失败 {len(failed)})，"
+                   f"共 {manifest['total_records']} 条记录，清单: {manifest_path}")
+        if failed:
+            return f"⚠️ 分片导出未完成: {summary}\n   失败分片: {', '.join(failed)} (以相同参数重新运行只重试这些分片)"
+        return f"✅ 分片导出完成: {summary}"
     
-    def export_top_posts(self, limit: int = 100, format_type: str = 'json') -> str:
-        """导出评分最高的帖子"""
-        sql = """
-        SELECT * FROM reddit_ai_posts 
-        ORDER BY score DESC 
-        LIMIT ?
+    def _export_shard(self, filename: str, start_date: str, end_date: str, format_type: str,
+                      columns: List[str], rate_budget: TokenBucket) -> Dict:
+        """导出一个日期分片 (失败时按 shard_retries 重试)，返回该分片的清单条目"""
+        retries = EXPORT_CONFIG.get("shard_retries", 2)
+        start_time = time.time()
+        result = ""
+        
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(min(2 ** attempt, 30))
+            
+            posts = self.iter_posts_by_crawl_date(
+                start_date, end_date, columns=", ".join(columns), rate_budget=rate_budget
+            )
+            exported, result = self._write_rows(posts, filename, format_type, columns, "")
+            if not result or result.startswith("✅"):
+                return {
+                    "status": "ok" if exported else "empty",
+                    "file": f"{os.path.basename(filename)}.{format_type}" if exported else None,
+                    "records": exported,
+                    "attempts": attempt + 1,
+                    "seconds": round(time.time() - start_time, 2),
+                    "error": None
+                }
+        
+        return {
+            "status": "failed",
+            "file": None,
+            "records": 0,
+            "attempts": retries + 1,
+            "seconds": round(time.time() - start_time, 2),
+            "error": result
+        }
+    
+    @staticmethod
+    def _date_shards(start_date: str, end_date: str, shard_by: str) -> List[Tuple[str, str, str]]:
+        """
+        切分日期范围，返回 [(分片名, 开始日期, 结束日期), ...]
+        按周切分时以 ISO 周为界 (首尾两周截取到范围内)，分片名如 2024-W05
         """
+        first = datetime.strptime(start_date, '%Y-%m-%d').date()
+        last = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if first > last:
+            raise ValueError(f"开始日期 {start_date} 晚于结束日期 {end_date}")
         
-        result = self.db.execute_query(sql, [limit])
+        shards = []
+        current = first
+        while current <= last:
+            if shard_by == "week":
+                shard_end = min(last, current + timedelta(days=6 - current.weekday()))
+                year, week, _ = current.isocalendar()
+                name = f"{year}-W{week:02d}"
+            else:
+                shard_end = current
+                name = current.isoformat()
+            shards.append((name, current.isoformat(), shard_end.isoformat()))
+            current = shard_end + timedelta(days=1)
+        return shards
+    
+    def export_incremental(self, format_type: str = 'ndjson.gz', columns: Optional[List[str]] = None,
+                           name: str = "reddit_ai_incremental") -> str:
+        """
+        增量导出: 只导出上次增量导出之后新采集的帖子，每次运行生成一个新的编号文件
+        水位线 (最后导出帖子的 crawl_timestamp 与 id) 与文件编号保存在导出目录的
+        <name>.state.json 中，文件写入完成并原子替换后才推进水位线；
+        导出中断后重新运行会从同一水位线以同一编号重写该文件，不会产生重复的行
+        按 (crawl_timestamp, id) 索引分页；crawl_timestamp 为 NULL 的帖子没有采集时间，无法确定
+        其相对水位线的位置，不参与增量导出 (D1 插入时总会赋值，只有手工写入的行可能为 NULL)
+        """
+        format_type = format_type.lower()
+        if format_type not in EXPORT_FORMATS:
+            return f"❌ 导出失败: 不支持的格式 {format_type}"
+        try:
+            selected = self.resolve_columns(columns)
+        except ValueError as e:
+            return f"❌ 导出失败: {e}"
         
-        if not result.get('success', False):
-            return f"查询失败: {result}"
+        os.makedirs(self.export_dir, exist_ok=True)
+        state_path = os.path.join(self.export_dir, f"{name}.state.json")
+        state = self._load_json_state(state_path) or {"watermark": None, "sequence": 1, "total_records": 0}
+        filename = f"{name}_{state['sequence']:06d}"
         
-        posts = result.get('results', [])
+        last_key: List = []
+        posts = self.iter_posts(
+            where="crawl_timestamp IS NOT NULL AND crawl_timestamp <= ?", params=[self._settled_timestamp()],
+            order_by=["crawl_timestamp"], after=state["watermark"],
+            columns=", ".join(selected), cursor=last_key
+        )
         
-        if not posts:
-            return "暂无数据"
+        exported, result = self._write_rows(posts, filename, format_type, selected,
+                                            f"没有新采集的数据 (已增量导出 {state['total_records']} 条)")
+        if not exported or not result.startswith("✅"):
+            return result
         
-        # 格式化时间
-        formatted_posts = [self.format_post_data(post) for post in posts]
+        state = {
+            "watermark": last_key,
+            "sequence": state["sequence"] + 1,
+            "total_records": state["total_records"] + exported,
+            "last_file": f"{filename}.{format_type}",
+            "updated_at": datetime.now(self.beijing_tz).strftime('%Y-%m-%d %H:%M:%S CST')
+        }
+        try:
+            self._save_json_state(state_path, state)
+        except OSError as e:
+            return f"❌ 导出文件已写入，但保存水位线失败 (重新运行将重写同一文件): {e}"
+        return result
+    
+    @staticmethod
+    def _settled_timestamp() -> int:
+        """
+        增量导出的时间上界
+        crawl_timestamp 由D1在插入时赋值，同一秒内可能仍有帖子在写入；
+        只导出 settle_seconds 之前采集的帖子，保证水位线之前不会再出现新行
+        """
+        return int(datetime.now().timestamp()) - EXPORT_CONFIG.get("settle_seconds", 60)
+    
+    def _write_rows(self, posts: Iterable[Dict], filename: str, format_type: str,
+                    columns: List[str], empty_message: str) -> Tuple[int, str]:
+        """
+        写入原始帖子行 (列式格式保留原始类型，其余格式转换时间字段)
+        返回: (写入行数, 结果信息)
+        """
+        exported = 0
         
-        filename = f"reddit_ai_top_{limit}_posts"
+        def rows() -> Iterator[Dict]:
+            nonlocal exported
+            for post in posts:
+                exported += 1
+                yield post if format_type in COLUMNAR_FORMATS else self._format_in_place(post)
         
-        if format_type.lower() == 'csv':
-            return self._export_to_csv(formatted_posts, filename)
-        else:
-            return self._export_to_json(formatted_posts, filename)
+        result = self._export_stream(rows(), filename, format_type, empty_message, columns)
+        return exported, result
     
-    def export_posts_by_subreddit(self, subreddit: str, format_type: str = 'json') -> str:
-        """导出指定社区的帖子数据"""
-        sql = """
-        SELECT * FROM reddit_ai_posts 
-        WHERE subreddit = ? 
-        ORDER BY created_utc DESC
+    @staticmethod
+    def resolve_columns(columns: Optional[List[str]]) -> List[str]:
         """
+        校验字段投影，返回要查询的字段列表 (为空时返回全部字段)
+        未知字段抛出 ValueError
+        """
+        if not columns:
+            return list(POST_EXPORT_COLUMNS)
         
-        result = self.db.execute_query(sql, [subreddit])
+        unknown = [column for column in columns if column not in POST_EXPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"未知字段: {', '.join(unknown)}")
         
-        if not result.get('success', False):
-            return f"查询失败: {result}"
+        # 去重并保持请求的顺序
+        return list(dict.fromkeys(columns))
+    
+    def _export(self, query: Dict, filename: str, format_type: str,
+                columns: Optional[List[str]], empty_message: str,
+                reader: Optional[Callable[..., Iterator[Dict]]] = None) -> str:
+        """
+        按查询条件流式导出
+        columns: 字段投影，只查询和导出这些字段 (同时减小D1响应与导出文件)
+        reader: 读取帖子的方法，query 为其参数 (默认 iter_posts)
+        """
+        reader = reader or self.iter_posts
+        try:
+            selected = self.resolve_columns(columns)
+        except ValueError as e:
+            return f"❌ 导出失败: {e}"
         
-        posts = result.get('results', [])
+        format_type = format_type.lower()
+        if format_type in COLUMNAR_FORMATS:
+            # 列式格式保留原始类型，时间字段由列类型表达时区，无需转换为字符串
+            posts = reader(columns=", ".join(selected), **query)
+            return self._export_stream(posts, filename, format_type, empty_message, selected)
         
-        if not posts:
-            return f"社区 r/{subreddit} 暂无数据"
+        posts = (self._format_in_place(post) for post in reader(columns=", ".join(selected), **query))
+        return self._export_stream(posts, filename, format_type, empty_message)
+    
+    def _export_stream(self, posts: Iterable[Dict], filename: str, format_type: str,
+                       empty_message: str, columns: Optional[List[str]] = None) -> str:
+        """按格式流式写入文件，没有数据时不生成文件并返回 empty_message"""
+        format_type = format_type.lower()
+        if format_type in COLUMNAR_FORMATS:
+            result = self._export_to_columnar(posts, filename, format_type, columns or list(POST_EXPORT_COLUMNS))
+        elif format_type == 'csv':
+            result = self._export_to_csv(posts, filename)
+        elif format_type in NDJSON_FORMATS:
+            result = self._export_to_ndjson(posts, filename, format_type)
+        else:
+            result = self._export_to_json(posts, filename)
         
-        # 格式化时间
-        formatted_posts = [self.format_post_data(post) for post in posts]
+        return empty_message if result is None else result
+    
+    def _open_export_file(self, filename: str, extension: str) -> Tuple[str, str]:
+        """返回 (最终路径, 临时路径)，写入完成后再原子替换，中途失败不会留下残缺文件"""
+        filepath = os.path.join(self.export_dir, f"{filename}.{extension}")
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        return filepath, filepath + ".tmp"
+    
+    def _export_to_json(self, data: Iterable[Dict], filename: str) -> Optional[str]:
+        """
+        导出为JSON格式 (逐条写入 posts 数组，导出信息写在末尾以便填入总数)
+        没有数据时返回 None
+        """
+        filepath, tmp_path = self._open_export_file(filename, "json")
+        total = 0
         
-        filename = f"reddit_ai_{subreddit}_posts"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('{\n  "posts": [')
+                for post in data:
+                    f.write(",\n    " if total else "\n    ")
+                    f.write(json.dumps(post, ensure_ascii=False))
+                    total += 1
+                f.write("\n  ],\n" if total else "],\n")
+                
+                export_info = {
+                    "total_records": total,
+                    "export_time": datetime.now(self.beijing_tz).strftime('%Y-%m-%d %H:%M:%S CST'),
+                    "timezone": "Asia/Shanghai (CST)",
+                    "note": "所有时间戳已转换为北京时间"
+                }
+                f.write('  "export_info": ' + json.dumps(export_info, ensure_ascii=False) + "\n}\n")
+            
+            if not total:
+                os.remove(tmp_path)
+                return None
+            
+            os.replace(tmp_path, filepath)
+            return f"✅ 成功导出 {total} 条记录到: {filepath}"
         
-        if format_type.lower() == 'csv':
-            return self._export_to_csv(formatted_posts, filename)
-        else:
-            return self._export_to_json(formatted_posts, filename)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return f"❌ 导出失败: {e}"
+    
+    @staticmethod
+    def _csv_fieldnames(first_post: Dict) -> List[str]:
+        """
+        CSV 列名: 以首行字段为准，并补齐所有时间字段的 _raw/_beijing 派生列
+        (派生列只在字段非空时生成，首行缺少的派生列可能出现在后续行中)
+        """
+        fieldnames = list(first_post.keys())
+        for field in TIME_FIELDS:
+            if field in first_post:
+                for derived in (f"{field}_raw", f"{field}_beijing"):
+                    if derived not in fieldnames:
+                        fieldnames.append(derived)
+        return fieldnames
     
-    def _export_to_json(self, data: List[Dict], filename: str) -> str:
-        """导出为JSON格式"""
-        filepath = f"/Users/momo/Desktop/reddit 爬虫/exports/{filename}.json"
+    def _export_to_csv(self, data: Iterable[Dict], filename: str) -> Optional[str]:
+        """导出为CSV格式 (逐行写入)，没有数据时返回 None"""
+        filepath, tmp_path = self._open_export_file(filename, "csv")
+        total = 0
         
         try:
-            # 确保导出目录存在
-            import os
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            posts = iter(data)
+            first_post = next(posts, None)
+            if first_post is None:
+                return None
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "export_info": {
-                        "total_records": len(data),
-                        "export_time": datetime.now(self.beijing_tz).strftime('%Y-%m-%d %H:%M:%S CST'),
-                        "timezone": "Asia/Shanghai (CST)",
-                        "note": "所有时间戳已转换为北京时间"
-                    },
-                    "posts": data
-                }, f, ensure_ascii=False, indent=2)
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self._csv_fieldnames(first_post),
+                                        restval="", extrasaction="ignore")
+                writer.writeheader()
+                writer.writerow(first_post)
+                total = 1
+                for post in posts:
+                    writer.writerow(post)
+                    total += 1
             
-            return f"✅ 成功导出 {len(data)} 条记录到: {filepath}"
+            os.replace(tmp_path, filepath)
+            return f"✅ 成功导出 {total} 条记录到: {filepath}"
         
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return f"❌ 导出失败: {e}"
     
-    def _export_to_csv(self, data: List[Dict], filename: str) -> str:
-        """导出为CSV格式"""
-        if not data:
-            return "没有数据可导出"
+    @staticmethod
+    def _open_ndjson_file(path: str, compression: Optional[str], append: bool = False):
+        """打开 NDJSON 文本写入流 (gz/zst 为流式压缩，追加时写入新的 gzip 成员/zstd 帧)"""
+        mode = "a" if append else "w"
+        if compression == "gz":
+            return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=EXPORT_CONFIG.get("gzip_level", 6))
         
-        filepath = f"/Users/momo/Desktop/reddit 爬虫/exports/{filename}.csv"
+        if compression == "zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd 压缩需要安装 zstandard (pip install zstandard)")
+            
+            compressor = zstandard.ZstdCompressor(level=EXPORT_CONFIG.get("zstd_level", 3))
+            return io.TextIOWrapper(compressor.stream_writer(open(path, mode + "b")), encoding="utf-8")
+        
+        return open(path, mode, encoding="utf-8")
+    
+    def _write_ndjson(self, data: Iterable[Dict], path: str, compression: Optional[str],
+                      append: bool = False) -> int:
+        """逐行写入 NDJSON (首行到达时才打开文件，没有数据时不创建文件)，返回写入行数"""
+        total = 0
+        f = None
+        try:
+            for post in data:
+                if f is None:
+                    f = self._open_ndjson_file(path, compression, append)
+                f.write(json.dumps(post, ensure_ascii=False))
+                f.write("\n")
+                total += 1
+        finally:
+            if f is not None:
+                f.close()
+        return total
+    
+    def _export_to_ndjson(self, data: Iterable[Dict], filename: str, format_type: str) -> Optional[str]:
+        """导出为 NDJSON (每行一个帖子，可选 gzip/zstd 流式压缩)，没有数据时返回 None"""
+        filepath, tmp_path = self._open_export_file(filename, format_type)
         
         try:
-            # 确保导出目录存在
-            import os
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            total = self._write_ndjson(data, tmp_path, NDJSON_FORMATS[format_type])
+            if not total:
+                return None
             
-            # 获取所有字段名
-            fieldnames = list(data[0].keys())
+            os.replace(tmp_path, filepath)
+            return f"✅ 成功导出 {total} 条记录到: {filepath}"
+        
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return f"❌ 导出失败: {e}"
+    
+    @staticmethod
+    def _load_json_state(path: str) -> Optional[Dict]:
+        """读取导出状态文件，不存在或损坏时返回 None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _save_json_state(path: str, state: Dict):
+        """原子写入导出状态文件"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def _arrow_schema(self, pa, columns: List[str]):
+        """按字段类型构建 Arrow schema"""
+        types = {
+            "string": pa.string(),
+            "dictionary": pa.dictionary(pa.int32(), pa.string()),
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "bool": pa.bool_(),
+            "timestamp": pa.timestamp("s", tz="Asia/Shanghai"),
+        }
+        return pa.schema([(column, types[POST_EXPORT_COLUMNS[column]]) for column in columns])
+    
+    def _arrow_batch(self, pa, schema, rows: List[Dict], dictionaries: Dict[str, Dict[str, int]]):
+        """
+        将一页帖子行转换为 RecordBatch (布尔字段由 0/1 转换)
+        dictionaries: 各字典编码字段的 取值 -> 编号，跨页共享并只追加新取值；
+        每页的字典都是上一页字典的扩展，Arrow IPC 文件中写为字典增量而不是字典替换
+        """
+        arrays = []
+        for field in schema:
+            values = [row.get(field.name) for row in rows]
+            column_type = POST_EXPORT_COLUMNS[field.name]
+            if column_type == "dictionary":
+                codes = dictionaries.setdefault(field.name, {})
+                indices = [None if value is None else codes.setdefault(value, len(codes)) for value in values]
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(indices, type=field.type.index_type),
+                    pa.array(list(codes), type=field.type.value_type)
+                ))
+                continue
+            if column_type == "bool":
+                values = [None if value is None else bool(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+    
+    def _export_to_columnar(self, data: Iterable[Dict], filename: str, format_type: str,
+                            columns: List[str]) -> Optional[str]:
+        """
+        导出为 Parquet 或 Arrow IPC 文件 (需要 pyarrow)
+        字段按 POST_EXPORT_COLUMNS 写为带类型的列，取值重复度高的文本列使用字典编码；
+        每页数据写为一个行组/记录批次，内存占用与导出规模无关
+        没有数据时返回 None
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            return "❌ 导出失败: Parquet/Arrow 导出需要安装 pyarrow (pip install pyarrow)"
+        
+        extension = "parquet" if format_type == "parquet" else "arrow"
+        filepath, tmp_path = self._open_export_file(filename, extension)
+        compression = EXPORT_CONFIG.get("columnar_compression", "zstd")
+        schema = self._arrow_schema(pa, columns)
+        dictionaries: Dict[str, Dict[str, int]] = {}
+        writer = None
+        total = 0
+        
+        try:
+            page: List[Dict] = []
+            posts = iter(data)
+            while True:
+                post = next(posts, None)
+                if post is not None:
+                    page.append(post)
+                    if len(page) < self.page_size:
+                        continue
+                
+                if page:
+                    if writer is None:
+                        writer = self._open_columnar_writer(pa, tmp_path, format_type, schema, compression)
+                    batch = self._arrow_batch(pa, schema, page, dictionaries)
+                    if format_type == "parquet":
+                        writer.write_table(pa.Table.from_batches([batch]))
+                    else:
+                        writer.write_batch(batch)
+                    total += len(page)
+                    page = []
+                
+                if post is None:
+                    break
             
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
+            if writer is None:
+                return None
             
-            return f"✅ 成功导出 {len(data)} 条记录到: {filepath}"
+            writer.close()
+            writer = None
+            os.replace(tmp_path, filepath)
+            return f"✅ 成功导出 {total} 条记录到: {filepath}"
         
         except Exception as e:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return f"❌ 导出失败: {e}"
     
+    @staticmethod
+    def _open_columnar_writer(pa, path: str, format_type: str, schema, compression: str):
+        """创建 Parquet 写入器或 Arrow IPC 文件写入器 (IPC 文件中字典编码字段按增量写入)"""
+        if format_type == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema, compression=compression, use_dictionary=True)
+        
+        import pyarrow.ipc as ipc
+        options = ipc.IpcWriteOptions(
+            compression=compression if compression in ("zstd", "lz4") else None,
+            emit_dictionary_deltas=True
+        )
+        return ipc.new_file(path, schema, options=options)
+    
     def view_posts_summary(self, limit: int = 10) -> str:
         """查看帖子摘要（控制台友好格式）"""
         sql = """
@@ -259,9 +931,9 @@ class DataExporter:
         total_result = self.db.execute_query("SELECT COUNT(*) as total FROM reddit_ai_posts")
         total_posts = total_result.get('results', [{}])[0].get('total', 0) if total_result.get('success') else 0
         
-        # 今日帖子数
-        today = datetime.now(self.beijing_tz).strftime('%Y-%m-%d')
-        today_result = self.db.execute_query("SELECT COUNT(*) as today_total FROM reddit_ai_posts WHERE crawl_date = ?", [today])
+        # 今日帖子数 (UTC 采集日期)
+        today = self._utc_today()
+        today_result = self.db.execute_query(f"SELECT COUNT(*) as today_total FROM reddit_ai_posts WHERE {CRAWL_DATE_SQL} = ?", [today])
         today_posts = today_result.get('results', [{}])[0].get('today_total', 0) if today_result.get('success') else 0
         
         # 最新帖子时间
@@ -297,7 +969,7 @@ class DataExporter:
         
         output.append(f"\n📈 基础统计:")
         output.append(f"   总帖子数: {total_posts:,} 条")
-        output.append(f"   今日采集: {today_posts} 条 ({today})")
+        output.append(f"   今日采集: {today_posts} 条 ({today} UTC)")
         output.append(f"   最新帖子: {latest_time}")
         
         if subreddit_stats:
@@ -331,54 +1003,70 @@ def main():
         print("5. 导出评分最高帖子")
         print("6. 导出指定社区数据")
         print("7. 查看数据库统计")
-        print("8. 退出")
+        print("8. 追加今日 (UTC) 数据到 NDJSON 分片")
+        print("9. 增量导出 (上次导出之后的新数据)")
+        print("10. 退出")
         
-        choice = input("\n请选择操作 (1-8): ").strip()
+        choice = input("\n请选择操作 (1-10): ").strip()
         
         try:
             if choice == '1':
                 limit = input("显示条数 (默认10): ").strip() or "10"
                 result = exporter.view_posts_summary(int(limit))
                 print(result)
-                
+            
             elif choice == '2':
                 result = exporter.export_posts_today('json')
                 print(result)
-                
+            
             elif choice == '3':
                 result = exporter.export_posts_today('csv')
                 print(result)
-                
+            
             elif choice == '4':
                 start_date = input("开始日期 (YYYY-MM-DD): ").strip()
                 end_date = input("结束日期 (YYYY-MM-DD): ").strip()
-                format_type = input("格式 (json/csv, 默认json): ").strip() or "json"
-                result = exporter.export_posts_by_date_range(start_date, end_date, format_type)
+                format_type = input("格式 (json/csv/ndjson/ndjson.gz/ndjson.zst/parquet/arrow, 默认json): ").strip() or "json"
+                shard_by = input("分片并发导出 (none/day/week, 默认none): ").strip() or "none"
+                if shard_by == "none":
+                    result = exporter.export_posts_by_date_range(start_date, end_date, format_type)
+                else:
+                    result = exporter.export_posts_sharded(start_date, end_date, format_type, shard_by)
                 print(result)
-                
+            
             elif choice == '5':
                 limit = input("导出条数 (默认100): ").strip() or "100"
-                format_type = input("格式 (json/csv, 默认json): ").strip() or "json"
+                format_type = input("格式 (json/csv/ndjson/ndjson.gz/ndjson.zst/parquet/arrow, 默认json): ").strip() or "json"
                 result = exporter.export_top_posts(int(limit), format_type)
                 print(result)
-                
+            
             elif choice == '6':
                 subreddit = input("社区名称 (如: ChatGPT): ").strip()
-                format_type = input("格式 (json/csv, 默认json): ").strip() or "json"
+                format_type = input("格式 (json/csv/ndjson/ndjson.gz/ndjson.zst/parquet/arrow, 默认json): ").strip() or "json"
                 result = exporter.export_posts_by_subreddit(subreddit, format_type)
                 print(result)
-                
+            
             elif choice == '7':
                 result = exporter.get_statistics_with_beijing_time()
                 print(result)
-                
+            
             elif choice == '8':
+                format_type = input("格式 (ndjson/ndjson.gz/ndjson.zst, 默认ndjson.gz): ").strip() or "ndjson.gz"
+                result = exporter.append_daily_shard(format_type=format_type)
+                print(result)
+            
+            elif choice == '9':
+                format_type = input("格式 (json/csv/ndjson/ndjson.gz/ndjson.zst/parquet/arrow, 默认ndjson.gz): ").strip() or "ndjson.gz"
+                result = exporter.export_incremental(format_type)
+                print(result)
+            
+            elif choice == '10':
                 print("👋 再见！")
                 break
-                
+            
             else:
                 print("❌ 无效选择，请重试")
-                
+        
         except ValueError as e:
             print(f"❌ 输入错误: {e}")
         except Exception as e:
@@ -7,17 +7,215 @@ Cloudflare D1 数据库管理器
 
 import json
 import time
-import requests
 import logging
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from config import DATABASE_CONFIG
+from daily_collection_config import DATABASE_CONFIG as STORAGE_CONFIG
+from d1_transport import D1HttpTransport
 from time_utils import (
     beijing_now, beijing_timestamp, format_beijing_time, 
     today_date, log_time_format, db_time_format
 )
 
-class D1DatabaseManager:
+# D1 单条语句绑定参数上限
+D1_MAX_BOUND_PARAMS = 100
+
+# 各表写入列定义 (单条插入与批量插入共用)
+POST_COLUMNS = [
+    "id", "permalink", "url", "title", "selftext",
+    "score", "upvote_ratio", "num_comments",
+    "author", "subreddit", "created_utc",
+    "quality_score", "ai_category"
+]
+
+KEYWORD_COLUMNS = [
+    "post_id", "keyword", "category", "confidence_score",
+    "extraction_method", "keyword_type", "frequency", "position"
+]
+
+TECH_CATEGORY_COLUMNS = [
+    "post_id", "primary_category", "secondary_categories", "confidence_score",
+    "classification_model", "tech_stack", "application_domain", "complexity_level"
+]
+
+class D1StatementBuilder:
+    """D1 写入语句构建 (同步与异步数据库管理器共用)"""
+    
+    def _init_batch_config(self):
+        """批量写入配置: 每条语句的最大行数、每次请求的最大语句数"""
+        self.batch_insert_size = STORAGE_CONFIG.get("batch_insert_size", 50)
+        self.max_statements_per_request = STORAGE_CONFIG.get("max_statements_per_request", 50)
+    
+    @staticmethod
+    def _changes(result: Dict) -> int:
+        """读取语句影响行数 (D1 返回在 meta.changes 中)"""
+        meta = result.get("meta") or {}
+        return meta.get("changes", result.get("changes", 0)) or 0
+    
+    @staticmethod
+    def _daily_task_status_statement(task_date: str, status: str, actual_count: Optional[int] = None,
+                                     error_message: Optional[str] = None) -> Tuple[str, List]:
+        """每日任务状态更新语句 (有实际数量时同时记录结束时间，有错误信息时一并写入)"""
+        assignments = ["task_status = ?", "updated_at = unixepoch()"]
+        params: List = [status]
+        
+        if actual_count is not None:
+            assignments.append("actual_count = ?")
+            assignments.append("end_time = unixepoch()")
+            params.append(actual_count)
+        
+        if error_message is not None:
+            assignments.append("error_message = ?")
+            params.append(error_message)
+        
+        sql = f"UPDATE reddit_daily_tasks SET {', '.join(assignments)} WHERE task_date = ?"
+        return sql, params + [task_date]
+    
+    @staticmethod
+    def _post_params(post_data: Dict) -> List:
+        """帖子主表参数 (顺序与 POST_COLUMNS 一致)"""
+        return [
+            post_data.get("id"),
+            post_data.get("permalink"),
+            post_data.get("url"),
+            post_data.get("title"),
+            post_data.get("selftext"),
+            post_data.get("score", 0),
+            post_data.get("upvote_ratio", 0.0),
+            post_data.get("num_comments", 0),
+            post_data.get("author"),
+            post_data.get("subreddit"),
+            post_data.get("created_utc"),
+            post_data.get("quality_score", 0.0),
+            post_data.get("ai_category")
+        ]
+    
+    @staticmethod
+    def _keyword_params(post_id: str, keyword_data: Dict) -> List:
+        """关键词表参数 (顺序与 KEYWORD_COLUMNS 一致)"""
+        return [
+            post_id,
+            keyword_data.get("keyword"),
+            keyword_data.get("category"),
+            keyword_data.get("confidence_score", 0.0),
+            keyword_data.get("extraction_method", "auto"),
+            keyword_data.get("keyword_type", "general"),
+            keyword_data.get("frequency", 1),
+            keyword_data.get("position", "content")
+        ]
+    
+    @staticmethod
+    def _tech_category_params(post_id: str, category_data: Dict) -> List:
+        """技术分类表参数 (顺序与 TECH_CATEGORY_COLUMNS 一致)"""
+        return [
+            post_id,
+            category_data.get("primary_category"),
+            json.dumps(category_data.get("secondary_categories", [])),
+            category_data.get("confidence_score", 0.0),
+            category_data.get("classification_model", "rule_based"),
+            json.dumps(category_data.get("tech_stack", {})),
+            category_data.get("application_domain"),
+            category_data.get("complexity_level", "medium")
+        ]
+    
+    def _rows_per_statement(self, column_count: int, extra_params: int = 0) -> int:
+        """计算单条多行INSERT可容纳的行数 (受 batch_insert_size 与 D1 绑定参数上限约束)"""
+        by_params = (D1_MAX_BOUND_PARAMS - extra_params) // column_count
+        return max(1, min(self.batch_insert_size, by_params))
+    
+    def _build_multi_row_inserts(self, table: str, columns: List[str], rows: List[List],
+                                 or_ignore: bool = False, returning: Optional[str] = None,
+                                 guard_sql: Optional[str] = None,
+                                 guard_params: Optional[List] = None) -> List[Tuple[str, List]]:
+        """
+        构建分块的多行 INSERT ... VALUES (...),(...) 语句
+        guard_sql: 可选的 WHERE 条件，整块行仅在条件成立时写入
+        """
+        guard_params = guard_params or []
+        chunk_size = self._rows_per_statement(len(columns), len(guard_params))
+        verb = "INSERT OR IGNORE" if or_ignore else "INSERT"
+        row_placeholder = "(" + ", ".join("?" for _ in columns) + ")"
+        
+        statements = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            values = ", ".join(row_placeholder for _ in chunk)
+            params = [value for row in chunk for value in row]
+            
+            if guard_sql:
+                sql = f"{verb} INTO {table} ({', '.join(columns)}) SELECT * FROM (VALUES {values}) {guard_sql}"
+                params += guard_params
+            else:
+                sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES {values}"
+            
+            if returning:
+                sql += f" RETURNING {returning}"
+            
+            statements.append((sql, params))
+        
+        return statements
+    
+    def build_post_statements(self, post_data: Dict, keywords: List[Dict],
+                              category_data: Dict) -> List[Tuple[str, List]]:
+        """
+        构建单个帖子的全部写入语句 (帖子、关键词、技术分类)
+        关键词和分类仅在该帖子尚无分类记录时写入，分类语句放在最后，
+        因此重复执行同一帖子不会产生重复的关键词行
+        """
+        post_id = post_data.get("id")
+        placeholders = ", ".join("?" for _ in POST_COLUMNS)
+        
+        statements = [(
+            f"INSERT OR IGNORE INTO reddit_ai_posts ({', '.join(POST_COLUMNS)}) VALUES ({placeholders})",
+            self._post_params(post_data)
+        )]
+        
+        not_categorized = "WHERE NOT EXISTS (SELECT 1 FROM reddit_post_tech_categories WHERE post_id = ?)"
+        
+        if keywords:
+            statements.extend(self._build_multi_row_inserts(
+                "reddit_post_keywords",
+                KEYWORD_COLUMNS,
+                [self._keyword_params(post_id, keyword_data) for keyword_data in keywords],
+                guard_sql=not_categorized,
+                guard_params=[post_id]
+            ))
+        
+        statements.append((
+            f"INSERT INTO reddit_post_tech_categories ({', '.join(TECH_CATEGORY_COLUMNS)}) "
+            f"SELECT {', '.join('?' for _ in TECH_CATEGORY_COLUMNS)} {not_categorized}",
+            self._tech_category_params(post_id, category_data) + [post_id]
+        ))
+        
+        return statements
+    
+    def _group_post_bundles(self, bundles: List[Tuple[Dict, List[Dict], Dict]]) -> List[Tuple[List, List]]:
+        """
+        将多个帖子的写入语句按 max_statements_per_request 分组，同一帖子的语句不拆分
+        返回: [(statements, [(post_id, 帖子语句下标)]), ...]
+        """
+        groups = []
+        statements: List[Tuple[str, List]] = []
+        post_positions: List[Tuple[str, int]] = []
+        
+        for post_data, keywords, category_data in bundles:
+            post_statements = self.build_post_statements(post_data, keywords, category_data)
+            
+            if statements and len(statements) + len(post_statements) > self.max_statements_per_request:
+                groups.append((statements, post_positions))
+                statements, post_positions = [], []
+            
+            post_positions.append((post_data.get("id"), len(statements)))
+            statements.extend(post_statements)
+        
+        if statements:
+            groups.append((statements, post_positions))
+        
+        return groups
+
+class D1DatabaseManager(D1StatementBuilder):
     """Cloudflare D1 数据库管理器"""
     
     def __init__(self):
@@ -31,8 +229,27 @@ class D1DatabaseManager:
             "Content-Type": "application/json"
         }
         
+        # 共享连接池传输层，避免每次查询重新建立 TLS 连接
+        self.transport = D1HttpTransport(
+            self.headers,
+            pool_connections=DATABASE_CONFIG.get("pool_connections", 4),
+            pool_maxsize=DATABASE_CONFIG.get("pool_maxsize", 8),
+            keep_alive=DATABASE_CONFIG.get("keep_alive", True),
+            timeout=DATABASE_CONFIG.get("request_timeout", 30)
+        )
+        
+        self._init_batch_config()
+        
         self.logger = logging.getLogger(__name__)
     
+    def get_transport_stats(self) -> Dict:
+        """获取HTTP连接复用统计"""
+        return self.transport.get_stats()
+    
+    def close(self):
+        """关闭数据库连接池"""
+        self.transport.close()
+    
     def execute_query(self, sql: str, params: List = None) -> Dict:
         """执行SQL查询"""
         try:
@@ -42,12 +259,7 @@ class D1DatabaseManager:
             if params:
                 data["params"] = params
             
-            response = requests.post(
-                f"{self.base_url}/query",
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
+            response = self.transport.post(f"{self.base_url}/query", data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -64,37 +276,98 @@ class D1DatabaseManager:
             self.logger.error(f"数据库查询异常: {e}")
             return {}
     
+    def execute_batch(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        """
+        在一次HTTP请求中执行多条参数化SQL (D1 批量接口，整体在同一事务中执行)
+        statements: [(sql, params), ...]
+        返回: 与 statements 一一对应的执行结果列表，失败时对应位置为空字典
+        """
+        if not statements:
+            return []
+        
+        empty_results = [{} for _ in statements]
+        
+        try:
+            data = {
+                "batch": [
+                    {"sql": sql, "params": params or []}
+                    for sql, params in statements
+                ]
+            }
+            
+            response = self.transport.post(f"{self.base_url}/query", data)
+            
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    results = result.get("result") or []
+                    # 补齐长度，保证调用方可以按下标读取
+                    return results + empty_results[len(results):]
+                else:
+                    self.logger.error(f"D1批量查询失败: {result}")
+                    return empty_results
+            else:
+                self.logger.error(f"D1 API批量请求失败: {response.status_code} - {response.text}")
+                return empty_results
+                
+        except Exception as e:
+            self.logger.error(f"数据库批量查询异常: {e}")
+            return empty_results
+    
+    def execute_statements(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        """按 max_statements_per_request 分组批量执行语句，返回逐条结果"""
+        results = []
+        step = max(1, self.max_statements_per_request)
+        
+        for start in range(0, len(statements), step):
+            results.extend(self.execute_batch(statements[start:start + step]))
+        
+        return results
+    
+    def store_post_bundle(self, post_data: Dict, keywords: List[Dict], category_data: Dict) -> bool:
+        """一次请求写入帖子及其关键词、技术分类，返回帖子是否为新插入"""
+        statements = self.build_post_statements(post_data, keywords, category_data)
+        results = self.execute_batch(statements)
+        
+        if self._changes(results[0]) > 0:
+            self.logger.info(f"成功插入帖子: {post_data.get('id')} - {(post_data.get('title') or '')[:50]}")
+            return True
+        
+        self.logger.debug(f"帖子已存在或插入失败: {post_data.get('id')}")
+        return False
+    
+    def store_post_bundles(self, bundles: List[Tuple[Dict, List[Dict], Dict]]) -> Dict[str, bool]:
+        """
+        批量写入多个帖子及其关键词、技术分类
+        bundles: [(post_data, keywords, category_data), ...]
+        同一帖子的语句总在同一请求中执行，返回 {post_id: 是否新插入}
+        """
+        outcomes = {}
+        
+        for statements, post_positions in self._group_post_bundles(bundles):
+            results = self.execute_batch(statements)
+            for post_id, index in post_positions:
+                # 同一批中重复出现的帖子只要有一次插入成功即视为新插入
+                outcomes[post_id] = outcomes.get(post_id, False) or self._changes(results[index]) > 0
+        
+        stored = sum(1 for inserted in outcomes.values() if inserted)
+        self.logger.info(f"批量写入帖子完成: {stored}/{len(bundles)}")
+        return outcomes
+    
     def insert_post(self, post_data: Dict) -> bool:
         """插入单个帖子数据"""
         try:
-            sql = """
+            sql = f"""
             INSERT OR IGNORE INTO reddit_ai_posts (
-                id, permalink, url, title, selftext,
-                score, upvote_ratio, num_comments,
-                author, subreddit, created_utc,
-                quality_score, ai_category
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                {', '.join(POST_COLUMNS)}
+            ) VALUES ({', '.join('?' for _ in POST_COLUMNS)})
             """
             
-            params = [
-                post_data.get("id"),
-                post_data.get("permalink"),
-                post_data.get("url"),
-                post_data.get("title"),
-                post_data.get("selftext"),
-                post_data.get("score", 0),
-                post_data.get("upvote_ratio", 0.0),
-                post_data.get("num_comments", 0),
-                post_data.get("author"),
-                post_data.get("subreddit"),
-                post_data.get("created_utc"),
-                post_data.get("quality_score", 0.0),
-                post_data.get("ai_category")
-            ]
+            params = self._post_params(post_data)
             
             result = self.execute_query(sql, params)
             
-            if result.get("changes", 0) > 0:
+            if self._changes(result) > 0:
                 self.logger.info(f"成功插入帖子: {post_data.get('id')} - {post_data.get('title')[:50]}")
                 return True
             else:
@@ -105,14 +378,48 @@ class D1DatabaseManager:
             self.logger.error(f"插入帖子数据异常: {e}")
             return False
     
+    def bulk_insert_posts(self, posts_data: List[Dict]) -> List[Dict]:
+        """
+        多行批量插入帖子数据
+        返回: 每个分块的结果 {"rows", "inserted", "success", "outcomes": {post_id: 是否新插入}}
+        """
+        if not posts_data:
+            return []
+        
+        chunk_size = self._rows_per_statement(len(POST_COLUMNS))
+        statements = self._build_multi_row_inserts(
+            "reddit_ai_posts",
+            POST_COLUMNS,
+            [self._post_params(post_data) for post_data in posts_data],
+            or_ignore=True,
+            returning="id"
+        )
+        results = self.execute_statements(statements)
+        
+        reports = []
+        for index, result in enumerate(results):
+            chunk = posts_data[index * chunk_size:(index + 1) * chunk_size]
+            inserted_ids = {row.get("id") for row in result.get("results", [])}
+            outcomes = {post_data.get("id"): post_data.get("id") in inserted_ids for post_data in chunk}
+            
+            reports.append({
+                "rows": len(chunk),
+                "inserted": sum(1 for inserted in outcomes.values() if inserted),
+                "success": bool(result.get("success")),
+                "outcomes": outcomes
+            })
+        
+        return reports
+    
     def batch_insert_posts(self, posts_data: List[Dict]) -> Tuple[int, int]:
         """批量插入帖子数据"""
-        success_count = 0
         total_count = len(posts_data)
+        reports = self.bulk_insert_posts(posts_data)
+        success_count = sum(report["inserted"] for report in reports)
         
-        for post_data in posts_data:
-            if self.insert_post(post_data):
-                success_count += 1
+        failed_chunks = sum(1 for report in reports if not report["success"])
+        if failed_chunks:
+            self.logger.warning(f"批量插入有 {failed_chunks}/{len(reports)} 个分块失败")
         
         self.logger.info(f"批量插入完成: {success_count}/{total_count}")
         return success_count, total_count
@@ -127,6 +434,26 @@ class D1DatabaseManager:
         result = self.execute_query(sql, [post_id])
         return result.get("results", [{}])[0].get("count", 0) > 0
     
+    def get_recent_post_ids(self, days: int = 0) -> Set[str]:
+        """一次查询获取今日(及最近 days 天)已采集的帖子ID"""
+        sql = """
+        SELECT id FROM reddit_ai_posts 
+        WHERE crawl_date >= date('now', ?)
+        """
+        
+        result = self.execute_query(sql, [f"-{max(0, int(days))} days"])
+        return {row["id"] for row in result.get("results", []) if row.get("id")}
+    
+    def get_recent_post_links(self, days: int = 30) -> List[Tuple[str, str]]:
+        """一次查询获取最近 days 天已采集外链帖子的 (帖子ID, url)，用于预热链接目标索引"""
+        sql = """
+        SELECT id, url FROM reddit_ai_posts 
+        WHERE crawl_date >= date('now', ?) AND url IS NOT NULL AND url != ''
+        """
+        
+        result = self.execute_query(sql, [f"-{max(0, int(days))} days"])
+        return [(row["id"], row["url"]) for row in result.get("results", []) if row.get("id")]
+    
     def get_today_post_count(self) -> int:
         """获取今日已采集帖子数量"""
         sql = """
@@ -155,57 +482,66 @@ class D1DatabaseManager:
         
         return stats
     
-    def insert_keywords(self, post_id: str, keywords: List[Dict]) -> int:
-        """插入关键词数据"""
-        success_count = 0
-        
-        for keyword_data in keywords:
-            sql = """
-            INSERT INTO reddit_post_keywords (
-                post_id, keyword, category, confidence_score, 
-                extraction_method, keyword_type, frequency, position
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
+    def bulk_insert_keywords(self, keywords_by_post: Dict[str, List[Dict]]) -> List[Dict]:
+        """
+        多行批量插入多个帖子的关键词
+        返回: 每个分块的结果 {"rows", "inserted", "success", "outcomes": [(post_id, keyword, 是否写入)]}
+        """
+        rows = [
+            self._keyword_params(post_id, keyword_data)
+            for post_id, keywords in keywords_by_post.items()
+            for keyword_data in keywords
+        ]
+        if not rows:
+            return []
+        
+        chunk_size = self._rows_per_statement(len(KEYWORD_COLUMNS))
+        statements = self._build_multi_row_inserts(
+            "reddit_post_keywords",
+            KEYWORD_COLUMNS,
+            rows,
+            returning="post_id, keyword"
+        )
+        results = self.execute_statements(statements)
+        
+        reports = []
+        for index, result in enumerate(results):
+            chunk = rows[index * chunk_size:(index + 1) * chunk_size]
+            written = Counter((row.get("post_id"), row.get("keyword")) for row in result.get("results", []))
             
-            params = [
-                post_id,
-                keyword_data.get("keyword"),
-                keyword_data.get("category"),
-                keyword_data.get("confidence_score", 0.0),
-                keyword_data.get("extraction_method", "auto"),
-                keyword_data.get("keyword_type", "general"),
-                keyword_data.get("frequency", 1),
-                keyword_data.get("position", "content")
-            ]
+            outcomes = []
+            for row in chunk:
+                key = (row[0], row[1])
+                outcomes.append((row[0], row[1], written[key] > 0))
+                if written[key] > 0:
+                    written[key] -= 1
             
-            result = self.execute_query(sql, params)
-            if result.get("changes", 0) > 0:
-                success_count += 1
+            reports.append({
+                "rows": len(chunk),
+                "inserted": sum(1 for outcome in outcomes if outcome[2]),
+                "success": bool(result.get("success")),
+                "outcomes": outcomes
+            })
         
-        return success_count
+        return reports
+    
+    def insert_keywords(self, post_id: str, keywords: List[Dict]) -> int:
+        """插入关键词数据"""
+        reports = self.bulk_insert_keywords({post_id: keywords})
+        return sum(report["inserted"] for report in reports)
     
     def insert_tech_category(self, post_id: str, category_data: Dict) -> bool:
         """插入技术分类数据"""
-        sql = """
+        sql = f"""
         INSERT INTO reddit_post_tech_categories (
-            post_id, primary_category, secondary_categories, confidence_score,
-            classification_model, tech_stack, application_domain, complexity_level
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            {', '.join(TECH_CATEGORY_COLUMNS)}
+        ) VALUES ({', '.join('?' for _ in TECH_CATEGORY_COLUMNS)})
         """
         
-        params = [
-            post_id,
-            category_data.get("primary_category"),
-            json.dumps(category_data.get("secondary_categories", [])),
-            category_data.get("confidence_score", 0.0),
-            category_data.get("classification_model", "rule_based"),
-            json.dumps(category_data.get("tech_stack", {})),
-            category_data.get("application_domain"),
-            category_data.get("complexity_level", "medium")
-        ]
+        params = self._tech_category_params(post_id, category_data)
         
         result = self.execute_query(sql, params)
-        return result.get("changes", 0) > 0
+        return self._changes(result) > 0
     
     def create_daily_task(self, task_date: str, target_count: int = 200) -> bool:
         """创建每日采集任务"""
@@ -217,28 +553,14 @@ class D1DatabaseManager:
         
         params = [task_date, target_count]
         result = self.execute_query(sql, params)
-        return result.get("changes", 0) > 0
+        return self._changes(result) > 0
     
     def update_daily_task_status(self, task_date: str, status: str, 
                                 actual_count: int = None, error_message: str = None) -> bool:
-        """更新每日任务状态"""
-        if actual_count is not None:
-            sql = """
-            UPDATE reddit_daily_tasks 
-            SET task_status = ?, actual_count = ?, end_time = unixepoch()
-            WHERE task_date = ?
-            """
-            params = [status, actual_count, task_date]
-        else:
-            sql = """
-            UPDATE reddit_daily_tasks 
-            SET task_status = ?
-            WHERE task_date = ?
-            """
-            params = [status, task_date]
-        
+        """更新每日任务状态 (失败时记录错误信息)"""
+        sql, params = self._daily_task_status_statement(task_date, status, actual_count, error_message)
         result = self.execute_query(sql, params)
-        return result.get("changes", 0) > 0
+        return self._changes(result) > 0
     
     def get_daily_task_status(self, task_date: str) -> Optional[Dict]:
         """获取每日任务状态"""
@@ -272,7 +594,7 @@ class D1DatabaseManager:
         ]
         
         result = self.execute_query(sql, params)
-        return result.get("changes", 0) > 0
+        return self._changes(result) > 0
     
     def get_collection_stats(self, days: int = 7) -> Dict:
         """获取最近几天的采集统计"""
@@ -292,6 +614,118 @@ class D1DatabaseManager:
         result = self.execute_query(sql)
         return result.get("results", [])
     
+    def get_posts_page(self, after_id: str = "", limit: int = 500) -> List[Dict]:
+        """
+        按帖子ID键集分页读取存量帖子 (重新处理用)
+        after_id: 上一页最后一个帖子的ID，首页传空字符串
+        """
+        sql = """
+        SELECT id, title, selftext, score, num_comments, upvote_ratio, url,
+               created_utc, crawl_timestamp, quality_score, tech_relevance_score,
+               ai_category, content_category
+        FROM reddit_ai_posts 
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+        """
+        
+        result = self.execute_query(sql, [after_id, limit])
+        return result.get("results", [])
+    
+    def _group_post_statements(self, statements_by_post: List[List[Tuple[str, List]]]) -> List[List[Tuple[str, List]]]:
+        """将逐帖子的语句按 max_statements_per_request 分组，同一帖子的语句不拆分 (同一事务)"""
+        groups = []
+        statements: List[Tuple[str, List]] = []
+        
+        for post_statements in statements_by_post:
+            if statements and len(statements) + len(post_statements) > self.max_statements_per_request:
+                groups.append(statements)
+                statements = []
+            statements.extend(post_statements)
+        
+        if statements:
+            groups.append(statements)
+        
+        return groups
+    
+    def update_post_scores(self, updates: List[Dict]) -> int:
+        """
+        批量更新帖子的评分与分类 (UPDATE 语句按批量请求发送)
+        updates: [{"id", "quality_score", "tech_relevance_score", "ai_category", "content_category",
+                   可选 "classification"}, ...]
+        带 "classification" 时同时替换该帖子的技术分类记录，删除与插入和评分更新在同一批量请求中执行
+        返回: 实际更新的行数
+        """
+        sql = """
+        UPDATE reddit_ai_posts 
+        SET quality_score = ?, tech_relevance_score = ?, ai_category = ?,
+            content_category = ?, last_updated = unixepoch()
+        WHERE id = ?
+        """
+        
+        statements_by_post = []
+        for update in updates:
+            post_statements = [(sql, [
+                update["quality_score"],
+                update["tech_relevance_score"],
+                update["ai_category"],
+                update["content_category"],
+                update["id"]
+            ])]
+            
+            classification = update.get("classification")
+            if classification is not None:
+                post_statements.append((
+                    "DELETE FROM reddit_post_tech_categories WHERE post_id = ?", [update["id"]]
+                ))
+                post_statements.append((
+                    f"INSERT INTO reddit_post_tech_categories ({', '.join(TECH_CATEGORY_COLUMNS)}) "
+                    f"SELECT {', '.join('?' for _ in TECH_CATEGORY_COLUMNS)} "
+                    f"WHERE EXISTS (SELECT 1 FROM reddit_ai_posts WHERE id = ?)",
+                    self._tech_category_params(update["id"], classification) + [update["id"]]
+                ))
+            
+            statements_by_post.append(post_statements)
+        
+        updated = 0
+        for group in self._group_post_statements(statements_by_post):
+            results = self.execute_batch(group)
+            updated += sum(
+                self._changes(result)
+                for (statement_sql, _), result in zip(group, results)
+                if statement_sql.lstrip().startswith("UPDATE")
+            )
+        
+        return updated
+    
+    def replace_post_keywords(self, keywords_by_post: Dict[str, List[Dict]]) -> int:
+        """
+        替换帖子的关键词 (重新提取关键词后使用)
+        每个帖子的删除与插入语句总在同一批量请求 (同一事务) 中执行，
+        多个帖子按 max_statements_per_request 合并为一次请求
+        返回: 写入的关键词行数
+        """
+        statements_by_post = []
+        for post_id, keywords in keywords_by_post.items():
+            post_statements = [("DELETE FROM reddit_post_keywords WHERE post_id = ?", [post_id])]
+            post_statements.extend(self._build_multi_row_inserts(
+                "reddit_post_keywords",
+                KEYWORD_COLUMNS,
+                [self._keyword_params(post_id, keyword_data) for keyword_data in keywords]
+            ))
+            statements_by_post.append(post_statements)
+        
+        written = 0
+        for group in self._group_post_statements(statements_by_post):
+            results = self.execute_batch(group)
+            written += sum(
+                self._changes(result)
+                for (sql, _), result in zip(group, results)
+                if sql.startswith("INSERT")
+            )
+        
+        return written
+    
     def cleanup_old_data(self, days: int = 90) -> int:
         """清理旧数据"""
         sql = """
@@ -300,7 +734,7 @@ class D1DatabaseManager:
         """.format(days)
         
         result = self.execute_query(sql)
-        deleted_count = result.get("changes", 0)
+        deleted_count = self._changes(result)
         
         if deleted_count > 0:
             self.logger.info(f"清理了 {deleted_count} 条超过 {days} 天的旧数据")
@@ -324,3 +758,6 @@ if __name__ == "__main__":
     # 测试子版块统计
     subreddit_stats = db.get_today_posts_by_subreddit()
     print(f"今日各子版块统计: {subreddit_stats}")
+    
+    # 连接复用统计
+    print(f"连接复用统计: {db.get_transport_stats()}")
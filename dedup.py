@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集去重工具
+- 会话内已评估帖子缓存，避免同一帖子在不同排序方式/交叉帖中被重复筛选和处理
+- 近似重复索引 (SimHash + LSH 分段)，拒绝以不同ID重复发布的同一内容
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from daily_collection_config import NEAR_DUPLICATE_CONFIG
+from link_index import canonicalize_url
+
+def get_crosspost_parent_id(post) -> Optional[str]:
+    """
+    获取交叉帖的原帖ID (去掉 t3_ 前缀)
+    直接读取实例属性，避免 PRAW 懒加载对象因缺失属性触发额外请求
+    """
+    parent = getattr(post, "__dict__", {}).get("crosspost_parent")
+    if not parent:
+        return None
+    return parent.split("_", 1)[1] if parent.startswith("t3_") else parent
+
+class EvaluatedPostCache:
+    """会话内帖子筛选结果缓存 (线程安全)"""
+    
+    def __init__(self):
+        self._verdicts: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "accepted_hits": 0,
+            "rejected_hits": 0,
+            "crosspost_hits": 0
+        }
+    
+    def lookup(self, post) -> Optional[bool]:
+        """
+        查询帖子是否已评估过 (含交叉帖原帖)
+        返回: 之前的筛选结果，未评估过返回None
+        """
+        parent_id = get_crosspost_parent_id(post)
+        
+        with self._lock:
+            self.stats["lookups"] += 1
+            
+            verdict = self._verdicts.get(post.id)
+            if verdict is None and parent_id:
+                # 原帖已被采集时交叉帖直接跳过；原帖被拒绝时交叉帖仍需独立评估
+                if self._verdicts.get(parent_id):
+                    verdict = True
+                    self.stats["crosspost_hits"] += 1
+            
+            if verdict is not None:
+                self.stats["hits"] += 1
+                self.stats["accepted_hits" if verdict else "rejected_hits"] += 1
+            
+            return verdict
+    
+    def record(self, post, verdict: bool):
+        """记录帖子筛选结果，采集的交叉帖同时标记其原帖"""
+        parent_id = get_crosspost_parent_id(post)
+        
+        with self._lock:
+            self._verdicts[post.id] = verdict
+            if verdict and parent_id:
+                self._verdicts.setdefault(parent_id, True)
+    
+    def __len__(self) -> int:
+        return len(self._verdicts)
+    
+    def get_stats(self) -> Dict:
+        """获取命中统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._verdicts)
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 3) if stats["lookups"] else 0.0
+        return stats
+
+# ============================================
+# 近似重复检测 (SimHash)
+# ============================================
+
+SIMHASH_BITS = 64
+
+# 逐位计数掩码: 每个 64 位哈希只取最低位 (按特征数缓存)
+_BIT_MASKS: Dict[int, int] = {}
+
+# 大整数置位计数 (Python 3.10 以下没有 int.bit_count)
+_popcount = getattr(int, "bit_count", None) or (lambda value: bin(value).count("1"))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _feature_digest(feature: str) -> bytes:
+    """特征的 64 位哈希 (8 字节)"""
+    return hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+
+def simhash(features: Dict[str, int]) -> int:
+    """
+    计算加权特征集合的 64 位 SimHash
+    features: {特征: 权重}，每一位取 权重和 过半的特征在该位上的取值
+    全部特征哈希按权重重复后拼接为一个大整数，每一位的计数为一次移位、
+    掩码和置位计数，避免逐特征逐位累加
+    """
+    digests = []
+    for feature, weight in features.items():
+        digest = _feature_digest(feature)
+        digests.extend([digest] * weight if weight > 1 else (digest,))
+    
+    total = len(digests)
+    if not total:
+        return 0
+    
+    mask = _BIT_MASKS.get(total)
+    if mask is None:
+        mask = int.from_bytes(b"\x01\x00\x00\x00\x00\x00\x00\x00" * total, "little")
+        if len(_BIT_MASKS) < 4096:
+            _BIT_MASKS[total] = mask
+    
+    packed = int.from_bytes(b"".join(digests), "little")
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if _popcount((packed >> bit) & mask) * 2 > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+class NearDuplicateIndex:
+    """
+    近似重复帖子索引 (线程安全)
+    - 指纹: 标题+正文的词二元组与规范化URL 的 64 位 SimHash
+    - 查询: 指纹按 bands 分段建桶 (LSH)，汉明距离不超过阈值的指纹至少有一段完全相同，
+      只需比较同桶候选，单帖查询为微秒级
+    - 滚动窗口: 只保留最近 window_days 天加入的指纹，会话结束时持久化到本地文件
+    """
+    
+    def __init__(self, path: Optional[str] = None, window_days: float = 7,
+                 max_distance: int = 7, bands: int = 8, min_features: int = 4,
+                 url_weight: int = 4, max_text_chars: int = 5000):
+        """
+        path: 持久化文件路径，为空时只在内存中使用
+        max_distance: 判定为近似重复的最大汉明距离 (需小于 bands)
+        bands: LSH 分段数 (64 位平均分段)
+        min_features: 特征数少于该值的帖子不参与检测 (过短文本的指纹不稳定)
+        url_weight: 规范化URL特征的权重
+        max_text_chars: 参与计算的正文最大字符数
+        """
+        if max_distance >= bands:
+            raise ValueError("max_distance 必须小于 bands，否则无法保证召回")
+        
+        self.path = path
+        self.window_seconds = window_days * 86400
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = SIMHASH_BITS // bands
+        self.min_features = min_features
+        self.url_weight = url_weight
+        self.max_text_chars = max_text_chars
+        self.logger = logging.getLogger(__name__)
+        
+        self._entries: Dict[str, Tuple[int, float]] = {}   # post_id -> (指纹, 加入时间)
+        self._order: deque = deque()                       # (加入时间, post_id)，按时间淘汰
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(bands)]
+        self._claims: set = set()                           # 筛选阶段预占、尚未写入D1的帖子ID
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "checks": 0,
+            "duplicates": 0,
+            "skipped_short": 0,
+            "added": 0,
+            "reserved": 0,
+            "released": 0,
+            "evicted": 0,
+            "check_seconds": 0.0
+        }
+        
+        if path:
+            self._load()
+    
+    @classmethod
+    def from_config(cls) -> Optional["NearDuplicateIndex"]:
+        """按 NEAR_DUPLICATE_CONFIG 创建索引，未启用时返回 None"""
+        if not NEAR_DUPLICATE_CONFIG.get("enabled", False):
+            return None
+        
+        path = NEAR_DUPLICATE_CONFIG.get("index_path", "data/near_duplicate_index.json")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        
+        return cls(
+            path,
+            window_days=NEAR_DUPLICATE_CONFIG.get("window_days", 7),
+            max_distance=NEAR_DUPLICATE_CONFIG.get("max_distance", 7),
+            bands=NEAR_DUPLICATE_CONFIG.get("bands", 8),
+            min_features=NEAR_DUPLICATE_CONFIG.get("min_features", 4),
+            url_weight=NEAR_DUPLICATE_CONFIG.get("url_weight", 4),
+            max_text_chars=NEAR_DUPLICATE_CONFIG.get("max_text_chars", 5000)
+        )
+    
+    def extract_features(self, title: str, content: str = "", url: Optional[str] = None) -> Dict[str, int]:
+        """提取特征: 标题+正文的词二元组 (去重计权)，外链帖子额外加入规范化URL"""
+        text = ((title or "") + " " + (content or "")[:self.max_text_chars]).lower()
+        tokens = _TOKEN_PATTERN.findall(text)
+        
+        if len(tokens) > 1:
+            features: Dict[str, int] = Counter(map(" ".join, zip(tokens, tokens[1:])))
+        else:
+            features = {token: 1 for token in tokens}
+        
+        canonical = canonicalize_url(url)
+        if canonical:
+            features["url:" + canonical] = self.url_weight
+        
+        return features
+    
+    def fingerprint(self, title: str, content: str = "", url: Optional[str] = None) -> Optional[int]:
+        """计算帖子指纹，特征过少时返回 None (不参与检测)"""
+        features = self.extract_features(title, content, url)
+        if len(features) < self.min_features:
+            return None
+        return simhash(features)
+    
+    def fingerprint_post(self, post) -> Optional[int]:
+        """计算 Reddit 帖子对象的指纹 (自发帖的 url 指向帖子本身，不计入)"""
+        url = None if getattr(post, "is_self", False) else getattr(post, "url", None)
+        return self.fingerprint(getattr(post, "title", ""), getattr(post, "selftext", ""), url)
+    
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.bands)]
+    
+    def _find(self, fingerprint: int, post_id: Optional[str]) -> Optional[str]:
+        """查找近似重复的帖子ID (调用方需持有锁)"""
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate == post_id:
+                    continue
+                if _popcount(self._entries[candidate][0] ^ fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+    
+    def find(self, fingerprint: Optional[int], post_id: Optional[str] = None) -> Optional[str]:
+        """
+        查询窗口内是否存在近似重复的帖子
+        post_id: 当前帖子ID (与自身的匹配不计)
+        返回: 重复的已登记帖子ID，无重复或指纹为空时返回 None
+        """
+        if fingerprint is None:
+            with self._lock:
+                self.stats["skipped_short"] += 1
+            return None
+        
+        start_time = time.perf_counter()
+        with self._lock:
+            self._evict_expired()
+            duplicate_of = self._find(fingerprint, post_id)
+            self.stats["checks"] += 1
+            if duplicate_of is not None:
+                self.stats["duplicates"] += 1
+            self.stats["check_seconds"] += time.perf_counter() - start_time
+        return duplicate_of
+    
+    def add(self, post_id: str, fingerprint: Optional[int], added_at: Optional[float] = None) -> Optional[str]:
+        """
+        登记帖子指纹 (查询与登记在同一把锁内完成，并发线程不会同时放行两个重复帖子)
+        返回: 若此时窗口内已存在近似重复帖子则不登记并返回其ID，否则返回 None
+        """
+        if fingerprint is None:
+            return None
+        
+        with self._lock:
+            duplicate_of = self._find(fingerprint, post_id)
+            if duplicate_of is not None:
+                self.stats["duplicates"] += 1
+                return duplicate_of
+            
+            self._claims.discard(post_id)
+            self._insert(post_id, fingerprint, time.time() if added_at is None else added_at)
+            self.stats["added"] += 1
+        return None
+    
+    def reserve(self, post_id: str, fingerprint: Optional[int]) -> Optional[str]:
+        """
+        筛选阶段预占指纹 (查询与预占在同一把锁内完成)
+        帖子在写后队列中等待写入时，后续的近似重复帖子即被拒绝；
+        写入成功后由 add 转为正式登记，未写入时由 release 释放
+        返回: 窗口内已存在近似重复帖子 (含预占中的帖子) 时返回其ID (不预占)，否则返回 None
+        """
+        if fingerprint is None:
+            with self._lock:
+                self.stats["skipped_short"] += 1
+            return None
+        
+        start_time = time.perf_counter()
+        with self._lock:
+            self._evict_expired()
+            duplicate_of = self._find(fingerprint, post_id)
+            self.stats["checks"] += 1
+            if duplicate_of is not None:
+                self.stats["duplicates"] += 1
+            elif post_id not in self._entries:
+                # 已正式登记的帖子再次出现时不转为预占，避免被释放
+                self._insert(post_id, fingerprint, time.time())
+                self._claims.add(post_id)
+                self.stats["reserved"] += 1
+            self.stats["check_seconds"] += time.perf_counter() - start_time
+        return duplicate_of
+    
+    def release(self, post_id: str) -> bool:
+        """释放帖子的预占指纹 (配额不足或写入失败时调用)，返回是否释放了预占"""
+        with self._lock:
+            if post_id not in self._claims:
+                return False
+            self._claims.discard(post_id)
+            if post_id in self._entries:
+                self._remove(post_id)
+            self.stats["released"] += 1
+        return True
+    
+    def _insert(self, post_id: str, fingerprint: int, added_at: float):
+        """写入索引与分段桶 (调用方需持有锁)"""
+        if post_id in self._entries:
+            self._remove(post_id)
+        
+        self._entries[post_id] = (fingerprint, added_at)
+        self._order.append((added_at, post_id))
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band].setdefault(key, set()).add(post_id)
+    
+    def _remove(self, post_id: str):
+        """从索引与分段桶中移除 (调用方需持有锁)"""
+        fingerprint, _ = self._entries.pop(post_id)
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(post_id)
+                if not bucket:
+                    del self._buckets[band][key]
+    
+    def _evict_expired(self, now: Optional[float] = None):
+        """淘汰超出滚动窗口的指纹 (调用方需持有锁)"""
+        cutoff = (time.time() if now is None else now) - self.window_seconds
+        while self._order and self._order[0][0] < cutoff:
+            added_at, post_id = self._order.popleft()
+            entry = self._entries.get(post_id)
+            # 重新登记过的帖子以最新时间为准
+            if entry is not None and entry[1] == added_at:
+                self._remove(post_id)
+                self._claims.discard(post_id)
+                self.stats["evicted"] += 1
+    
+    def _load(self):
+        """加载持久化的指纹 (丢弃已超出窗口的记录)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.error(f"近似重复索引加载失败，将重新累积: {e}")
+            return
+        
+        cutoff = time.time() - self.window_seconds
+        entries = sorted(data.get("entries", []), key=lambda entry: entry[2])
+        for post_id, fingerprint_hex, added_at in entries:
+            if added_at >= cutoff:
+                self._insert(post_id, int(fingerprint_hex, 16), added_at)
+    
+    def save(self):
+        """持久化窗口内的指纹 (先写临时文件再原子替换，预占中的指纹不持久化)"""
+        if not self.path:
+            return
+        
+        with self._lock:
+            self._evict_expired()
+            entries = [
+                [post_id, format(fingerprint, "016x"), added_at]
+                for post_id, (fingerprint, added_at) in self._entries.items()
+                if post_id not in self._claims
+            ]
+        
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"window_seconds": self.window_seconds, "entries": entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"近似重复索引保存失败: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        """获取检测统计 (含单次查询平均耗时，单位: 微秒)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["claims"] = len(self._claims)
+        stats["avg_check_us"] = round(stats["check_seconds"] / stats["checks"] * 1e6, 1) if stats["checks"] else 0.0
+        del stats["check_seconds"]
+        return stats
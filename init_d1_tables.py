@@ -102,6 +102,11 @@ def init_reddit_tables():
         "CREATE INDEX IF NOT EXISTS idx_posts_subreddit ON reddit_ai_posts(subreddit)",
         "CREATE INDEX IF NOT EXISTS idx_posts_created_utc ON reddit_ai_posts(created_utc DESC)",
         "CREATE INDEX IF NOT EXISTS idx_posts_crawl_date ON reddit_ai_posts(crawl_date DESC)",
+        # 导出键集分页索引 (过滤列, 排序列, id)
+        "CREATE INDEX IF NOT EXISTS idx_posts_export_date_score ON reddit_ai_posts(date(crawl_timestamp, 'unixepoch'), score, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_export_score ON reddit_ai_posts(score, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_export_subreddit_created ON reddit_ai_posts(subreddit, created_utc, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_export_crawl_timestamp ON reddit_ai_posts(crawl_timestamp, id)",
         "CREATE INDEX IF NOT EXISTS idx_keywords_post_id ON reddit_post_keywords(post_id)",
         "CREATE INDEX IF NOT EXISTS idx_tasks_date ON reddit_daily_tasks(task_date DESC)"
     ]
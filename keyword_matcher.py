@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模式关键词匹配
+基于 Aho-Corasick 自动机，初始化时编译一次词典，之后对文本单次线性扫描即可
+找出所有关键词命中 (含分类与位置)
+短关键词 (如 "ai"、"ml"、"r") 可要求整词匹配，避免命中 "said"、"html"、"for" 等普通单词；
+字母与数字的交界也视为词边界 ("gpt4"、"llama3")，并可配置允许的前缀/后缀 ("genai"、"llms")
+"""
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+def _is_word_char(char: str) -> bool:
+    """是否为单词字符 (字母、数字或下划线)"""
+    return char.isalnum() or char == "_"
+
+def _is_boundary(text: str, position: int) -> bool:
+    """text[position] 之前是否为词边界: 文本两端、非单词字符，或字母与数字的交界 ("gpt4"、"4090gpu")"""
+    if position <= 0 or position >= len(text):
+        return True
+    before, after = text[position - 1], text[position]
+    if not _is_word_char(before) or not _is_word_char(after):
+        return True
+    return (before.isalpha() and after.isdigit()) or (before.isdigit() and after.isalpha())
+
+class KeywordHit(NamedTuple):
+    """一次关键词命中"""
+    start: int              # 在文本中的起始位置
+    end: int                # 结束位置 (不含)
+    keyword: str            # 词典中的原始关键词
+    category: str           # 关键词所属分类
+    category_index: int     # 分类在词典中的顺序
+    keyword_index: int      # 关键词在分类中的顺序
+    group: str = ""         # 词典分组 (多个词典合并为一个自动机时使用)
+
+class KeywordMatcher:
+    """Aho-Corasick 关键词自动机 (构建后只读，可在多线程间共享)"""
+    
+    def __init__(self, dictionary: Dict[str, List[str]], word_boundary_max_length: int = 0,
+                 allow_plural_suffix: bool = True, allowed_suffixes: Sequence[str] = (),
+                 allowed_prefixes: Sequence[str] = ()):
+        """
+        dictionary: {分类: [关键词, ...]}，分类与关键词的顺序即优先级顺序
+        word_boundary_max_length: 长度不超过该值的关键词必须整词匹配 (0 表示全部按子串匹配)
+        allow_plural_suffix: 整词匹配时允许结尾多一个 "s" (如 "agents"、"llms")
+        allowed_suffixes: 整词匹配时允许紧跟的其他后缀 (如 "ops" -> "mlops")
+        allowed_prefixes: 整词匹配时允许紧贴的前缀 (如 "gen" -> "genai")
+        匹配不区分大小写，调用方需传入已转小写的文本
+        """
+        self.word_boundary_max_length = word_boundary_max_length
+        self.allow_plural_suffix = allow_plural_suffix
+        suffixes = [suffix.lower() for suffix in allowed_suffixes if suffix]
+        if allow_plural_suffix and "s" not in suffixes:
+            suffixes.append("s")
+        self._suffixes: Tuple[str, ...] = tuple(suffixes)
+        self._prefixes: Tuple[str, ...] = tuple(prefix.lower() for prefix in allowed_prefixes if prefix)
+        self.categories: List[str] = []
+        
+        # 状态转移表、失败指针、每个状态的输出 (模式下标列表)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        
+        # 展开失败指针后的完整转移表 (扫描时每个字符只需一次字典查询)
+        self._delta: List[Dict[str, int]] = [{}]
+        
+        # 模式信息: (小写模式, 原始关键词, 分类, 分类顺序, 关键词顺序, 分组, 左边界检查, 右边界检查)
+        self._patterns: List[tuple] = []
+        
+        self._add_dictionary(dictionary)
+        self._build_failure_links()
+    
+    @classmethod
+    def from_groups(cls, groups: Dict[str, Dict[str, List[str]]], word_boundary_max_length: int = 0,
+                    allow_plural_suffix: bool = True, allowed_suffixes: Sequence[str] = (),
+                    allowed_prefixes: Sequence[str] = ()) -> "KeywordMatcher":
+        """
+        将多个词典编译进同一个自动机，一次扫描即可得到所有词典的命中
+        groups: {分组名: {分类: [关键词, ...]}}，命中通过 KeywordHit.group 区分
+        """
+        matcher = cls({}, word_boundary_max_length, allow_plural_suffix, allowed_suffixes, allowed_prefixes)
+        for group, dictionary in groups.items():
+            matcher._add_dictionary(dictionary, group)
+        matcher._build_failure_links()
+        return matcher
+    
+    def _add_dictionary(self, dictionary: Dict[str, List[str]], group: str = ""):
+        """将一个词典的全部关键词加入字典树 (分类顺序在分组内独立计数)"""
+        for category_index, (category, keywords) in enumerate(dictionary.items()):
+            self.categories.append(category)
+            for keyword_index, keyword in enumerate(keywords):
+                pattern = keyword.lower()
+                if not pattern:
+                    continue
+                
+                # 短关键词需整词匹配；只检查以字母数字开头/结尾的一侧 (如 "c++" 只检查左侧)
+                bounded = len(pattern) <= self.word_boundary_max_length
+                check_left = bounded and _is_word_char(pattern[0])
+                check_right = bounded and _is_word_char(pattern[-1])
+                
+                self._patterns.append((pattern, keyword, category, category_index, keyword_index,
+                                       group, check_left, check_right))
+                self._add_pattern(pattern, len(self._patterns) - 1)
+    
+    def _add_pattern(self, pattern: str, pattern_id: int):
+        """将模式加入字典树"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern_id)
+    
+    def _build_failure_links(self):
+        """
+        广度优先构建失败指针，并合并后缀状态的输出
+        同时展开完整转移表: 每个状态继承其失败状态的转移 (失败状态更浅，已先展开)，
+        未出现的字符回到根状态，扫描时不再沿失败指针回溯
+        """
+        self._delta = [{} for _ in self._goto]
+        self._delta[0] = dict(self._goto[0])
+        
+        queue = deque()
+        for next_state in self._goto[0].values():
+            queue.append(next_state)
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+            
+            delta = dict(self._delta[self._fail[state]])
+            delta.update(self._goto[state])
+            self._delta[state] = delta
+    
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """单次扫描文本，返回全部命中 (按结束位置排序)"""
+        hits = []
+        delta = self._delta
+        output = self._output
+        patterns = self._patterns
+        text_length = len(text)
+        state = 0
+        
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if not output[state]:
+                continue
+            
+            for pattern_id in output[state]:
+                (pattern, keyword, category, category_index, keyword_index,
+                 group, check_left, check_right) = patterns[pattern_id]
+                end = position + 1
+                start = end - len(pattern)
+                
+                if check_left and start > 0 and not self._is_left_boundary(text, start):
+                    continue
+                if check_right and end < text_length and not self._is_right_boundary(text, end):
+                    continue
+                
+                hits.append(KeywordHit(start, end, keyword, category,
+                                       category_index, keyword_index, group))
+        
+        return hits
+    
+    def _is_left_boundary(self, text: str, start: int) -> bool:
+        """检查关键词开头处是否为词边界 (或紧贴允许的前缀，且前缀之前为词边界)"""
+        if _is_boundary(text, start):
+            return True
+        for prefix in self._prefixes:
+            prefix_start = start - len(prefix)
+            if prefix_start >= 0 and text.startswith(prefix, prefix_start) and _is_boundary(text, prefix_start):
+                return True
+        return False
+    
+    def _is_right_boundary(self, text: str, end: int) -> bool:
+        """检查关键词结尾处是否为词边界 (或紧跟允许的后缀，且后缀之后为词边界)"""
+        if _is_boundary(text, end):
+            return True
+        for suffix in self._suffixes:
+            if text.startswith(suffix, end) and _is_boundary(text, end + len(suffix)):
+                return True
+        return False
+    
+    @staticmethod
+    def group_hits(hits: List[KeywordHit]) -> Dict[str, List[KeywordHit]]:
+        """按词典分组拆分命中 (保持原有顺序)"""
+        grouped: Dict[str, List[KeywordHit]] = {}
+        for hit in hits:
+            grouped.setdefault(hit.group, []).append(hit)
+        return grouped
+    
+    @staticmethod
+    def ordered_matches(hits: List[KeywordHit]) -> List[KeywordHit]:
+        """
+        按词典顺序 (分类顺序、关键词顺序) 去重，每个关键词保留首次出现的命中
+        传入的命中需来自同一分组 (多分组时先用 group_hits 拆分)
+        """
+        first_hits: Dict[tuple, KeywordHit] = {}
+        for hit in hits:
+            key = (hit.category_index, hit.keyword_index)
+            if key not in first_hits or hit.start < first_hits[key].start:
+                first_hits[key] = hit
+        return [first_hits[key] for key in sorted(first_hits)]
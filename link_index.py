@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外链规范化与链接目标索引
+同一篇 arXiv 论文、GitHub 仓库或 YouTube 视频常被多个子版块以不同形式的链接转发；
+链接先规范化 (去除跟踪参数、统一 arXiv abs/pdf、GitHub、YouTube 等形式)，
+再以哈希登记到会话索引中，文本分析和存储之前即可跳过重复链接
+"""
+
+import re
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from daily_collection_config import LINK_INDEX_CONFIG
+
+# 跟踪/分享参数 (精确匹配，另外所有 utm_ 前缀参数均移除)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "source", "share", "share_id",
+    "si", "feature", "pp", "s", "t", "context", "cmpid", "_ga", "trk", "spm"
+}
+
+# 只对以下站点生效的参数 (其他站点的 t 等参数可能有含义)
+_SITE_SPECIFIC_PARAMS = {"s", "t", "si", "feature", "pp", "context"}
+_SITE_SPECIFIC_HOSTS = {"twitter.com", "x.com", "youtube.com", "youtu.be", "reddit.com"}
+
+# 去掉的主机名前缀
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "old.", "new.", "np.", "export.")
+
+_ARXIV_ID = re.compile(r"^/(?:abs|pdf|html|format)/(.+?)(?:v\d+)?(?:\.pdf)?/?$")
+_YOUTUBE_ID = re.compile(r"^[\w-]{11}$")
+_REDDIT_COMMENTS = re.compile(r"^(?:/r/[^/]+)?/comments/([a-z0-9]+)", re.IGNORECASE)
+
+# GitHub 仓库下保留独立含义的路径 (其余如 tree/blob/releases 归并到仓库本身)
+_GITHUB_KEEP_SECTIONS = {"issues", "pull", "discussions", "commit", "wiki"}
+
+def _strip_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+def _clean_query(query: str, host: str) -> str:
+    """移除跟踪参数并按参数名排序"""
+    site_specific = host in _SITE_SPECIFIC_HOSTS
+    params = []
+    for key, value in parse_qsl(query, keep_blank_values=False):
+        name = key.lower()
+        if name.startswith("utm_"):
+            continue
+        if name in TRACKING_PARAMS and (name not in _SITE_SPECIFIC_PARAMS or site_specific):
+            continue
+        params.append((key, value))
+    return urlencode(sorted(params))
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """
+    将链接规范化为不含协议的统一形式，非 http(s) 链接返回空字符串
+    - arxiv.org/abs|pdf|html/<id>[vN][.pdf] -> arxiv.org/abs/<id>
+    - github.com/<owner>/<repo>[.git][/tree|blob/...] -> github.com/<owner>/<repo> (小写)
+    - youtu.be/<id>、youtube.com/shorts|embed|live/<id>、watch?v=<id> -> youtube.com/watch?v=<id>
+    - reddit.com/r/<sub>/comments/<id>/... -> reddit.com/comments/<id>
+    - 其他: 主机名小写并去掉 www. 等前缀，移除跟踪参数、锚点和末尾斜杠
+    """
+    if not url:
+        return ""
+    
+    try:
+        parts = urlsplit(url.strip())
+        host = _strip_host(parts.hostname or "")
+    except ValueError:
+        return ""
+    
+    if parts.scheme.lower() not in ("http", "https") or not host:
+        return ""
+    
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    
+    if host == "arxiv.org":
+        match = _ARXIV_ID.match(path)
+        if match:
+            return f"arxiv.org/abs/{match.group(1)}"
+    
+    elif host in ("github.com", "raw.githubusercontent.com"):
+        segments = [segment for segment in path.split("/") if segment]
+        if len(segments) >= 2:
+            owner, repo = segments[0].lower(), segments[1].lower()
+            if repo.endswith(".git"):
+                repo = repo[:-4]
+            canonical = f"github.com/{owner}/{repo}"
+            if host == "github.com" and len(segments) >= 4 and segments[2] in _GITHUB_KEEP_SECTIONS:
+                canonical += f"/{segments[2]}/{segments[3]}"
+            return canonical
+    
+    elif host in ("youtube.com", "youtu.be", "music.youtube.com", "youtube-nocookie.com"):
+        video_id = None
+        segments = [segment for segment in path.split("/") if segment]
+        if host == "youtu.be" and segments:
+            video_id = segments[0]
+        elif segments and segments[0] in ("shorts", "embed", "live", "v") and len(segments) > 1:
+            video_id = segments[1]
+        elif segments == ["watch"]:
+            video_id = dict(parse_qsl(parts.query)).get("v")
+        if video_id and _YOUTUBE_ID.match(video_id):
+            return f"youtube.com/watch?v={video_id}"
+    
+    elif host == "reddit.com" or host.endswith(".reddit.com") or host == "redd.it":
+        if host == "redd.it":
+            segments = [segment for segment in path.split("/") if segment]
+            if segments:
+                return f"reddit.com/comments/{segments[0].lower()}"
+        else:
+            match = _REDDIT_COMMENTS.match(path)
+            if match:
+                return f"reddit.com/comments/{match.group(1).lower()}"
+            host = "reddit.com"
+    
+    canonical = host + (path.rstrip("/") or "")
+    query = _clean_query(parts.query, host)
+    return f"{canonical}?{query}" if query else canonical
+
+def link_kind(canonical: str) -> str:
+    """链接类型 (用于命中统计)"""
+    host = canonical.split("/", 1)[0]
+    if host in ("arxiv.org", "github.com", "youtube.com", "reddit.com"):
+        return host.split(".", 1)[0]
+    return "other"
+
+def link_hash(canonical: str) -> int:
+    """规范化链接的 64 位哈希 (索引键)"""
+    return int.from_bytes(hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest(), "little")
+
+class LinkIndex:
+    """
+    链接目标索引 (线程安全)
+    以规范化链接的哈希为键记录首个采集该链接的帖子，
+    会话开始时以D1中最近采集的帖子链接预热，会话内采集的帖子实时登记
+    """
+    
+    def __init__(self, preload_days: int = 30):
+        """preload_days: 会话开始时从D1预加载最近几天已采集帖子的链接"""
+        self.preload_days = preload_days
+        self._links: Dict[int, str] = {}   # 链接哈希 -> 帖子ID
+        self._claims: Dict[str, int] = {}  # 筛选阶段预占、尚未写入D1的帖子ID -> 链接哈希
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "seeded": 0,
+            "checks": 0,
+            "hits": 0,
+            "registered": 0,
+            "claimed": 0,
+            "released": 0,
+            "by_kind": {},
+            "by_subreddit": {}
+        }
+    
+    @classmethod
+    def from_config(cls) -> Optional["LinkIndex"]:
+        """按 LINK_INDEX_CONFIG 创建索引，未启用时返回 None"""
+        if not LINK_INDEX_CONFIG.get("enabled", False):
+            return None
+        return cls(preload_days=LINK_INDEX_CONFIG.get("preload_days", 30))
+    
+    @staticmethod
+    def post_link(post) -> str:
+        """读取帖子的规范化外链 (自发帖的 url 指向帖子本身，返回空字符串)"""
+        if getattr(post, "is_self", False):
+            return ""
+        return canonicalize_url(getattr(post, "url", None))
+    
+    def seed(self, links: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        以已采集帖子的链接预热索引
+        links: [(post_id, 原始url), ...]
+        返回: 新登记的链接数
+        """
+        added = 0
+        with self._lock:
+            for post_id, url in links:
+                canonical = canonicalize_url(url)
+                if canonical:
+                    key = link_hash(canonical)
+                    if key not in self._links:
+                        self._links[key] = post_id
+                        added += 1
+            self.stats["seeded"] += added
+        return added
+    
+    def _subreddit_stats(self, subreddit: str) -> Dict:
+        return self.stats["by_subreddit"].setdefault(subreddit or "unknown", {"checks": 0, "hits": 0})
+    
+    def _record_hit(self, canonical: str, subreddit: str):
+        """记录一次重复链接命中 (调用方需持有锁)"""
+        kind = link_kind(canonical)
+        self.stats["hits"] += 1
+        self.stats["by_kind"][kind] = self.stats["by_kind"].get(kind, 0) + 1
+        self._subreddit_stats(subreddit)["hits"] += 1
+    
+    def find(self, canonical: str, post_id: Optional[str] = None,
+             subreddit: str = "") -> Optional[str]:
+        """
+        查询链接是否已被其他帖子采集
+        返回: 已采集该链接的帖子ID，未采集或链接为空时返回 None
+        """
+        if not canonical:
+            return None
+        
+        key = link_hash(canonical)
+        with self._lock:
+            owner = self._links.get(key)
+            if owner == post_id:
+                owner = None
+            
+            self.stats["checks"] += 1
+            self._subreddit_stats(subreddit)["checks"] += 1
+            if owner is not None:
+                self._record_hit(canonical, subreddit)
+        return owner
+    
+    def claim(self, canonical: str, post_id: str, subreddit: str = "") -> Optional[str]:
+        """
+        筛选阶段预占链接 (查询与预占在同一把锁内完成)
+        帖子在写后队列中等待写入或由其他线程处理时，同一链接的后续帖子即被拒绝；
+        写入成功后由 register 转为正式登记，未写入时由 release 释放
+        返回: 链接已被其他帖子采集或预占时返回其ID (不预占)，链接为空时返回 None
+        """
+        if not canonical:
+            return None
+        
+        key = link_hash(canonical)
+        with self._lock:
+            owner = self._links.get(key)
+            if owner == post_id:
+                owner = None
+            
+            self.stats["checks"] += 1
+            self._subreddit_stats(subreddit)["checks"] += 1
+            if owner is not None:
+                self._record_hit(canonical, subreddit)
+            elif key not in self._links:
+                self._links[key] = post_id
+                self._claims[post_id] = key
+                self.stats["claimed"] += 1
+        return owner
+    
+    def release(self, post_id: str) -> bool:
+        """释放帖子预占的链接 (配额不足或写入失败时调用)，返回是否释放了预占"""
+        with self._lock:
+            key = self._claims.pop(post_id, None)
+            if key is None:
+                return False
+            if self._links.get(key) == post_id:
+                del self._links[key]
+            self.stats["released"] += 1
+        return True
+    
+    def register(self, canonical: str, post_id: str, subreddit: str = "") -> Optional[str]:
+        """
+        登记帖子的链接 (查询与登记在同一把锁内完成)
+        返回: 该链接已被其他帖子登记时返回其ID (不登记)，否则返回 None
+        """
+        if not canonical:
+            return None
+        
+        key = link_hash(canonical)
+        with self._lock:
+            owner = self._links.get(key)
+            if owner is not None and owner != post_id:
+                self._record_hit(canonical, subreddit)
+                return owner
+            
+            self._links[key] = post_id
+            self._claims.pop(post_id, None)
+            self.stats["registered"] += 1
+        return None
+    
+    def __len__(self) -> int:
+        return len(self._links)
+    
+    def get_stats(self) -> Dict:
+        """获取命中统计 (含各子版块的查询数、命中数与命中率)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._links)
+            stats["claims"] = len(self._claims)
+            stats["by_kind"] = dict(self.stats["by_kind"])
+            stats["by_subreddit"] = {
+                subreddit: dict(values, hit_rate=round(values["hits"] / values["checks"], 3) if values["checks"] else 0.0)
+                for subreddit, values in sorted(self.stats["by_subreddit"].items())
+            }
+        stats["hit_rate"] = round(stats["hits"] / stats["checks"], 3) if stats["checks"] else 0.0
+        return stats
@@ -3,36 +3,125 @@
 """
 Reddit AI 内容采集系统主程序
 统一入口，提供各种功能的命令行接口
+各子命令的依赖模块在执行该命令时才导入，避免无关命令加载 praw、schedule 等重量级依赖
 """
 
 import sys
 import os
+import json
+import time
+import hashlib
 import argparse
+import importlib
 from datetime import datetime
+from typing import Dict, List, Optional
 import pytz
 
 # 添加当前目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import validate_config
-from reddit_crawler import RedditAICrawler
-from scheduler import SchedulerManager
-from monitor import SystemMonitor
-from database_manager import D1DatabaseManager
+# 各子命令依赖的模块 (仅在执行该子命令时导入)
+COMMAND_MODULES = {
+    "env": ["config", "database_manager"],
+    "collect": ["config", "database_manager"],
+    "scheduler": ["config", "database_manager", "scheduler"],
+    "monitor": ["config", "database_manager", "monitor"],
+    "database": ["config", "database_manager"],
+    "reprocess": ["config", "database_manager", "content_processor", "nlp_pipeline", "tfidf_index"],
+}
 
-def setup_environment():
-    """环境检查和设置"""
+def get_command_modules(args) -> List[str]:
+    """获取子命令需要导入的模块列表"""
+    modules = list(COMMAND_MODULES.get(args.command, []))
+    
+    # 采集命令只导入所选引擎 (异步引擎依赖 asyncpraw/aiohttp)
+    if args.command == "collect":
+        modules.append("async_reddit_crawler" if args.engine == "async" else "reddit_crawler")
+    
+    return modules
+
+def import_command_modules(args) -> bool:
+    """导入子命令依赖的模块，缺少依赖时给出明确提示"""
+    for module_name in get_command_modules(args):
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"❌ 无法加载 {args.command} 命令所需模块 {module_name}: {e}")
+            return False
+    return True
+
+def _env_fingerprint() -> str:
+    """当前环境配置的指纹 (配置变化后缓存自动失效，缓存文件中不保存密钥)"""
+    from config import REDDIT_CONFIG, DATABASE_CONFIG
+    
+    raw = "|".join(str(value) for value in (
+        REDDIT_CONFIG["client_id"],
+        DATABASE_CONFIG["api_token"],
+        DATABASE_CONFIG["account_id"],
+        DATABASE_CONFIG["database_id"],
+    ))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _load_env_check_cache(cache_file: str, fingerprint: str, ttl: int) -> Optional[Dict]:
+    """读取有效期内的环境检查结果"""
     try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    
+    if time.time() - cached.get("checked_at", 0) > ttl:
+        return None
+    
+    return cached
+
+def _save_env_check_cache(cache_file: str, fingerprint: str, table_count: int):
+    """保存环境检查结果"""
+    try:
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "fingerprint": fingerprint,
+                "checked_at": time.time(),
+                "table_count": table_count
+            }, f)
+    except OSError as e:
+        print(f"⚠️ 无法写入环境检查缓存: {e}")
+
+def setup_environment(use_cache: bool = True):
+    """
+    环境检查和设置
+    数据库连通性检查结果缓存 SYSTEM_CONFIG["env_check_ttl"] 秒，有效期内不再访问D1
+    """
+    try:
+        from config import validate_config, SYSTEM_CONFIG
+        
         # 验证配置
         validate_config()
         print("✅ 配置验证通过")
         
+        ttl = SYSTEM_CONFIG.get("env_check_ttl", 0)
+        cache_file = SYSTEM_CONFIG.get("env_check_cache_file")
+        fingerprint = _env_fingerprint()
+        
+        if use_cache and ttl > 0 and cache_file:
+            cached = _load_env_check_cache(cache_file, fingerprint, ttl)
+            if cached:
+                age = int(time.time() - cached["checked_at"])
+                print(f"✅ 数据库连接正常，发现 {cached['table_count']} 个表 (缓存结果，{age} 秒前检查)")
+                return True
+        
         # 测试数据库连接
+        from database_manager import D1DatabaseManager
         db = D1DatabaseManager()
         result = db.execute_query("SELECT COUNT(*) as count FROM sqlite_master WHERE type='table'")
         if result.get("results"):
             table_count = result["results"][0]["count"]
             print(f"✅ 数据库连接正常，发现 {table_count} 个表")
+            if ttl > 0 and cache_file:
+                _save_env_check_cache(cache_file, fingerprint, table_count)
         else:
             print("⚠️ 数据库连接成功，但可能未初始化")
         
@@ -42,13 +131,23 @@ def setup_environment():
         print(f"❌ 环境检查失败: {e}")
         return False
 
-def run_collection():
+def run_collection(engine="sync"):
     """执行采集任务"""
-    print("开始执行Reddit AI内容采集...")
+    print(f"开始执行Reddit AI内容采集 (引擎: {engine})...")
     
     try:
-        crawler = RedditAICrawler()
-        success = crawler.collect_daily_posts()
+        if engine == "async":
+            # 异步引擎依赖 asyncpraw/aiohttp，仅在选择时导入
+            import asyncio
+            from async_reddit_crawler import AsyncRedditAICrawler
+            
+            crawler = AsyncRedditAICrawler()
+            success = asyncio.run(crawler.run())
+        else:
+            from reddit_crawler import RedditAICrawler
+            
+            crawler = RedditAICrawler()
+            success = crawler.collect_daily_posts()
         
         summary = crawler.get_collection_summary()
         
@@ -58,6 +157,14 @@ def run_collection():
         print(f"目标完成度: {summary['target_achievement']}")
         print(f"API调用数: {summary['api_calls']}")
         
+        transport = summary.get('d1_transport')
+        if transport:
+            print(f"D1请求数: {transport['requests']} (新建连接: {transport['new_connections']}, 复用连接: {transport['reused_connections']})")
+        
+        evaluation = summary.get('evaluation_cache')
+        if evaluation:
+            print(f"重复帖子跳过: {evaluation['hits']}/{evaluation['lookups']} (命中率: {evaluation['hit_rate']:.1%}, 交叉帖: {evaluation['crosspost_hits']})")
+        
         if summary['subreddit_breakdown']:
             print("\n各子版块统计:")
             for subreddit, count in sorted(summary['subreddit_breakdown'].items(), key=lambda x: x[1], reverse=True):
@@ -77,6 +184,8 @@ def run_collection():
 
 def run_scheduler(mode="start"):
     """运行调度器"""
+    from scheduler import SchedulerManager
+    
     manager = SchedulerManager()
     
     if mode == "start":
@@ -99,6 +208,8 @@ def run_scheduler(mode="start"):
 
 def run_monitor(command="health"):
     """运行监控"""
+    from monitor import SystemMonitor
+    
     monitor = SystemMonitor()
     
     if command == "health":
@@ -149,6 +260,8 @@ def run_monitor(command="health"):
 
 def run_database(command="status"):
     """数据库管理"""
+    from database_manager import D1DatabaseManager
+    
     db = D1DatabaseManager()
     
     if command == "status":
@@ -189,9 +302,11 @@ def run_database(command="status"):
     
     return 0
 
-def main():
-    """主程序入口"""
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(description="Reddit AI 内容采集系统")
+    parser.add_argument('--skip-env-check', action='store_true',
+                        help='跳过环境检查 (配置验证与D1连通性测试)')
     subparsers = parser.add_subparsers(dest='command', help='可用命令')
     
     # 环境检查命令
@@ -199,6 +314,8 @@ def main():
     
     # 采集命令
     parser_collect = subparsers.add_parser('collect', help='执行采集任务')
+    parser_collect.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                                help='采集引擎 (sync: PRAW线程池, async: asyncpraw事件循环)')
     
     # 调度器命令
     parser_scheduler = subparsers.add_parser('scheduler', help='调度器管理')
@@ -215,6 +332,158 @@ def main():
     parser_db.add_argument('action', choices=['status', 'cleanup', 'test'],
                           default='status', nargs='?', help='数据库操作')
     
+    # 存量数据重新处理命令
+    parser_reprocess = subparsers.add_parser('reprocess', help='按当前规则重新计算存量帖子的评分与分类')
+    parser_reprocess.add_argument('--batch-size', type=int, default=500, help='每批读取和处理的帖子数')
+    parser_reprocess.add_argument('--dry-run', action='store_true', help='只统计变化，不写入数据库')
+    parser_reprocess.add_argument('--workers', type=int, default=None,
+                                  help='文本分析工作进程数 (默认读取配置，1 为当前进程内处理)')
+    parser_reprocess.add_argument('--keywords', action='store_true', help='同时重新提取并替换关键词')
+    parser_reprocess.add_argument('--rebuild-df', action='store_true',
+                                  help='先从存量帖子重建TF-IDF文档频率索引 (--keywords 时即使用重建后的IDF)')
+    
+    return parser
+
+def _scores_changed(row: Dict, update: Dict) -> bool:
+    """比较存量帖子的评分与分类是否因规则变化而改变"""
+    for field in ("quality_score", "tech_relevance_score"):
+        if round(row.get(field) or 0.0, 4) != round(update[field], 4):
+            return True
+    
+    return (row.get("ai_category") != update["ai_category"] or
+            row.get("content_category") != update["content_category"])
+
+def _iter_archived_posts(db, batch_size: int):
+    """按帖子ID键集分页逐条读取存量帖子"""
+    last_id = ""
+    while True:
+        rows = db.get_posts_page(last_id, batch_size)
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        yield from rows
+        
+        if len(rows) < batch_size:
+            return
+
+def _rebuild_document_frequency(db, batch_size: int, dry_run: bool = False) -> bool:
+    """
+    按帖子ID键集分页读取全部存量帖子，重建TF-IDF文档频率索引 (替换现有快照与日志)
+    索引只随新入库的帖子增量累积，首次启用或索引丢失后用于从归档回填
+    """
+    from content_processor import ContentProcessor
+    from tfidf_index import DocumentFrequencyIndex
+    
+    tfidf_index = DocumentFrequencyIndex.from_config()
+    if tfidf_index is None:
+        print("⚠️ TF-IDF文档频率索引未启用 (TFIDF_CONFIG)，跳过重建")
+        return False
+    
+    # 与写入回调相同的分词方式 (标题 + 正文)
+    processor = ContentProcessor()
+    documents = (
+        processor.extract_terms((row.get("title") or "") + " " + (row.get("selftext") or ""))
+        for row in _iter_archived_posts(db, batch_size)
+    )
+    
+    print("开始从存量帖子重建文档频率索引...")
+    if dry_run:
+        doc_count = 0
+        terms = set()
+        for document in documents:
+            terms.update(document)
+            doc_count += 1
+        print(f"  存量帖子 {doc_count} 篇，词项 {len(terms)} 个 (试运行，未写入索引)")
+        return True
+    
+    doc_count = tfidf_index.rebuild(documents)
+    stats = tfidf_index.get_stats()
+    print(f"✅ 文档频率索引已重建: {doc_count} 篇帖子，保留词项 {stats['terms']} 个 "
+          f"(裁剪低频词项 {stats['terms_pruned']} 个)")
+    return True
+
+def run_reprocess(batch_size=500, dry_run=False, workers=None, keywords=False, rebuild_df=False):
+    """
+    按当前规则重新计算存量帖子的质量评分、时间加权评分与分类
+    workers: 文本分析工作进程数 (默认读取 NLP_PIPELINE_CONFIG，1 为当前进程内处理)
+    keywords: 同时重新提取并替换帖子的关键词
+    rebuild_df: 先从存量帖子重建TF-IDF文档频率索引 (工作进程启动时加载重建后的索引)
+    """
+    from database_manager import D1DatabaseManager
+    from nlp_pipeline import NLPPipeline
+    from post_pipeline import MAX_KEYWORDS_PER_POST
+    
+    db = D1DatabaseManager()
+    pipeline = NLPPipeline(workers=workers, extract_keywords=keywords)
+    
+    print(f"开始重新处理存量帖子 (每批 {batch_size} 条，{pipeline.workers} 个工作进程"
+          f"{'，重新提取关键词' if keywords else ''}{'，仅统计不写入' if dry_run else ''})...")
+    
+    start_time = time.time()
+    scanned = changed = updated = keywords_written = 0
+    
+    try:
+        # 工作进程在首个分块时才启动并加载索引，重建后的IDF即可用于关键词提取
+        if rebuild_df:
+            _rebuild_document_frequency(db, batch_size, dry_run)
+        
+        # 分块结果按读取顺序返回，逐块写入
+        for rows, result in pipeline.process(_iter_archived_posts(db, batch_size)):
+            updates = []
+            for i, row in enumerate(rows):
+                update = {
+                    "id": row["id"],
+                    "quality_score": result["quality_score"][i],
+                    "tech_relevance_score": result["tech_relevance_score"][i],
+                    "ai_category": result["ai_category"][i],
+                    "content_category": result["content_category"][i],
+                    # 技术分类记录随评分一起替换
+                    "classification": result["classifications"][i]
+                }
+                if _scores_changed(row, update):
+                    updates.append(update)
+            
+            scanned += len(rows)
+            changed += len(updates)
+            
+            if not dry_run:
+                if updates:
+                    updated += db.update_post_scores(updates)
+                if keywords:
+                    keywords_written += db.replace_post_keywords({
+                        row["id"]: result["keywords"][i][:MAX_KEYWORDS_PER_POST]
+                        for i, row in enumerate(rows)
+                    })
+            
+            print(f"  已处理 {scanned} 条，评分或分类变化 {changed} 条")
+    finally:
+        pipeline.close()
+        db.close()
+    
+    duration = time.time() - start_time
+    stats = pipeline.get_stats()
+    
+    print("\n=== 重新处理结果 ===")
+    print(f"扫描帖子: {scanned}")
+    print(f"发生变化: {changed}")
+    print(f"已更新: {updated}{' (试运行，未写入)' if dry_run else ''}")
+    if keywords:
+        print(f"写入关键词: {keywords_written}{' (试运行，未写入)' if dry_run else ''}")
+    if stats["failed_posts"]:
+        print(f"处理失败: {stats['failed_posts']} 条 ({stats['failed_chunks']} 个分块)")
+    print(f"耗时: {duration:.1f} 秒 ({scanned / duration if duration else 0:.0f} 帖子/秒)")
+    
+    print("\n=== 工作进程吞吐量 ===")
+    for worker_id, worker in stats["per_worker"].items():
+        print(f"  进程 {worker_id}: {worker['posts']} 条 / {worker['chunks']} 块，"
+              f"{worker['busy_seconds']:.1f} 秒，{worker['posts_per_second']:.0f} 帖子/秒")
+    
+    return 1 if stats["failed_posts"] else 0
+
+def main():
+    """主程序入口"""
+    parser = build_parser()
+    
     # 解析参数
     args = parser.parse_args()
     
@@ -231,30 +500,33 @@ def main():
     print(f"当前时间: {current_time}")
     print()
     
-    # 执行命令
+    # 只导入当前子命令需要的模块
+    if not import_command_modules(args):
+        return 1
+    
+    # env 命令总是执行完整检查，其他命令可使用缓存结果或跳过
     if args.command == 'env':
-        return 0 if setup_environment() else 1
+        return 0 if setup_environment(use_cache=False) else 1
     
-    elif args.command == 'collect':
-        if not setup_environment():
-            return 1
-        return run_collection()
+    if not args.skip_env_check and not setup_environment():
+        return 1
+    
+    # 执行命令
+    if args.command == 'collect':
+        return run_collection(args.engine)
     
     elif args.command == 'scheduler':
-        if not setup_environment():
-            return 1
         return run_scheduler(args.action)
     
     elif args.command == 'monitor':
-        if not setup_environment():
-            return 1
         return run_monitor(args.action)
     
     elif args.command == 'database':
-        if not setup_environment():
-            return 1
         return run_database(args.action)
     
+    elif args.command == 'reprocess':
+        return run_reprocess(args.batch_size, args.dry_run, args.workers, args.keywords, args.rebuild_df)
+    
     else:
         parser.print_help()
         return 1
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程文本分析流水线
+存量数据重新处理时，关键词匹配、分类和关键词提取受 GIL 限制只能用满一个核心；
+本模块将帖子按分块分发到多个工作进程 (每个进程持有自己预编译的 ContentProcessor)，
+结果按输入顺序以分块为单位流式返回，并统计每个工作进程的吞吐量
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from daily_collection_config import NLP_PIPELINE_CONFIG
+
+# 工作进程内的处理器 (由进程初始化函数创建，进程内复用)
+_worker_processor = None
+_worker_extract_keywords = False
+
+def post_rows_to_columns(rows: List[Dict]) -> Dict[str, List]:
+    """将数据库读出的帖子行转换为 ContentProcessor.process_batch 的列式输入"""
+    return {
+        "titles": [row.get("title") for row in rows],
+        "bodies": [row.get("selftext") for row in rows],
+        "scores": [row.get("score") for row in rows],
+        "num_comments": [row.get("num_comments") for row in rows],
+        "upvote_ratios": [row.get("upvote_ratio") for row in rows],
+        "has_url": [row.get("url") for row in rows],
+        "created_utc": [row.get("created_utc") for row in rows],
+        # 帖子年龄按采集时间计算，使时效分与入库时一致
+        "reference_times": [row.get("crawl_timestamp") for row in rows],
+    }
+
+def _create_processor(match_mode: Optional[str], use_tfidf_index: bool):
+    """创建内容处理器 (按需加载只读的文档频率索引)"""
+    from content_processor import ContentProcessor
+    
+    tfidf_index = None
+    if use_tfidf_index:
+        from tfidf_index import DocumentFrequencyIndex
+        tfidf_index = DocumentFrequencyIndex.from_config()
+    
+    return ContentProcessor(match_mode=match_mode, tfidf_index=tfidf_index)
+
+def _init_worker(match_mode: Optional[str], extract_keywords: bool, use_tfidf_index: bool):
+    """工作进程初始化: 构建关键词自动机并预加载停用词，之后每个分块直接复用"""
+    global _worker_processor, _worker_extract_keywords
+    
+    _worker_processor = _create_processor(match_mode, use_tfidf_index and extract_keywords)
+    _worker_extract_keywords = extract_keywords
+    if extract_keywords:
+        # 访问属性即触发停用词加载
+        _worker_processor.stop_words
+
+def _process_chunk(rows: List[Dict]) -> Tuple[int, float, Dict[str, List]]:
+    """
+    在工作进程中处理一个分块
+    返回: (进程ID, 处理耗时(秒), 列式处理结果)
+    """
+    start_time = time.perf_counter()
+    result = _worker_processor.process_batch(
+        post_rows_to_columns(rows),
+        extract_keywords=_worker_extract_keywords
+    )
+    return os.getpid(), time.perf_counter() - start_time, result
+
+class NLPPipeline:
+    """
+    多进程文本分析流水线
+    - 输入按 chunk_size 切分为分块，提交到进程池，最多同时提交 max_inflight_chunks 个分块 (背压)
+    - 结果按输入顺序逐块返回 (先提交的分块先返回)
+    - workers 为 1 时在当前进程内处理，接口与结果一致
+    """
+    
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 extract_keywords: bool = False, match_mode: Optional[str] = None,
+                 max_inflight_chunks: Optional[int] = None, start_method: Optional[str] = None,
+                 use_tfidf_index: Optional[bool] = None):
+        """
+        workers: 工作进程数 (0 或 None 读取配置，配置为 0 时取 CPU 核数)
+        chunk_size: 每个分块的帖子数
+        extract_keywords: 是否同时提取关键词
+        match_mode: 关键词匹配方式，默认读取 KEYWORD_MATCHING_CONFIG
+        """
+        workers = workers or NLP_PIPELINE_CONFIG.get("workers", 0) or os.cpu_count() or 1
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size or NLP_PIPELINE_CONFIG.get("chunk_size", 200))
+        self.max_inflight_chunks = max(
+            1,
+            max_inflight_chunks or NLP_PIPELINE_CONFIG.get("max_inflight_chunks", 0) or self.workers * 2
+        )
+        self.extract_keywords = extract_keywords
+        self.match_mode = match_mode
+        self.start_method = start_method or NLP_PIPELINE_CONFIG.get("start_method")
+        if use_tfidf_index is None:
+            use_tfidf_index = NLP_PIPELINE_CONFIG.get("use_tfidf_index", True)
+        self.use_tfidf_index = use_tfidf_index
+        
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._local_processor = None
+        
+        self.stats = {
+            "chunks": 0,
+            "posts": 0,
+            "failed_chunks": 0,
+            "failed_posts": 0,
+            "wall_seconds": 0.0
+        }
+        self.worker_stats: Dict[int, Dict] = {}
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """创建进程池 (首次使用时)"""
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method) if self.start_method else None
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.match_mode, self.extract_keywords, self.use_tfidf_index)
+            )
+        return self._executor
+    
+    def _process_local(self, rows: List[Dict]) -> Tuple[int, float, Dict[str, List]]:
+        """在当前进程内处理一个分块 (workers 为 1 时使用)"""
+        if self._local_processor is None:
+            self._local_processor = _create_processor(
+                self.match_mode, self.use_tfidf_index and self.extract_keywords
+            )
+        
+        start_time = time.perf_counter()
+        result = self._local_processor.process_batch(
+            post_rows_to_columns(rows),
+            extract_keywords=self.extract_keywords
+        )
+        return os.getpid(), time.perf_counter() - start_time, result
+    
+    def _iter_chunks(self, rows: Iterable[Dict]) -> Iterator[List[Dict]]:
+        """将输入切分为分块 (输入可以是生成器，不会一次性读入内存)"""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def _record(self, rows: List[Dict], outcome: Optional[Tuple[int, float, Dict]]):
+        """记录一个分块的处理统计"""
+        self.stats["chunks"] += 1
+        if outcome is None:
+            self.stats["failed_chunks"] += 1
+            self.stats["failed_posts"] += len(rows)
+            return
+        
+        self.stats["posts"] += len(rows)
+        worker_id, seconds, _ = outcome
+        worker = self.worker_stats.setdefault(worker_id, {"chunks": 0, "posts": 0, "busy_seconds": 0.0})
+        worker["chunks"] += 1
+        worker["posts"] += len(rows)
+        worker["busy_seconds"] += seconds
+    
+    def process(self, rows: Iterable[Dict]) -> Iterator[Tuple[List[Dict], Dict[str, List]]]:
+        """
+        按输入顺序逐块返回处理结果
+        rows: 帖子行 (需包含 title, selftext, score, num_comments, upvote_ratio, url,
+              created_utc, crawl_timestamp)
+        返回: 生成器，每项为 (分块内的帖子行, 列式处理结果)；处理失败的分块记录错误后跳过
+        """
+        start_time = time.time()
+        pending = deque()
+        
+        try:
+            if self.workers == 1:
+                for chunk in self._iter_chunks(rows):
+                    try:
+                        outcome = self._process_local(chunk)
+                    except Exception as e:
+                        self.logger.error(f"文本分析分块处理失败 ({len(chunk)} 条): {e}")
+                        outcome = None
+                    self._record(chunk, outcome)
+                    if outcome is not None:
+                        yield chunk, outcome[2]
+                return
+            
+            executor = self._get_executor()
+            
+            for chunk in self._iter_chunks(rows):
+                pending.append((chunk, executor.submit(_process_chunk, chunk)))
+                
+                # 提交数达到上限时先等待最早的分块，保证顺序并限制内存占用
+                while len(pending) >= self.max_inflight_chunks:
+                    result = self._collect(*pending.popleft())
+                    if result is not None:
+                        yield result
+            
+            while pending:
+                result = self._collect(*pending.popleft())
+                if result is not None:
+                    yield result
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的分块
+            for _, future in pending:
+                future.cancel()
+            self.stats["wall_seconds"] += time.time() - start_time
+    
+    def _collect(self, chunk: List[Dict], future) -> Optional[Tuple[List[Dict], Dict[str, List]]]:
+        """等待一个分块完成并记录统计，失败时返回 None"""
+        try:
+            outcome = future.result()
+        except Exception as e:
+            self.logger.error(f"文本分析分块处理失败 ({len(chunk)} 条): {e}")
+            outcome = None
+        
+        self._record(chunk, outcome)
+        return (chunk, outcome[2]) if outcome is not None else None
+    
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def get_stats(self) -> Dict:
+        """获取处理统计 (含每个工作进程的吞吐量，单位: 帖子/秒)"""
+        stats = dict(self.stats)
+        stats["workers"] = self.workers
+        stats["posts_per_second"] = round(stats["posts"] / stats["wall_seconds"], 1) if stats["wall_seconds"] else 0.0
+        stats["per_worker"] = {
+            worker_id: {
+                "chunks": worker["chunks"],
+                "posts": worker["posts"],
+                "busy_seconds": round(worker["busy_seconds"], 3),
+                "posts_per_second": round(worker["posts"] / worker["busy_seconds"], 1) if worker["busy_seconds"] else 0.0
+            }
+            for worker_id, worker in sorted(self.worker_stats.items())
+        }
+        return stats
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+用于对比优化前后的单帖CPU耗时、写入量等指标 (除 --source db 外不访问 Reddit 和 D1)
+
+使用方法:
+    python perf_benchmark.py analysis --posts 500 --ai-ratio 0.3
+    python perf_benchmark.py matching --source synthetic --posts 1000
+    python perf_benchmark.py matching --source db --limit 1000
+    python perf_benchmark.py imports --target-ms 300
+    python perf_benchmark.py startup --target-ms 300
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from daily_collection_config import AI_KEYWORDS
+
+# 合成帖子使用的填充词
+FILLER_WORDS = [
+    "the", "a", "we", "this", "new", "results", "show", "using", "with", "for",
+    "open", "source", "release", "paper", "github", "benchmark", "python", "team",
+    "performance", "dataset", "training", "question", "help", "thoughts", "week"
+]
+
+# 冷启动导入耗时检测的默认模块
+IMPORT_BENCHMARK_MODULES = ["content_processor", "keyword_matcher", "database_manager"]
+
+# 冷启动耗时检测的 main.py 子命令
+STARTUP_BENCHMARK_COMMANDS = [
+    ["env"],
+    ["collect"],
+    ["collect", "--engine", "async"],
+    ["scheduler", "status"],
+    ["monitor", "health"],
+    ["database", "test"],
+]
+
+# 只解析参数并导入子命令依赖模块，不执行环境检查和命令本身
+STARTUP_PROBE = (
+    "import sys, main; "
+    "args = main.build_parser().parse_args(sys.argv[1:]); "
+    "sys.exit(0 if main.import_command_modules(args) else 1)"
+)
+
+# 冷启动耗时目标 (毫秒，不含解释器本身的启动时间)
+DEFAULT_STARTUP_TARGET_MS = 300
+
+# 与AI无关的日常用词 (其中不少包含 "ai"、"ml"、"r" 等短关键词子串)
+GENERIC_WORDS = [
+    "said", "email", "html", "for", "more", "fair", "rain", "details", "maintain",
+    "smartphone", "garden", "around", "brain", "train", "station", "travel", "recipe",
+    "weekend", "family", "photos", "agenda", "mailbox", "dinner", "market", "curve"
+]
+
+# 与数字、前缀或后缀连写的AI术语 (整词匹配需正确处理的真阳性)
+GLUED_AI_TERMS = ["GPT4", "gpt4o", "GenAI", "AIs", "LLMs", "MLOps", "agentic", "OpenAI", "ai2"]
+
+def generate_posts(count: int, seed: int = 42, ai_ratio: float = 1.0, glued_ratio: float = 0.0) -> List[Dict]:
+    """
+    生成固定随机种子的合成帖子 (标题 + 正文)，帖子带有 ai_related 标注
+    ai_ratio: 混入AI关键词的帖子比例，其余帖子只包含日常用词
+    glued_ratio: AI帖子中只使用连写术语 ("GPT4"、"GenAI" 等) 的比例
+    """
+    rng = random.Random(seed)
+    vocabulary = [keyword for keywords in AI_KEYWORDS.values() for keyword in keywords]
+    
+    posts = []
+    for i in range(count):
+        is_ai = rng.random() < ai_ratio
+        if is_ai:
+            # 连写术语帖子以日常用词填充 (填充词本身含 "dataset" 等关键词)，只能靠连写术语命中
+            if rng.random() < glued_ratio:
+                fillers, terms = GENERIC_WORDS, GLUED_AI_TERMS
+            else:
+                fillers, terms = FILLER_WORDS, vocabulary
+            title_words = rng.choices(fillers, k=8) + rng.choices(terms, k=2)
+            body_words = rng.choices(fillers, k=rng.randint(40, 300))
+            body_words += rng.choices(terms, k=rng.randint(0, 12))
+        else:
+            title_words = rng.choices(GENERIC_WORDS, k=10)
+            body_words = rng.choices(GENERIC_WORDS, k=rng.randint(40, 300))
+        rng.shuffle(title_words)
+        rng.shuffle(body_words)
+        
+        posts.append({
+            "id": f"bench{i}",
+            "title": " ".join(title_words).capitalize(),
+            "selftext": " ".join(body_words),
+            "score": rng.randint(0, 2000),
+            "num_comments": rng.randint(0, 300),
+            "upvote_ratio": rng.uniform(0.5, 1.0),
+            "url": "https://github.com/example/repo" if i % 3 == 0 else None,
+            "created_utc": time.time() - rng.randint(3600, 7 * 86400),
+            "ai_related": is_ai
+        })
+    return posts
+
+def _measure(func, posts: List[Dict], repeat: int) -> float:
+    """返回单帖平均CPU耗时 (毫秒)，取多轮中的最小值"""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for post in posts:
+            func(post)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000 / max(1, len(posts))
+
+def benchmark_analysis(posts: List[Dict], repeat: int = 3) -> Dict:
+    """
+    对比帖子处理的单帖CPU耗时:
+    - before: 基线版本的冻结实现 (perf_baseline)，逐个关键词子串查找，
+      筛选、评分、分类、关键词提取各自重新拼接并扫描文本
+    - after: 当前流水线，筛选阶段 analyze 只做匹配与分类，通过筛选后复用分析结果评分、分类并提取关键词
+    两侧均按子串匹配 (基线语义) 筛选，通过筛选的帖子相同，耗时差异只来自实现方式
+    """
+    from content_processor import ContentProcessor
+    from perf_baseline import BaselineContentProcessor
+    baseline = BaselineContentProcessor()
+    processor = ContentProcessor(match_mode="substring")
+    accepted = {"before": set(), "after": set()}
+    
+    def per_consumer(post):
+        is_ai, _, _ = baseline.is_ai_related(post["title"], post["selftext"])
+        if not is_ai:
+            return
+        accepted["before"].add(post["id"])
+        baseline.calculate_quality_score(post)
+        baseline.classify_content(post["title"], post["selftext"])
+        baseline.extract_all_keywords(post["title"], post["selftext"])
+    
+    def single_pass(post):
+        analysis = processor.analyze(post["title"], post["selftext"], extract_keywords=False)
+        if not analysis.is_ai_related:
+            return
+        accepted["after"].add(post["id"])
+        processor.calculate_quality_score(post, analysis)
+        processor.classify_content(post["title"], post["selftext"], analysis)
+        processor.extract_all_keywords(post["title"], post["selftext"], analysis)
+    
+    before_ms = _measure(per_consumer, posts, repeat)
+    after_ms = _measure(single_pass, posts, repeat)
+    
+    return {
+        "posts": len(posts),
+        "match_mode": "substring",
+        "before_accepted": len(accepted["before"]),
+        "after_accepted": len(accepted["after"]),
+        "before_ms_per_post": round(before_ms, 3),
+        "after_ms_per_post": round(after_ms, 3),
+        "speedup": round(before_ms / after_ms, 2) if after_ms else 0.0
+    }
+
+def load_posts_from_db(limit: int) -> List[Dict]:
+    """从D1读取最近采集的帖子标题和正文作为样本"""
+    from database_manager import D1DatabaseManager
+    db = D1DatabaseManager()
+    try:
+        result = db.execute_query(
+            "SELECT id, title, selftext FROM reddit_ai_posts ORDER BY created_utc DESC LIMIT ?",
+            [limit]
+        )
+        return [
+            {"id": row["id"], "title": row.get("title") or "", "selftext": row.get("selftext") or ""}
+            for row in result.get("results", [])
+        ]
+    finally:
+        db.close()
+
+def _storage_rows(processor, posts: List[Dict]) -> Dict:
+    """统计按某种匹配方式会进入存储环节的帖子数及写入行数"""
+    from post_pipeline import MAX_KEYWORDS_PER_POST
+    
+    accepted = set()
+    keyword_rows = 0
+    for post in posts:
+        analysis = processor.analyze(post["title"], post["selftext"])
+        if not analysis.is_ai_related:
+            continue
+        accepted.add(post["id"])
+        keyword_rows += min(len(analysis.keywords), MAX_KEYWORDS_PER_POST)
+    
+    # 每个帖子写入: 1行帖子 + N行关键词 + 1行技术分类
+    return {
+        "posts": len(accepted),
+        "keyword_rows": keyword_rows,
+        "db_rows": len(accepted) * 2 + keyword_rows,
+        "accepted": accepted
+    }
+
+def benchmark_matching(posts: List[Dict], max_examples: int = 5) -> Dict:
+    """
+    对比子串匹配 (旧逻辑) 与短关键词整词匹配:
+    通过AI相关性筛选的帖子数、关键词行数、D1写入行数及减少量，
+    以及整词匹配丢失的帖子中有多少是真阳性 (样本带 ai_related 标注时按标注统计；
+    D1 样本均为已采集的帖子，丢失的帖子全部视为真阳性)
+    """
+    from content_processor import ContentProcessor
+    
+    substring = _storage_rows(ContentProcessor(match_mode="substring"), posts)
+    word = _storage_rows(ContentProcessor(match_mode="word"), posts)
+    
+    lost = [post for post in posts if post["id"] in substring["accepted"] and post["id"] not in word["accepted"]]
+    lost_true_positives = [post for post in lost if post.get("ai_related", True)]
+    positives = [post for post in posts if post.get("ai_related", True)]
+    word_true_positives = sum(1 for post in positives if post["id"] in word["accepted"])
+    
+    return {
+        "sample_posts": len(posts),
+        "substring_posts": substring["posts"],
+        "word_posts": word["posts"],
+        "posts_avoided": substring["posts"] - word["posts"],
+        "true_positives_lost": len(lost_true_positives),
+        "false_positives_avoided": len(lost) - len(lost_true_positives),
+        "word_recall": round(word_true_positives / len(positives), 3) if positives else 0.0,
+        "lost_examples": [f"{post['id']}: {post['title'][:60]}" for post in lost_true_positives[:max_examples]],
+        "substring_keyword_rows": substring["keyword_rows"],
+        "word_keyword_rows": word["keyword_rows"],
+        "keyword_rows_avoided": substring["keyword_rows"] - word["keyword_rows"],
+        "db_rows_avoided": substring["db_rows"] - word["db_rows"]
+    }
+
+def _time_command(command: List[str], runs: int) -> Tuple[float, bool]:
+    """在新进程中多次执行命令，返回 (耗时中位数毫秒, 是否全部成功退出)"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    succeeded = True
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd=project_dir, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+        succeeded = succeeded and completed.returncode == 0
+    return statistics.median(timings), succeeded
+
+def benchmark_imports(modules: List[str], runs: int = 5, target_ms: float = DEFAULT_STARTUP_TARGET_MS) -> Dict:
+    """
+    测量各模块在全新进程中的导入耗时 (扣除解释器启动时间)
+    超过目标值的模块记入 over_target，导入失败 (缺少依赖) 的模块记入 failed
+    """
+    baseline_ms, _ = _time_command([sys.executable, "-c", "pass"], runs)
+    
+    result = {"interpreter_ms": round(baseline_ms, 1), "target_ms": target_ms}
+    over_target = []
+    failed = []
+    for module in modules:
+        elapsed_ms, succeeded = _time_command([sys.executable, "-c", f"import {module}"], runs)
+        elapsed_ms -= baseline_ms
+        result[f"{module}_ms"] = round(elapsed_ms, 1)
+        if not succeeded:
+            failed.append(module)
+        elif elapsed_ms > target_ms:
+            over_target.append(module)
+    
+    result["over_target"] = over_target
+    result["failed"] = failed
+    return result
+
+def benchmark_startup(commands: List[List[str]], runs: int = 5,
+                      target_ms: float = DEFAULT_STARTUP_TARGET_MS) -> Dict:
+    """
+    测量 main.py 各子命令的冷启动耗时 (参数解析 + 子命令模块导入，扣除解释器启动时间)
+    不访问网络，也不执行命令本身
+    """
+    baseline_ms, _ = _time_command([sys.executable, "-c", "pass"], runs)
+    
+    result = {"interpreter_ms": round(baseline_ms, 1), "target_ms": target_ms}
+    over_target = []
+    failed = []
+    for command in commands:
+        label = " ".join(command)
+        elapsed_ms, succeeded = _time_command([sys.executable, "-c", STARTUP_PROBE] + command, runs)
+        elapsed_ms -= baseline_ms
+        result[f"{label}_ms"] = round(elapsed_ms, 1)
+        if not succeeded:
+            failed.append(label)
+        elif elapsed_ms > target_ms:
+            over_target.append(label)
+    
+    result["over_target"] = over_target
+    result["failed"] = failed
+    return result
+
+def print_report(title: str, result: Dict):
+    """打印基准测试结果"""
+    print(f"\n=== {title} ===")
+    for key, value in result.items():
+        print(f"  {key}: {value}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Reddit AI 采集系统性能基准测试")
+    subparsers = parser.add_subparsers(dest='command', help='基准测试项目')
+    
+    # 单帖分析CPU耗时
+    parser_analysis = subparsers.add_parser('analysis', help='单帖内容分析CPU耗时 (多次扫描 vs 单次分析)')
+    parser_analysis.add_argument('--posts', type=int, default=500, help='合成帖子数量')
+    parser_analysis.add_argument('--repeat', type=int, default=3, help='重复轮数 (取最小值)')
+    parser_analysis.add_argument('--ai-ratio', type=float, default=1.0,
+                                 help='AI相关帖子比例 (其余帖子在筛选阶段被拒绝)')
+    
+    # 关键词匹配方式对比
+    parser_matching = subparsers.add_parser('matching', help='子串匹配 vs 整词匹配: 避免的帖子、关键词行和D1写入')
+    parser_matching.add_argument('--source', choices=['synthetic', 'db'], default='synthetic',
+                                 help='样本来源: 合成帖子或D1中最近采集的帖子')
+    parser_matching.add_argument('--posts', type=int, default=1000, help='合成帖子数量')
+    parser_matching.add_argument('--limit', type=int, default=1000, help='从D1读取的帖子数量')
+    parser_matching.add_argument('--glued-ratio', type=float, default=0.3,
+                                 help='合成AI帖子中只使用连写术语 ("GPT4"、"GenAI" 等) 的比例')
+    
+    # 冷启动导入耗时
+    parser_imports = subparsers.add_parser('imports', help='模块冷启动导入耗时')
+    parser_imports.add_argument('modules', nargs='*', default=IMPORT_BENCHMARK_MODULES, help='要测量的模块')
+    parser_imports.add_argument('--runs', type=int, default=5, help='每个模块的测量次数 (取中位数)')
+    parser_imports.add_argument('--target-ms', type=float, default=DEFAULT_STARTUP_TARGET_MS,
+                                help='导入耗时目标 (毫秒)，超出或导入失败时以非零状态退出')
+    
+    # main.py 子命令冷启动耗时
+    parser_startup = subparsers.add_parser('startup', help='main.py 各子命令冷启动耗时')
+    parser_startup.add_argument('--runs', type=int, default=5, help='每个子命令的测量次数 (取中位数)')
+    parser_startup.add_argument('--target-ms', type=float, default=DEFAULT_STARTUP_TARGET_MS,
+                                help='冷启动耗时目标 (毫秒)，超出或导入失败时以非零状态退出')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'analysis':
+        posts = generate_posts(args.posts, ai_ratio=args.ai_ratio)
+        print_report("单帖内容分析CPU耗时", benchmark_analysis(posts, args.repeat))
+    elif args.command == 'matching':
+        if args.source == 'db':
+            posts = load_posts_from_db(args.limit)
+        else:
+            posts = generate_posts(args.posts, ai_ratio=0.5, glued_ratio=args.glued_ratio)
+        print_report("关键词匹配方式对比", benchmark_matching(posts))
+    elif args.command == 'imports':
+        result = benchmark_imports(args.modules, args.runs, args.target_ms)
+        print_report("模块冷启动导入耗时", result)
+        if result["over_target"] or result["failed"]:
+            sys.exit(1)
+    elif args.command == 'startup':
+        result = benchmark_startup(STARTUP_BENCHMARK_COMMANDS, args.runs, args.target_ms)
+        print_report("main.py 子命令冷启动耗时", result)
+        if result["over_target"] or result["failed"]:
+            sys.exit(1)
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帖子处理流水线
+同步与异步爬虫共用的帖子筛选、数据提取、评分分类和写入回调逻辑
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from content_processor import PostAnalysis
+from link_index import canonicalize_url
+from time_filter_config import is_within_time_limit, calculate_time_quality_score
+
+# 每个帖子最多存储的关键词数量
+MAX_KEYWORDS_PER_POST = 20
+
+class PostPipelineMixin:
+    """
+    帖子处理流水线 (混入类)
+    使用方需提供: self.processor, self.logger, self.stats, self._stats_lock,
+    self.quota, self.seen_post_ids, self.subreddit_cache, self.evaluated_posts, self.tfidf_index,
+    self.near_duplicates, self.link_index
+    """
+    
+    def _should_collect_post(self, post, min_score: int, min_comments: int) -> Optional[PostAnalysis]:
+        """
+        检查帖子是否应该被采集
+        返回帖子的分析结果 (后续评分、分类和关键词提取直接复用)，不应采集时返回 None
+        """
+        try:
+            # 基本筛选条件
+            if post.score < min_score:
+                return None
+            
+            if post.num_comments < min_comments:
+                return None
+            
+            if post.upvote_ratio < 0.6:
+                return None
+            
+            # 排除某些类型的帖子
+            if post.over_18:  # NSFW
+                return None
+            
+            if post.removed_by_category:  # 已删除
+                return None
+            
+            if "[deleted]" in (post.title or ""):
+                return None
+            
+            # 时间限制检查
+            is_valid, reason = is_within_time_limit(post.created_utc, "hot")
+            if not is_valid:
+                return None
+            
+            # 外链去重 (同一论文/仓库/视频已由其他帖子采集或预占；通过检查即预占，写入D1成功后正式登记)
+            subreddit_name = str(getattr(post, 'subreddit', '') or '')
+            if self.link_index is not None:
+                link = self.link_index.post_link(post)
+                duplicate_of = self.link_index.claim(link, post.id, subreddit_name)
+                if duplicate_of is not None:
+                    self.logger.debug(f"帖子 {post.id} 的链接 {link} 已由 {duplicate_of} 采集，跳过")
+                    return None
+            
+            # 近似重复检查 (以不同ID重复发布的同一内容，在文本分析之前拒绝)
+            # 通过检查即预占指纹，仍在写后队列中等待写入的帖子也能挡住后续的转发
+            if self.near_duplicates is not None:
+                fingerprint = self.near_duplicates.fingerprint_post(post)
+                duplicate_of = self.near_duplicates.reserve(post.id, fingerprint)
+                if duplicate_of is not None:
+                    self.logger.debug(f"帖子 {post.id} 与 {duplicate_of} 近似重复，跳过")
+                    self._release_post_claims(post.id)
+                    return None
+            
+            # AI相关性检查 (匹配与分类只扫描一次文本；关键词在通过筛选后才提取)
+            title = getattr(post, 'title', '')
+            content = getattr(post, 'selftext', '')
+            
+            analysis = self.processor.analyze(title, content, extract_keywords=False)
+            if not analysis.is_ai_related:
+                self._release_post_claims(post.id)
+                return None
+            
+            return analysis
+            
+        except Exception as e:
+            self.logger.error(f"检查帖子条件时出错: {e}")
+            self._release_post_claims(getattr(post, 'id', None))
+            return None
+    
+    def _release_post_claims(self, post_id: Optional[str]):
+        """释放帖子在筛选阶段预占的去重索引条目 (未通过筛选、配额不足或未写入D1时调用)"""
+        if not post_id:
+            return
+        
+        if self.link_index is not None:
+            self.link_index.release(post_id)
+        
+        if self.near_duplicates is not None:
+            self.near_duplicates.release(post_id)
+    
+    def _evaluate_post(self, post, min_score: int, min_comments: int) -> Optional[PostAnalysis]:
+        """
+        筛选帖子并记录结果，返回应采集帖子的分析结果
+        同一会话内再次出现的帖子 (其他排序方式或已采集原帖的交叉帖) 直接跳过
+        """
+        if self.evaluated_posts.lookup(post) is not None:
+            return None
+        
+        analysis = self._should_collect_post(post, min_score, min_comments)
+        self.evaluated_posts.record(post, analysis is not None)
+        return analysis
+    
+    def _build_post_bundle(self, post, subreddit_name: str,
+                           analysis: Optional[PostAnalysis] = None) -> Tuple[Dict, List[Dict], Dict]:
+        """
+        提取帖子数据并完成评分、分类和关键词提取，返回 (post_data, keywords, classification)
+        评分、分类和关键词均读取同一份分析结果，帖子文本只扫描一次
+        """
+        # 提取基本信息
+        post_data = self._extract_post_data(post, subreddit_name)
+        
+        if analysis is None:
+            analysis = self.processor.analyze(post_data["title"], post_data["selftext"])
+        
+        # 计算质量评分
+        quality_score = self.processor.calculate_quality_score(post_data, analysis)
+        post_data["quality_score"] = quality_score
+        
+        # 时间质量加权
+        time_weighted_score = calculate_time_quality_score(
+            post_data["created_utc"], 
+            quality_score
+        )
+        post_data["tech_relevance_score"] = min(10.0, time_weighted_score / 10)
+        
+        # AI分类
+        classification = self.processor.classify_content(
+            post_data["title"], 
+            post_data["selftext"],
+            analysis
+        )
+        post_data["ai_category"] = classification["primary_category"]
+        post_data["content_category"] = classification["content_type"]
+        
+        # 提取关键词
+        keywords = self.processor.extract_all_keywords(
+            post_data["title"], 
+            post_data["selftext"],
+            analysis
+        )
+        
+        return post_data, keywords[:MAX_KEYWORDS_PER_POST], classification
+    
+    def _get_subreddit_subscribers(self, subreddit_name: str) -> int:
+        """
+        从元数据缓存读取子版块订阅数 (不触发API调用)
+        采集时间超过缓存有效期时沿用过期的订阅数 (缓存会告警)，不写入 0
+        """
+        metadata = self.subreddit_cache.peek(subreddit_name, allow_stale=True)
+        if metadata is None:
+            self.logger.warning(f"r/{subreddit_name} 没有缓存的元数据，订阅数记为 0")
+            return 0
+        return metadata.get("subscribers", 0)
+    
+    def _extract_post_data(self, post, subreddit_name: str) -> Dict:
+        """提取帖子数据"""
+        return {
+            "id": post.id,
+            "permalink": f"https://reddit.com{post.permalink}",
+            "url": getattr(post, 'url', None),
+            "title": getattr(post, 'title', ''),
+            "selftext": getattr(post, 'selftext', ''),
+            "selftext_html": getattr(post, 'selftext_html', None),
+            "score": getattr(post, 'score', 0),
+            "upvote_ratio": getattr(post, 'upvote_ratio', 0.0),
+            "num_comments": getattr(post, 'num_comments', 0),
+            "total_awards_received": getattr(post, 'total_awards_received', 0),
+            "num_crossposts": getattr(post, 'num_crossposts', 0),
+            "author": str(getattr(post, 'author', 'unknown')),
+            "subreddit": subreddit_name,
+            "subreddit_subscribers": self._get_subreddit_subscribers(subreddit_name),
+            "created_utc": int(getattr(post, 'created_utc', time.time())),
+            "is_self": getattr(post, 'is_self', False),
+            "is_video": getattr(post, 'is_video', False),
+            "over_18": getattr(post, 'over_18', False),
+            "locked": getattr(post, 'locked', False),
+            "stickied": getattr(post, 'stickied', False),
+        }
+    
+    def _on_post_stored(self, post_data: Dict, inserted: bool):
+        """帖子写入D1后的回调 (写后队列的刷新线程或同步写入路径调用)"""
+        if self.seen_post_ids is not None:
+            self.seen_post_ids.add(post_data.get("id"))
+        
+        if self.quota is not None:
+            self.quota.confirm(post_data.get("subreddit"), inserted)
+        
+        if inserted:
+            with self._stats_lock:
+                self.stats["total_stored"] += 1
+            
+            # 新入库的帖子计入语料文档频率
+            if self.tfidf_index is not None:
+                self.tfidf_index.add_document(self.processor.extract_terms(
+                    (post_data.get("title") or "") + " " + (post_data.get("selftext") or "")
+                ))
+            
+            self._register_stored_post(post_data)
+        else:
+            # 未写入 (写入失败或D1中已存在) 时释放预占，不挡住后续的同源帖子
+            self._release_post_claims(post_data.get("id"))
+    
+    def _register_stored_post(self, post_data: Dict):
+        """
+        登记已写入D1的帖子的外链与近似重复指纹 (筛选阶段的预占转为正式登记)
+        配额不足或写入失败的帖子会释放预占，不会占用索引、挡住后续的同源帖子
+        """
+        post_id = post_data.get("id")
+        # 自发帖的 url 指向帖子本身，不计入外链与指纹
+        url = None if post_data.get("is_self") else post_data.get("url")
+        
+        if self.link_index is not None:
+            link = canonicalize_url(url)
+            duplicate_of = self.link_index.register(link, post_id, post_data.get("subreddit") or "")
+            if duplicate_of is not None:
+                self.logger.debug(f"帖子 {post_id} 的链接 {link} 与 {duplicate_of} 同时写入，保留首个登记")
+                self.link_index.release(post_id)
+        
+        if self.near_duplicates is not None:
+            fingerprint = self.near_duplicates.fingerprint(
+                post_data.get("title") or "", post_data.get("selftext") or "", url
+            )
+            duplicate_of = self.near_duplicates.add(post_id, fingerprint)
+            if duplicate_of is not None:
+                self.logger.debug(f"帖子 {post_id} 与 {duplicate_of} 近似重复且同时写入，保留首个登记")
+                self.near_duplicates.release(post_id)
+    
+    def _seed_link_index(self, links: List[Tuple[str, str]]):
+        """以D1中最近采集的帖子链接预热外链索引"""
+        added = self.link_index.seed(links)
+        self.logger.info(f"已预加载 {added} 个已采集外链 (最近 {self.link_index.preload_days} 天)")
+    
+    def _save_indexes(self):
+        """保存文档频率索引增量 (达到阈值时自动压缩) 与近似重复指纹，并输出外链去重统计"""
+        if self.tfidf_index is not None:
+            self.tfidf_index.save()
+            self.logger.info(f"TF-IDF索引统计: {self.tfidf_index.get_stats()}")
+        
+        if self.near_duplicates is not None:
+            self.near_duplicates.save()
+            self.logger.info(f"近似重复检测统计: {self.near_duplicates.get_stats()}")
+        
+        if self.link_index is not None:
+            self.logger.info(f"外链去重统计: {self.link_index.get_stats()}")
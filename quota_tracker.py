@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地采集配额跟踪
+会话开始时从D1读取一次各子版块已采集数量，之后在本地按确认写入计数，
+会话结束时再与D1对账一次
+"""
+
+import threading
+import logging
+from typing import Dict, Optional
+
+class QuotaTracker:
+    """每日全局与子版块配额跟踪器 (线程安全)"""
+    
+    def __init__(self, daily_target: int, subreddit_targets: Dict[str, int],
+                 seed_counts: Optional[Dict[str, int]] = None):
+        self.daily_target = daily_target
+        self.subreddit_targets = dict(subreddit_targets)
+        
+        # 已确认写入D1的数量 (以D1初始统计为基数)
+        self.stored: Dict[str, int] = dict(seed_counts or {})
+        # 已入队但尚未确认写入的数量
+        self.pending: Dict[str, int] = {}
+        
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_database(cls, db, daily_target: int, subreddit_targets: Dict[str, int]) -> "QuotaTracker":
+        """以D1今日各子版块统计为种子创建 (一次查询)"""
+        return cls(daily_target, subreddit_targets, db.get_today_posts_by_subreddit())
+    
+    def total_stored(self) -> int:
+        """今日已确认写入总数"""
+        with self._lock:
+            return sum(self.stored.values())
+    
+    def total_committed(self) -> int:
+        """今日已写入与待写入总数"""
+        with self._lock:
+            return sum(self.stored.values()) + sum(self.pending.values())
+    
+    def remaining_global(self) -> int:
+        """全局剩余配额 (待写入帖子计入已用)"""
+        return max(0, self.daily_target - self.total_committed())
+    
+    def is_global_met(self) -> bool:
+        """是否已达到每日全局目标"""
+        return self.remaining_global() <= 0
+    
+    def remaining_for(self, subreddit: str) -> int:
+        """子版块剩余配额，同时受全局剩余配额限制"""
+        with self._lock:
+            used = self.stored.get(subreddit, 0) + self.pending.get(subreddit, 0)
+            committed = sum(self.stored.values()) + sum(self.pending.values())
+        
+        subreddit_remaining = max(0, self.subreddit_targets.get(subreddit, 0) - used)
+        return min(subreddit_remaining, max(0, self.daily_target - committed))
+    
+    def reserve(self, subreddit: str) -> bool:
+        """
+        帖子入队/写入前预占一个配额 (检查与预占在同一把锁内完成)
+        返回: 全局配额已满时返回 False (不预占)，调用方应跳过该帖子
+        """
+        with self._lock:
+            committed = sum(self.stored.values()) + sum(self.pending.values())
+            if committed >= self.daily_target:
+                return False
+            self.pending[subreddit] = self.pending.get(subreddit, 0) + 1
+        return True
+    
+    def confirm(self, subreddit: str, inserted: bool):
+        """帖子写入结束: 成功则计入已写入，否则释放预占配额"""
+        with self._lock:
+            if self.pending.get(subreddit, 0) > 0:
+                self.pending[subreddit] -= 1
+            if inserted:
+                self.stored[subreddit] = self.stored.get(subreddit, 0) + 1
+    
+    def snapshot(self) -> Dict[str, int]:
+        """已写入数量快照 (按数量降序)"""
+        with self._lock:
+            items = [(name, count) for name, count in self.stored.items() if count > 0]
+        return dict(sorted(items, key=lambda x: x[1], reverse=True))
+    
+    def reconcile(self, db_counts: Dict[str, int]) -> int:
+        """与D1统计对账，以D1为准并记录偏差，返回今日总数"""
+        local_counts = self.snapshot()
+        drift = {
+            name: db_counts.get(name, 0) - local_counts.get(name, 0)
+            for name in set(local_counts) | set(db_counts)
+            if db_counts.get(name, 0) != local_counts.get(name, 0)
+        }
+        
+        if drift:
+            self.logger.warning(f"本地配额计数与D1存在偏差 (D1 - 本地): {drift}")
+        
+        with self._lock:
+            self.stored = dict(db_counts)
+            self.pending = {}
+        
+        return sum(db_counts.values())
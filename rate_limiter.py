@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+令牌桶限流器
+多个采集线程共享同一个 Reddit API 请求预算，按预算节奏发起请求，替代固定 sleep
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+class TokenBucket:
+    """线程安全的令牌桶限流器"""
+    
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0   # 每秒补充的令牌数
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "acquired": 0,
+            "waits": 0,
+            "wait_seconds": 0.0
+        }
+    
+    def _refill(self):
+        """按时间流逝补充令牌 (调用方需持有锁)"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """获取令牌，不足时阻塞等待；超时返回False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+        
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.stats["acquired"] += tokens
+                    if waited:
+                        self.stats["waits"] += 1
+                        self.stats["wait_seconds"] += waited
+                    return True
+                
+                wait_time = (tokens - self._tokens) / self.rate
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            
+            time.sleep(wait_time)
+            waited += wait_time
+    
+    def reserve(self, tokens: int = 1) -> float:
+        """预占令牌 (允许透支)，返回调用方需等待的秒数，用于异步场景"""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            self.stats["acquired"] += tokens
+            wait_time = max(0.0, -self._tokens / self.rate)
+            if wait_time:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds"] += wait_time
+        return wait_time
+    
+    async def acquire_async(self, tokens: int = 1):
+        """异步获取令牌，不阻塞事件循环"""
+        wait_time = self.reserve(tokens)
+        if wait_time:
+            await asyncio.sleep(wait_time)
+    
+    def get_stats(self) -> Dict:
+        """获取限流统计"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 2)
+        stats["rate_per_minute"] = round(self.rate * 60, 1)
+        return stats
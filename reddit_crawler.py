@@ -5,25 +5,39 @@ Reddit AI 内容爬虫主程序
 每日北京时间早上6点执行，采集200条AI相关帖子
 """
 
-import praw
 import time
 import logging
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
 import pytz
 
 from config import REDDIT_CONFIG, COLLECTION_CONFIG, validate_config
 from database_manager import D1DatabaseManager
-from content_processor import ContentProcessor
-from daily_collection_config import TARGET_SUBREDDITS, get_collection_date
-from time_filter_config import is_within_time_limit, calculate_time_quality_score
+from content_processor import ContentProcessor, PostAnalysis
+from tfidf_index import DocumentFrequencyIndex
+from daily_collection_config import (
+    TARGET_SUBREDDITS, CONCURRENCY_CONFIG, get_collection_date,
+    DATABASE_CONFIG as STORAGE_CONFIG
+)
+from storage_queue import WriteBehindQueue
+from quota_tracker import QuotaTracker
+from rate_limiter import TokenBucket
+from subreddit_cache import SubredditMetadataCache
+from dedup import EvaluatedPostCache, NearDuplicateIndex
+from link_index import LinkIndex
+from post_pipeline import PostPipelineMixin
 from time_utils import (
     beijing_now, beijing_timestamp, format_beijing_time, 
     reddit_to_beijing, today_date, log_time_format
 )
 
-class RedditAICrawler:
+if TYPE_CHECKING:
+    import praw
+
+class RedditAICrawler(PostPipelineMixin):
     """Reddit AI 内容爬虫"""
     
     def __init__(self):
@@ -33,7 +47,10 @@ class RedditAICrawler:
         # 初始化组件
         self.reddit = self._init_reddit_client()
         self.db = D1DatabaseManager()
-        self.processor = ContentProcessor()
+        
+        # 语料级文档频率索引 (关键词 TF-IDF，帖子入库后增量更新)
+        self.tfidf_index = DocumentFrequencyIndex.from_config()
+        self.processor = ContentProcessor(tfidf_index=self.tfidf_index)
         
         # 设置日志
         self.logger = self._setup_logging()
@@ -41,19 +58,53 @@ class RedditAICrawler:
         # 北京时区
         self.beijing_tz = pytz.timezone('Asia/Shanghai')
         
+        # 已采集帖子ID (会话开始时一次性预加载，之后在本地维护)
+        self.seen_post_ids: Optional[Set[str]] = None
+        
+        # Reddit 请求预算 (所有采集线程共享)
+        self.rate_budget = TokenBucket(
+            CONCURRENCY_CONFIG.get("reddit_requests_per_minute", 60),
+            CONCURRENCY_CONFIG.get("reddit_burst", 5)
+        )
+        
+        # 子版块元数据缓存 (每个子版块每个会话只获取一次)
+        self.subreddit_cache = SubredditMetadataCache()
+        
+        # 会话内已评估帖子 (跨排序方式与交叉帖去重)
+        self.evaluated_posts = EvaluatedPostCache()
+        
+        # 近似重复指纹索引 (滚动窗口，跨会话持久化)
+        self.near_duplicates = NearDuplicateIndex.from_config()
+        
+        # 外链目标索引 (同一论文/仓库/视频只采集一次)
+        self.link_index = LinkIndex.from_config()
+        
+        # PRAW 实例非线程安全，并发模式下每个工作线程使用独立实例
+        self._thread_local = threading.local()
+        
+        # 本地配额跟踪 (采集期间启用)
+        self.quota: Optional[QuotaTracker] = None
+        
+        # 写后存储队列 (采集期间启用)
+        self.storage_queue: Optional[WriteBehindQueue] = None
+        self._stats_lock = threading.Lock()
+        
         # 统计信息
         self.stats = {
             "session_id": str(uuid.uuid4()),
             "start_time": time.time(),
             "total_fetched": 0,
             "total_processed": 0,
+            "total_queued": 0,
             "total_stored": 0,
             "api_calls": 0,
             "errors": []
         }
     
-    def _init_reddit_client(self) -> praw.Reddit:
-        """初始化Reddit客户端"""
+    def _init_reddit_client(self, verify: bool = True) -> "praw.Reddit":
+        """初始化Reddit客户端 (praw 在此时才导入，缩短命令启动时间)"""
+        import praw
+        
         try:
             reddit = praw.Reddit(
                 client_id=REDDIT_CONFIG["client_id"],
@@ -62,12 +113,29 @@ class RedditAICrawler:
             )
             
             # 测试连接
-            reddit.user.me()
+            if verify:
+                reddit.user.me()
             return reddit
             
         except Exception as e:
             raise ValueError(f"Reddit API连接失败: {e}")
     
+    def _get_reddit_client(self) -> "praw.Reddit":
+        """获取当前线程的Reddit客户端 (主线程复用 self.reddit)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+        
+        reddit = getattr(self._thread_local, "reddit", None)
+        if reddit is None:
+            reddit = self._init_reddit_client(verify=False)
+            self._thread_local.reddit = reddit
+        return reddit
+    
+    def _count_api_call(self):
+        """记录一次Reddit API调用"""
+        with self._stats_lock:
+            self.stats["api_calls"] += 1
+    
     def _setup_logging(self) -> logging.Logger:
         """设置日志"""
         logger = logging.getLogger(__name__)
@@ -94,6 +162,50 @@ class RedditAICrawler:
         
         return logger
     
+    def _start_storage_queue(self):
+        """启动写后存储队列"""
+        if not STORAGE_CONFIG.get("enable_write_behind", False) or self.storage_queue:
+            return
+        
+        self.storage_queue = WriteBehindQueue(
+            self.db,
+            batch_size=STORAGE_CONFIG.get("write_batch_size", 20),
+            flush_interval=STORAGE_CONFIG.get("write_flush_interval", 5),
+            max_queue_size=STORAGE_CONFIG.get("write_queue_size", 100),
+            on_stored=self._on_post_stored,
+            flush_retries=STORAGE_CONFIG.get("write_flush_retries", 2),
+            retry_backoff=STORAGE_CONFIG.get("write_retry_backoff", 1.0)
+        )
+        self.storage_queue.start()
+    
+    def _stop_storage_queue(self):
+        """关闭写后存储队列并等待剩余帖子写入"""
+        if not self.storage_queue:
+            return
+        
+        self.logger.info(f"等待写后队列写入剩余 {self.storage_queue.pending()} 个帖子...")
+        self.storage_queue.close()
+        self.logger.info(f"写后队列统计: {self.storage_queue.get_stats()}")
+    
+    def _load_seen_post_ids(self):
+        """预加载今日(及最近几天)已采集的帖子ID，替代逐帖查询"""
+        days = STORAGE_CONFIG.get("seen_ids_preload_days", 0)
+        self.seen_post_ids = self.db.get_recent_post_ids(days)
+        self.logger.info(f"已预加载 {len(self.seen_post_ids)} 个已采集帖子ID (最近 {days} 天)")
+    
+    def _is_post_seen(self, post_id: str) -> bool:
+        """检查帖子是否已采集 (未预加载时回退为数据库查询)"""
+        if self.seen_post_ids is None:
+            return self.db.check_post_exists_today(post_id)
+        return post_id in self.seen_post_ids
+    
+    def _reconcile_quota(self) -> int:
+        """会话结束时与D1对账本地配额计数，返回今日总数"""
+        db_counts = self.db.get_today_posts_by_subreddit()
+        if self.quota is None:
+            return sum(db_counts.values())
+        return self.quota.reconcile(db_counts)
+    
     def collect_daily_posts(self) -> bool:
         """执行每日帖子采集"""
         try:
@@ -105,9 +217,14 @@ class RedditAICrawler:
             self.db.create_daily_task(collection_date, COLLECTION_CONFIG["daily_target"])
             self.db.update_daily_task_status(collection_date, "running")
             
-            # 检查今日已采集数量
-            today_count = self.db.get_today_post_count()
-            remaining_target = COLLECTION_CONFIG["daily_target"] - today_count
+            # 以今日各子版块统计初始化本地配额 (仅此一次查询，之后在本地计数)
+            self.quota = QuotaTracker.from_database(
+                self.db,
+                COLLECTION_CONFIG["daily_target"],
+                {config["name"]: config["target_posts"] for config in TARGET_SUBREDDITS}
+            )
+            today_count = self.quota.total_stored()
+            remaining_target = self.quota.remaining_global()
             
             if remaining_target <= 0:
                 self.logger.info(f"今日目标已完成，已采集 {today_count} 个帖子")
@@ -116,41 +233,47 @@ class RedditAICrawler:
             
             self.logger.info(f"今日已采集: {today_count}, 剩余目标: {remaining_target}")
             
-            # 获取今日各子版块统计
-            subreddit_stats = self.db.get_today_posts_by_subreddit()
+            # 预加载已采集帖子ID与外链
+            self._load_seen_post_ids()
+            if self.link_index is not None:
+                self._seed_link_index(self.db.get_recent_post_links(self.link_index.preload_days))
+            
+            # 启动写后存储队列，D1写入在后台线程中进行
+            self._start_storage_queue()
             
             # 执行采集
-            total_collected = 0
+            pending_subreddits = []
             for subreddit_config in TARGET_SUBREDDITS:
                 subreddit_name = subreddit_config["name"]
                 target_posts = subreddit_config["target_posts"]
                 
-                # 检查该子版块今日已采集数量
-                already_collected = subreddit_stats.get(subreddit_name, 0)
-                needed = max(0, target_posts - already_collected)
-                
-                if needed == 0:
+                # 检查该子版块剩余配额 (本地计数)
+                if self.quota.remaining_for(subreddit_name) == 0:
+                    already_collected = self.quota.snapshot().get(subreddit_name, 0)
                     self.logger.info(f"r/{subreddit_name} 今日目标已完成 ({already_collected}/{target_posts})")
                     continue
                 
-                self.logger.info(f"开始采集 r/{subreddit_name} - 目标: {needed} 个帖子")
-                
-                collected = self._collect_subreddit_posts(subreddit_config, needed)
-                total_collected += collected
-                
-                self.logger.info(f"r/{subreddit_name} 采集完成: {collected} 个帖子")
-                
-                # 达到总目标后停止
-                current_total = self.db.get_today_post_count()
-                if current_total >= COLLECTION_CONFIG["daily_target"]:
-                    self.logger.info(f"已达到每日目标 {COLLECTION_CONFIG['daily_target']} 个帖子")
-                    break
-                
-                # API调用间隔
-                time.sleep(2)
+                pending_subreddits.append(subreddit_config)
+            
+            if CONCURRENCY_CONFIG.get("enable_concurrent", False) and len(pending_subreddits) > 1:
+                self._collect_concurrently(pending_subreddits)
+            else:
+                for subreddit_config in pending_subreddits:
+                    self._collect_one_subreddit(subreddit_config)
+                    
+                    # 达到总目标后停止 (待写入的帖子计入已用配额)
+                    if self.quota.is_global_met():
+                        self.logger.info(f"已达到每日目标 {COLLECTION_CONFIG['daily_target']} 个帖子")
+                        break
+            
+            # 等待写后队列全部写入后再统计
+            self._stop_storage_queue()
+            self._save_indexes()
+            
+            # 会话结束时与D1对账一次
+            final_count = self._reconcile_quota()
             
             # 更新任务状态
-            final_count = self.db.get_today_post_count()
             self.db.update_daily_task_status(collection_date, "completed", final_count)
             
             self.logger.info(f"每日采集任务完成 - 总计采集: {final_count} 个帖子")
@@ -158,6 +281,8 @@ class RedditAICrawler:
             
         except Exception as e:
             self.logger.error(f"每日采集任务失败: {e}")
+            self._stop_storage_queue()
+            self._save_indexes()
             self.db.update_daily_task_status(
                 get_collection_date(), 
                 "failed", 
@@ -165,6 +290,45 @@ class RedditAICrawler:
             )
             return False
     
+    def _collect_one_subreddit(self, subreddit_config: Dict) -> int:
+        """按剩余配额采集单个子版块"""
+        subreddit_name = subreddit_config["name"]
+        needed = self.quota.remaining_for(subreddit_name) if self.quota else subreddit_config["target_posts"]
+        
+        if needed == 0:
+            return 0
+        
+        self.logger.info(f"开始采集 r/{subreddit_name} - 目标: {needed} 个帖子")
+        collected = self._collect_subreddit_posts(subreddit_config, needed)
+        self.logger.info(f"r/{subreddit_name} 采集完成: {collected} 个帖子")
+        
+        return collected
+    
+    def _collect_concurrently(self, subreddit_configs: List[Dict]) -> int:
+        """多个子版块并发采集，请求节奏由共享令牌桶控制"""
+        max_workers = max(1, CONCURRENCY_CONFIG.get("max_workers", 4))
+        self.logger.info(f"并发采集 {len(subreddit_configs)} 个子版块 (线程数: {max_workers})")
+        
+        total_collected = 0
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector") as executor:
+            futures = {
+                executor.submit(self._collect_one_subreddit, config): config["name"]
+                for config in subreddit_configs
+            }
+            
+            for future in as_completed(futures):
+                try:
+                    total_collected += future.result()
+                except Exception as e:
+                    self.logger.error(f"并发采集 r/{futures[future]} 异常: {e}")
+                    with self._stats_lock:
+                        self.stats["errors"].append(f"r/{futures[future]}: {str(e)}")
+        
+        if self.quota is not None and self.quota.is_global_met():
+            self.logger.info(f"已达到每日目标 {COLLECTION_CONFIG['daily_target']} 个帖子")
+        
+        return total_collected
+    
     def _collect_subreddit_posts(self, subreddit_config: Dict, target_count: int) -> int:
         """采集单个子版块的帖子"""
         subreddit_name = subreddit_config["name"]
@@ -175,196 +339,157 @@ class RedditAICrawler:
         collected_count = 0
         
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            self.stats["api_calls"] += 1
+            subreddit = self._get_reddit_client().subreddit(subreddit_name)
+            
+            # 子版块元数据每个会话只获取一次，逐帖提取时只读缓存
+            self.subreddit_cache.get(subreddit_name, lambda name: self._fetch_subreddit_metadata(subreddit))
             
             for sort_method in sort_methods:
                 if collected_count >= target_count:
                     break
                 
+                if self.quota is not None and self.quota.is_global_met():
+                    break
+                
                 self.logger.info(f"  采集 r/{subreddit_name} - {sort_method} 排序")
                 
                 # 获取帖子
                 posts = self._get_posts_by_sort(subreddit, sort_method, limit=100)
+                with self._stats_lock:
+                    self.stats["total_fetched"] += len(posts)
                 
                 for post in posts:
                     if collected_count >= target_count:
                         break
                     
-                    # 检查是否符合条件
-                    if not self._should_collect_post(post, min_score, min_comments):
+                    # 全局配额已满 (本地计数，无需查询)
+                    if self.quota is not None and self.quota.is_global_met():
+                        break
+                    
+                    # 检查今日是否已存在 (本地集合查询)
+                    if self._is_post_seen(post.id):
                         continue
                     
-                    # 检查今日是否已存在
-                    if self.db.check_post_exists_today(post.id):
+                    # 检查是否符合条件 (同一会话内已评估过的帖子直接跳过)
+                    analysis = self._evaluate_post(post, min_score, min_comments)
+                    if analysis is None:
                         continue
                     
-                    # 处理和存储帖子
-                    if self._process_and_store_post(post, subreddit_name):
+                    # 处理和存储帖子 (复用筛选阶段的分析结果)
+                    if self._process_and_store_post(post, subreddit_name, analysis):
                         collected_count += 1
-                        self.stats["total_stored"] += 1
                         
                         if collected_count % 10 == 0:
                             self.logger.info(f"    已采集 {collected_count}/{target_count} 个帖子")
-                
-                # 排序方法间隔
-                time.sleep(1)
             
         except Exception as e:
             self.logger.error(f"采集 r/{subreddit_name} 失败: {e}")
-            self.stats["errors"].append(f"r/{subreddit_name}: {str(e)}")
+            with self._stats_lock:
+                self.stats["errors"].append(f"r/{subreddit_name}: {str(e)}")
         
         return collected_count
     
+    def _fetch_subreddit_metadata(self, subreddit) -> Dict:
+        """获取子版块 about 信息 (一次API调用)"""
+        self.rate_budget.acquire()
+        self._count_api_call()
+        return SubredditMetadataCache.extract_metadata(subreddit)
+    
     def _get_posts_by_sort(self, subreddit, sort_method: str, limit: int = 100):
-        """根据排序方式获取帖子"""
-        self.stats["api_calls"] += 1
-        
-        if sort_method == "hot":
-            return subreddit.hot(limit=limit)
-        elif sort_method == "top":
-            return subreddit.top(time_filter="week", limit=limit)
+        """根据排序方式获取帖子 (请求前从共享预算中获取令牌)"""
+        if sort_method == "top":
+            listing = subreddit.top(time_filter="week", limit=limit)
         elif sort_method == "new":
-            return subreddit.new(limit=limit)
+            listing = subreddit.new(limit=limit)
         elif sort_method == "rising":
-            return subreddit.rising(limit=limit)
+            listing = subreddit.rising(limit=limit)
         else:
-            return subreddit.hot(limit=limit)
-    
-    def _should_collect_post(self, post, min_score: int, min_comments: int) -> bool:
-        """检查帖子是否应该被采集"""
-        try:
-            # 基本筛选条件
-            if post.score < min_score:
-                return False
-            
-            if post.num_comments < min_comments:
-                return False
-            
-            if post.upvote_ratio < 0.6:
-                return False
-            
-            # 排除某些类型的帖子
-            if post.over_18:  # NSFW
-                return False
-            
-            if post.removed_by_category:  # 已删除
-                return False
-            
-            if "[deleted]" in (post.title or ""):
-                return False
-            
-            # 时间限制检查
-            is_valid, reason = is_within_time_limit(post.created_utc, "hot")
-            if not is_valid:
-                return False
-            
-            # AI相关性检查
-            title = getattr(post, 'title', '')
-            content = getattr(post, 'selftext', '')
-            
-            is_ai, category, keywords = self.processor.is_ai_related(title, content)
-            if not is_ai:
-                return False
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"检查帖子条件时出错: {e}")
-            return False
+            listing = subreddit.hot(limit=limit)
+        
+        # 每页最多100条，limit<=100 时一次请求即可取完
+        for _ in range(max(1, (limit + 99) // 100)):
+            self.rate_budget.acquire()
+            self._count_api_call()
+        
+        return list(listing)
     
-    def _process_and_store_post(self, post, subreddit_name: str) -> bool:
+    def _process_and_store_post(self, post, subreddit_name: str,
+                                analysis: Optional[PostAnalysis] = None) -> bool:
         """处理并存储帖子"""
+        # 预占配额 (全局配额已满时跳过)，写入结束后在 _on_post_stored 中确认或释放
+        if self.quota is not None and not self.quota.reserve(subreddit_name):
+            self._release_post_claims(post.id)
+            return False
+        
+        handed_off = False
         try:
-            self.stats["total_processed"] += 1
-            
-            # 提取基本信息
-            post_data = self._extract_post_data(post, subreddit_name)
-            
-            # 计算质量评分
-            quality_score = self.processor.calculate_quality_score(post_data)
-            post_data["quality_score"] = quality_score
-            
-            # 时间质量加权
-            time_weighted_score = calculate_time_quality_score(
-                post_data["created_utc"], 
-                quality_score
-            )
-            post_data["tech_relevance_score"] = min(10.0, time_weighted_score / 10)
-            
-            # AI分类
-            classification = self.processor.classify_content(
-                post_data["title"], 
-                post_data["selftext"]
-            )
-            post_data["ai_category"] = classification["primary_category"]
-            post_data["content_category"] = classification["content_type"]
-            
-            # 存储帖子
-            if not self.db.insert_post(post_data):
-                return False
-            
-            # 提取和存储关键词
-            keywords = self.processor.extract_all_keywords(
-                post_data["title"], 
-                post_data["selftext"]
-            )
-            
-            if keywords:
-                self.db.insert_keywords(post_data["id"], keywords[:20])  # 最多20个关键词
-            
-            # 存储技术分类
-            self.db.insert_tech_category(post_data["id"], classification)
-            
-            return True
+            with self._stats_lock:
+                self.stats["total_processed"] += 1
+            
+            # 提取、评分、分类和关键词提取
+            post_data, keywords, classification = self._build_post_bundle(post, subreddit_name, analysis)
+            
+            # 启用写后队列时只入队，由后台线程批量写入
+            if self.storage_queue:
+                queued = self.storage_queue.put(post_data, keywords, classification)
+                handed_off = queued
+                if not queued:
+                    if self.quota is not None:
+                        self.quota.confirm(subreddit_name, False)
+                    self._release_post_claims(post.id)
+                if queued:
+                    # 入队即视为已采集，避免其他排序方式重复处理
+                    if self.seen_post_ids is not None:
+                        self.seen_post_ids.add(post_data["id"])
+                    with self._stats_lock:
+                        self.stats["total_queued"] += 1
+                return queued
+            
+            # 帖子、关键词和技术分类在一次请求中写入
+            stored = self.db.store_post_bundle(post_data, keywords, classification)
+            handed_off = True
+            self._on_post_stored(post_data, stored)
+            return stored
             
         except Exception as e:
             self.logger.error(f"处理帖子失败 {post.id}: {e}")
+            # 帖子未交给写入路径时释放预占的配额与去重索引条目
+            if not handed_off:
+                if self.quota is not None:
+                    self.quota.confirm(subreddit_name, False)
+                self._release_post_claims(post.id)
             return False
     
-    def _extract_post_data(self, post, subreddit_name: str) -> Dict:
-        """提取帖子数据"""
-        return {
-            "id": post.id,
-            "permalink": f"https://reddit.com{post.permalink}",
-            "url": getattr(post, 'url', None),
-            "title": getattr(post, 'title', ''),
-            "selftext": getattr(post, 'selftext', ''),
-            "selftext_html": getattr(post, 'selftext_html', None),
-            "score": getattr(post, 'score', 0),
-            "upvote_ratio": getattr(post, 'upvote_ratio', 0.0),
-            "num_comments": getattr(post, 'num_comments', 0),
-            "total_awards_received": getattr(post, 'total_awards_received', 0),
-            "num_crossposts": getattr(post, 'num_crossposts', 0),
-            "author": str(getattr(post, 'author', 'unknown')),
-            "subreddit": subreddit_name,
-            "subreddit_subscribers": getattr(post.subreddit, 'subscribers', 0),
-            "created_utc": int(getattr(post, 'created_utc', time.time())),
-            "is_self": getattr(post, 'is_self', False),
-            "is_video": getattr(post, 'is_video', False),
-            "over_18": getattr(post, 'over_18', False),
-            "locked": getattr(post, 'locked', False),
-            "stickied": getattr(post, 'stickied', False),
-        }
-    
     def get_collection_summary(self) -> Dict:
         """获取采集汇总信息"""
         end_time = time.time()
         duration = end_time - self.stats["start_time"]
         
-        today_count = self.db.get_today_post_count()
-        subreddit_stats = self.db.get_today_posts_by_subreddit()
+        # 优先使用对账后的本地配额计数，避免重复查询
+        if self.quota is not None:
+            subreddit_stats = self.quota.snapshot()
+        else:
+            subreddit_stats = self.db.get_today_posts_by_subreddit()
+        today_count = sum(subreddit_stats.values())
         
         return {
             "session_id": self.stats["session_id"],
             "duration_seconds": round(duration, 2),
             "total_fetched": self.stats["total_fetched"],
             "total_processed": self.stats["total_processed"],
+            "total_queued": self.stats["total_queued"],
             "total_stored": self.stats["total_stored"],
             "api_calls": self.stats["api_calls"],
+            "rate_limit": self.rate_budget.get_stats(),
+            "subreddit_cache": self.subreddit_cache.get_stats(),
+            "evaluation_cache": self.evaluated_posts.get_stats(),
+            "tfidf_index": self.tfidf_index.get_stats() if self.tfidf_index else None,
+            "near_duplicates": self.near_duplicates.get_stats() if self.near_duplicates else None,
+            "link_index": self.link_index.get_stats() if self.link_index else None,
             "today_total": today_count,
             "target_achievement": f"{today_count}/{COLLECTION_CONFIG['daily_target']}",
             "subreddit_breakdown": subreddit_stats,
+            "d1_transport": self.db.get_transport_stats(),
             "errors": self.stats["errors"]
         }
 
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+写后缓冲存储队列
+采集线程只负责入队，后台刷新线程按批量大小或时间间隔批量写入D1，
+使Reddit抓取与D1写入延迟互不阻塞
+"""
+
+import queue
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 队列关闭标记
+_CLOSE = object()
+
+class WriteBehindQueue:
+    """写后缓冲队列 - 后台线程批量刷新帖子数据"""
+    
+    def __init__(self, db, batch_size: int = 20, flush_interval: float = 5.0,
+                 max_queue_size: int = 200,
+                 on_stored: Optional[Callable[[Dict, bool], None]] = None,
+                 flush_retries: int = 2, retry_backoff: float = 1.0):
+        """
+        flush_retries: 批量写入抛出异常时的重试次数 (之后该批帖子记为丢失)
+        retry_backoff: 首次重试前的等待秒数，之后每次翻倍
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.on_stored = on_stored
+        self.flush_retries = max(0, flush_retries)
+        self.retry_backoff = retry_backoff
+        
+        # 有界队列: 队列满时 put 阻塞，对采集线程形成背压
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # 入队与关闭互斥: 关闭标记写入队列之后不会再有帖子入队
+        self._close_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        
+        self.logger = logging.getLogger(__name__)
+        
+        self.stats = {
+            "queued": 0,
+            "flushed": 0,
+            "stored": 0,
+            "ignored": 0,
+            "lost": 0,
+            "flushes": 0,
+            "flush_retries": 0,
+            "backpressure_waits": 0,
+            "flush_seconds": 0.0
+        }
+    
+    def start(self):
+        """启动后台刷新线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        with self._close_lock:
+            self._closed = False
+        self._thread = threading.Thread(target=self._run, name="d1-write-behind", daemon=True)
+        self._thread.start()
+    
+    def put(self, post_data: Dict, keywords: List[Dict], category_data: Dict) -> bool:
+        """入队一个帖子 (队列满时阻塞等待)，队列已关闭时返回False"""
+        item = (post_data, keywords, category_data)
+        
+        # 持锁入队: 刷新线程不需要此锁，队列满时等待期间仍会被消费
+        with self._close_lock:
+            if self._closed:
+                return False
+            
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._stats_lock:
+                    self.stats["backpressure_waits"] += 1
+                self._queue.put(item)
+        
+        with self._stats_lock:
+            self.stats["queued"] += 1
+        return True
+    
+    def pending(self) -> int:
+        """获取尚未刷新的帖子数量 (近似值)"""
+        return self._queue.qsize()
+    
+    def close(self, timeout: Optional[float] = None):
+        """关闭队列并等待剩余数据全部写入"""
+        with self._close_lock:
+            if self._closed:
+                return
+            
+            self._closed = True
+            running = self._thread is not None and self._thread.is_alive()
+            if running:
+                self._queue.put(_CLOSE)
+        
+        if running:
+            self._thread.join(timeout)
+        else:
+            # 刷新线程未启动时在当前线程中排空
+            self._drain_synchronously()
+    
+    def get_stats(self) -> Dict:
+        """获取队列统计"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["pending"] = self.pending()
+        stats["flush_seconds"] = round(stats["flush_seconds"], 2)
+        return stats
+    
+    def _run(self):
+        """后台刷新循环: 凑满一批或超过刷新间隔即写入"""
+        batch: List[Tuple] = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            if item is _CLOSE:
+                self._flush(batch)
+                return
+            
+            if item is not None:
+                batch.append(item)
+            
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+    
+    def _drain_synchronously(self):
+        """在调用线程中写入队列剩余数据"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _CLOSE:
+                batch.append(item)
+        
+        for start in range(0, len(batch), self.batch_size):
+            self._flush(batch[start:start + self.batch_size])
+    
+    def _flush(self, batch: List[Tuple]):
+        """将一批帖子写入D1并回调写入结果"""
+        if not batch:
+            return
+        
+        start_time = time.time()
+        outcomes = self._store_with_retry(batch)
+        lost = outcomes is None
+        if lost:
+            self.logger.error(f"写后队列刷新重试 {self.flush_retries} 次后仍失败，丢失 {len(batch)} 个帖子: "
+                              f"{', '.join(str(post_data.get('id')) for post_data, _, _ in batch)}")
+            outcomes = {}
+        
+        stored = sum(1 for post_data, _, _ in batch if outcomes.get(post_data.get("id"), False))
+        with self._stats_lock:
+            self.stats["flushes"] += 1
+            self.stats["flushed"] += len(batch)
+            self.stats["flush_seconds"] += time.time() - start_time
+            if lost:
+                self.stats["lost"] += len(batch)
+            else:
+                self.stats["stored"] += stored
+                self.stats["ignored"] += len(batch) - stored
+        
+        for post_data, _, _ in batch:
+            inserted = outcomes.get(post_data.get("id"), False)
+            if self.on_stored:
+                try:
+                    self.on_stored(post_data, inserted)
+                except Exception as e:
+                    self.logger.error(f"写入回调异常: {e}")
+    
+    def _store_with_retry(self, batch: List[Tuple]) -> Optional[Dict[str, bool]]:
+        """
+        批量写入，抛出异常时按指数退避重试 (帖子语句为 INSERT OR IGNORE，重试不会重复写入)
+        返回: {post_id: 是否新插入}，重试用尽时返回 None
+        """
+        for attempt in range(self.flush_retries + 1):
+            if attempt:
+                with self._stats_lock:
+                    self.stats["flush_retries"] += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            
+            try:
+                return self.db.store_post_bundles(batch)
+            except Exception as e:
+                self.logger.error(f"写后队列刷新失败 (第 {attempt + 1} 次): {e}")
+        
+        return None
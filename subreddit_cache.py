@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+子版块元数据缓存
+每个子版块每个会话只获取一次 about 信息 (订阅数等)，带过期时间，
+避免在逐帖提取时通过 PRAW 懒加载触发隐藏的 API 调用
+"""
+
+import threading
+import time
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+# 默认缓存有效期(秒)
+DEFAULT_METADATA_TTL = 3600
+
+class SubredditMetadataCache:
+    """线程安全的子版块元数据缓存"""
+    
+    def __init__(self, ttl_seconds: float = DEFAULT_METADATA_TTL):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, tuple] = {}  # name -> (过期时间, 元数据)
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._stale_warned: Set[str] = set()
+        
+        self.logger = logging.getLogger(__name__)
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "loads": 0,
+            "load_errors": 0
+        }
+    
+    @staticmethod
+    def extract_metadata(subreddit) -> Dict:
+        """从已加载的子版块对象中读取元数据"""
+        return {
+            "name": getattr(subreddit, "display_name", None),
+            "subscribers": getattr(subreddit, "subscribers", 0) or 0,
+            "active_user_count": getattr(subreddit, "active_user_count", 0) or 0,
+            "over18": getattr(subreddit, "over18", False),
+            "created_utc": getattr(subreddit, "created_utc", None),
+            "fetched_at": time.time()
+        }
+    
+    def peek(self, name: str, allow_stale: bool = False) -> Optional[Dict]:
+        """
+        读取缓存 (不触发加载)，不存在或已过期时返回None
+        allow_stale: 已过期时仍返回旧元数据 (带 "stale": True 标记，每个子版块首次读取时告警)，
+                     供采集过程中无法发起加载的调用方使用，新数据在下次 get 时刷新
+        """
+        key = name.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry and allow_stale:
+                self.stats["stale_hits"] += 1
+                warn = key not in self._stale_warned
+                self._stale_warned.add(key)
+            else:
+                self.stats["misses"] += 1
+                return None
+        
+        if warn:
+            self.logger.warning(f"r/{name} 元数据已过期 (超过 {self.ttl_seconds:.0f} 秒)，暂用旧数据直到下次刷新")
+        return dict(entry[1], stale=True)
+    
+    def put(self, name: str, metadata: Dict):
+        """写入缓存"""
+        with self._lock:
+            self._entries[name.lower()] = (time.monotonic() + self.ttl_seconds, metadata)
+            self._stale_warned.discard(name.lower())
+    
+    def get(self, name: str, loader: Callable[[str], Dict]) -> Dict:
+        """读取缓存，未命中时调用 loader 加载 (同一子版块并发加载只执行一次)"""
+        metadata = self.peek(name)
+        if metadata is not None:
+            return metadata
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name.lower(), threading.Lock())
+        
+        with load_lock:
+            # 等待期间可能已被其他线程加载
+            with self._lock:
+                entry = self._entries.get(name.lower())
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            
+            return self._store_loaded(name, loader)
+    
+    async def get_async(self, name: str, loader: Callable[[str], Awaitable[Dict]]) -> Dict:
+        """异步读取缓存，未命中时等待 loader 加载"""
+        metadata = self.peek(name)
+        if metadata is not None:
+            return metadata
+        
+        try:
+            metadata = await loader(name)
+        except Exception as e:
+            return self._record_load_error(name, e)
+        
+        self.put(name, metadata)
+        with self._lock:
+            self.stats["loads"] += 1
+        return metadata
+    
+    def _store_loaded(self, name: str, loader: Callable[[str], Dict]) -> Dict:
+        """调用 loader 并写入缓存"""
+        try:
+            metadata = loader(name)
+        except Exception as e:
+            return self._record_load_error(name, e)
+        
+        self.put(name, metadata)
+        with self._lock:
+            self.stats["loads"] += 1
+        return metadata
+    
+    def _record_load_error(self, name: str, error: Exception) -> Dict:
+        """记录加载失败，缓存空元数据避免本会话内反复重试"""
+        self.logger.warning(f"获取 r/{name} 元数据失败: {error}")
+        metadata = {"name": name, "subscribers": 0, "fetched_at": time.time()}
+        self.put(name, metadata)
+        with self._lock:
+            self.stats["load_errors"] += 1
+        return metadata
+    
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        return stats
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语料级文档频率 (DF) 索引
+为关键词提取提供真正的 TF-IDF: 帖子写入D1后增量更新词项的文档频率，
+索引保存在本地，由快照文件 + 追加日志组成，定期压缩合并并裁剪低频词项
+"""
+
+import os
+import json
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from daily_collection_config import TFIDF_CONFIG
+
+class DocumentFrequencyIndex:
+    """
+    增量文档频率索引 (线程安全)
+    - 快照文件: {"doc_count": N, "df": {词项: 文档数}, "log_seq": 已并入快照的最后一条日志序号}
+    - 追加日志: 每次保存追加一行带递增序号的本批次增量，加载时在快照之上重放序号更大的增量
+    - 压缩: 合并快照与日志，裁剪文档频率过低的词项并限制词项总数
+    """
+    
+    def __init__(self, path: str, max_terms: int = 50000, compact_every: int = 500,
+                 min_df_on_compact: int = 2):
+        """
+        path: 快照文件路径 (追加日志为 path + ".log")
+        max_terms: 压缩后保留的最大词项数 (按文档频率从高到低)
+        compact_every: 日志累计多少篇文档后自动压缩
+        min_df_on_compact: 压缩时丢弃文档频率低于该值的词项
+        """
+        self.path = path
+        self.log_path = path + ".log"
+        self.max_terms = max_terms
+        self.compact_every = compact_every
+        self.min_df_on_compact = min_df_on_compact
+        self.logger = logging.getLogger(__name__)
+        
+        self.doc_count = 0
+        self._df: Dict[str, int] = {}
+        
+        # 尚未写入日志的增量、日志中尚未压缩的文档数
+        self._pending_docs = 0
+        self._pending_df: Counter = Counter()
+        self._logged_docs = 0
+        self._log_seq = 0   # 已写入日志 (或已并入快照) 的最后一条日志序号
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "documents_added": 0,
+            "saves": 0,
+            "compactions": 0,
+            "terms_pruned": 0
+        }
+        
+        self._load()
+    
+    @classmethod
+    def from_config(cls) -> Optional["DocumentFrequencyIndex"]:
+        """按 TFIDF_CONFIG 创建索引，未启用时返回 None"""
+        if not TFIDF_CONFIG.get("enabled", False):
+            return None
+        
+        path = TFIDF_CONFIG.get("index_path", "data/tfidf_index.json")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        
+        return cls(
+            path,
+            max_terms=TFIDF_CONFIG.get("max_terms", 50000),
+            compact_every=TFIDF_CONFIG.get("compact_every", 500),
+            min_df_on_compact=TFIDF_CONFIG.get("min_df_on_compact", 2)
+        )
+    
+    def _load(self):
+        """
+        加载快照并重放追加日志
+        序号不大于快照 log_seq 的日志已并入快照 (压缩替换快照后、删除日志前中断时残留)，跳过不重放
+        """
+        snapshot_seq = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.doc_count = int(snapshot.get("doc_count", 0))
+            self._df = {term: int(count) for term, count in snapshot.get("df", {}).items()}
+            snapshot_seq = int(snapshot.get("log_seq", 0))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.error(f"TF-IDF索引快照加载失败，将重新累积: {e}")
+        
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        delta = json.loads(line)
+                    except ValueError:
+                        # 写入中断导致的残缺行直接跳过
+                        continue
+                    
+                    seq = delta.get("seq")
+                    if seq is None:
+                        # 没有序号的旧格式日志只在旧格式快照 (无 log_seq) 之上重放
+                        if snapshot_seq:
+                            continue
+                    elif seq <= snapshot_seq:
+                        continue
+                    self._apply_delta(delta.get("docs", 0), delta.get("df", {}))
+                    self._logged_docs += delta.get("docs", 0)
+                    self._log_seq = max(self._log_seq, seq or 0)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.error(f"TF-IDF索引日志加载失败: {e}")
+        
+        self._log_seq = max(self._log_seq, snapshot_seq)
+    
+    def _apply_delta(self, docs: int, df: Dict[str, int]):
+        """将一批增量合并到内存索引"""
+        self.doc_count += docs
+        for term, count in df.items():
+            self._df[term] = self._df.get(term, 0) + count
+    
+    def add_document(self, terms: Iterable[str]):
+        """登记一篇新文档 (只统计词项是否出现，不计出现次数)"""
+        unique_terms = set(terms)
+        with self._lock:
+            self._apply_delta(1, {term: 1 for term in unique_terms})
+            self._pending_docs += 1
+            self._pending_df.update(unique_terms)
+            self.stats["documents_added"] += 1
+    
+    def idf(self, term: str) -> float:
+        """平滑逆文档频率: ln((1 + N) / (1 + df)) + 1"""
+        with self._lock:
+            return self._idf(term)
+    
+    def _idf(self, term: str) -> float:
+        return math.log((1 + self.doc_count) / (1 + self._df.get(term, 0))) + 1
+    
+    def score(self, terms: List[str]) -> List[Tuple[str, float, int]]:
+        """
+        计算一篇文档中各词项的 TF-IDF (O(词项数))
+        返回: [(词项, L2归一化后的TF-IDF, 词频), ...]，按得分从高到低排序
+        """
+        term_freq = Counter(terms)
+        if not term_freq:
+            return []
+        
+        with self._lock:
+            weights = {term: freq * self._idf(term) for term, freq in term_freq.items()}
+        
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        scored = [(term, weight / norm, term_freq[term]) for term, weight in weights.items()]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored
+    
+    def save(self):
+        """将未保存的增量追加到日志，累计文档数达到阈值时压缩"""
+        with self._lock:
+            if self._pending_docs:
+                try:
+                    self._ensure_directory()
+                    seq = self._log_seq + 1
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"seq": seq, "docs": self._pending_docs, "df": dict(self._pending_df)}) + "\n")
+                    self._log_seq = seq
+                    self._logged_docs += self._pending_docs
+                    self._pending_docs = 0
+                    self._pending_df = Counter()
+                    self.stats["saves"] += 1
+                except OSError as e:
+                    self.logger.error(f"TF-IDF索引日志写入失败: {e}")
+                    return
+            
+            if self._logged_docs >= self.compact_every:
+                self._compact()
+    
+    def compact(self):
+        """立即压缩: 合并快照与日志并裁剪低频词项"""
+        with self._lock:
+            self._compact()
+    
+    def rebuild(self, documents: Iterable[Iterable[str]]) -> int:
+        """
+        以存量文档重建索引 (替换内存索引、快照与日志，用于从归档回填)
+        documents: 每篇文档的词项列表
+        返回: 重建的文档数
+        """
+        doc_count = 0
+        df: Counter = Counter()
+        for terms in documents:
+            df.update(set(terms))
+            doc_count += 1
+        
+        with self._lock:
+            self.doc_count = doc_count
+            self._df = dict(df)
+            self._pending_docs = 0
+            self._pending_df = Counter()
+            self._compact()
+        return doc_count
+    
+    def _compact(self):
+        """
+        写入新快照 (先写临时文件再原子替换)，随后删除日志
+        快照记录已并入的最后一条日志序号，删除日志前中断时重新加载也不会重复计数
+        """
+        before = len(self._df)
+        
+        # 裁剪低频词项并限制词项总数 (被裁剪的词项按未见过处理，IDF 取最大值)
+        df = {term: count for term, count in self._df.items() if count >= self.min_df_on_compact}
+        if len(df) > self.max_terms:
+            df = dict(sorted(df.items(), key=lambda x: x[1], reverse=True)[:self.max_terms])
+        
+        try:
+            self._ensure_directory()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"doc_count": self.doc_count, "df": df, "log_seq": self._log_seq}, f)
+            os.replace(tmp_path, self.path)
+            
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+        except OSError as e:
+            self.logger.error(f"TF-IDF索引压缩失败: {e}")
+            return
+        
+        # 未写入日志的增量已包含在内存索引中，随快照一并持久化
+        self._df = df
+        self._pending_docs = 0
+        self._pending_df = Counter()
+        self._logged_docs = 0
+        self.stats["compactions"] += 1
+        self.stats["terms_pruned"] += before - len(df)
+    
+    def _ensure_directory(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def __len__(self) -> int:
+        return len(self._df)
+    
+    def get_stats(self) -> Dict:
+        """获取索引统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["doc_count"] = self.doc_count
+            stats["terms"] = len(self._df)
+            stats["pending_docs"] = self._pending_docs
+            stats["logged_docs"] = self._logged_docs
+            stats["log_seq"] = self._log_seq
+        return stats